@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design one case or a manifest of cases from the command line.
+
+    python BatchDesign.py <case folder or manifest> [options]
+
+A manifest is a csv file with the columns caseID and BaseDirectory (relative paths are taken from
+the folder of the manifest), or a text file with one case folder per line. Every wall line of every
+case is designed with FinalShearWallDesign and the designs are written to the output folder as one
+shear wall table and one tie-down table (csv, parquet or json), with the caseID, direction and wall
+line of every row, plus summary.json.
+
+Options:
+    --jobs N                design the wall lines in N processes
+    --only X or X/line1     design only a direction or a wall line (can be repeated)
+    --format csv|parquet|json
+    --profile               write the time of every stage and every wall line to profile.json
+    --shard I/N             design only the cases I, I + N, I + 2N ... of the manifest (job arrays,
+                            e.g. --shard $SLURM_ARRAY_TASK_ID/$SLURM_ARRAY_TASK_COUNT)
+The design flags of FinalShearWallDesign are --redesign, --detailing, --drift, --dc-ratio and --prune
+(see design_flags() for the arguments of FinalShearWallDesign they are passed to).
+
+The last line printed is a one-line summary (key=value) and the exit code is EXIT_OK when every wall
+line was designed, EXIT_INFEASIBLE when some could not be designed (DesignInfeasibleError),
+EXIT_USAGE for bad arguments or inputs and EXIT_ERROR when a design failed for another reason.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from DesignErrors import DesignInfeasibleError
+
+
+#exit codes
+EXIT_OK, EXIT_INFEASIBLE, EXIT_USAGE, EXIT_ERROR = 0, 1, 2, 3
+
+FORMATS = ('csv', 'parquet', 'json')
+
+
+def parse_arguments(argv = None):
+    parser = argparse.ArgumentParser(prog = 'BatchDesign.py', description = 'Design the shear walls and tie-downs of '
+                                     'one case or a manifest of cases.')
+    parser.add_argument('target', help = 'case folder, or manifest of cases (csv with caseID,BaseDirectory or '
+                        'one case folder per line)')
+    parser.add_argument('-o', '--output', default = 'designs', help = 'output folder (default: designs)')
+    parser.add_argument('--format', choices = FORMATS, default = 'csv', help = 'format of the design tables')
+    parser.add_argument('-j', '--jobs', type = int, default = 1, help = 'number of design processes')
+    parser.add_argument('--only', action = 'append', default = [], metavar = 'DIRECTION[/LINE]',
+                        help = 'design only this direction or wall line, e.g. X or Z/line2 (can be repeated)')
+    parser.add_argument('--profile', action = 'store_true', help = 'write the stage timings to profile.json')
+    parser.add_argument('--shard', default = None, metavar = 'I/N', help = 'design only every N-th case of the '
+                        'manifest starting at I (0 based)')
+    parser.add_argument('--databases', default = None, help = 'folder of shearwall_database.csv and '
+                        'tie_down_database.csv (default: working directory)')
+    parser.add_argument('--wall-length', type = float, default = 4.0, help = 'starting wall length in ft (default: 4)')
+    parser.add_argument('--redesign', action = 'store_true', help = 'compute the demand at the redesign length '
+                        '(wall length + 0.5 ft)')
+    parser.add_argument('--detailing', action = 'store_true', help = 'select the shear walls with the preferred '
+                        'panel thickness, nail size and nail spacing of the case')
+    parser.add_argument('--drift', action = 'store_true', help = 'userDefinedDriftTag')
+    parser.add_argument('--dc-ratio', action = 'store_true', help = 'userDefinedDCTag')
+    parser.add_argument('--prune', action = 'store_true', help = 'use the dominance-pruned shear wall catalog (opt-in, '
+                        'can change the design; without a Cost column the cost model is a placeholder)')
+    parser.add_argument('--elf', action = 'store_true', help = 'design for the ELF story forces of the site '
+                        '(SeismicDesignParameters) instead of Fx_ToTestTheCode.txt')
+    return parser.parse_args(argv)
+
+
+def design_flags(arguments):
+    """
+    This function is used to get the design flags of FinalShearWallDesign from the command line.
+    FinalShearWallDesign passes its reDesignTag to the drift check in the position of
+    userDefinedDetailingTag and the other way around (see StackedShearWallDesign), so the detailing
+    filter is enabled by its reDesignTag and the redesign length by its userDefinedDetailingTag
+    :param arguments: parsed arguments, see parse_arguments()
+    :return: (reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag) of FinalShearWallDesign
+    """
+    return arguments.detailing, arguments.redesign, arguments.drift, arguments.dc_ratio
+
+
+def read_manifest(target):
+    """
+    This function is used to get the cases to design
+    :param target: case folder, csv manifest (caseID, BaseDirectory) or text file with one case folder per line
+    :return: list of (caseID, absolute BaseDirectory)
+    """
+    if os.path.isdir(target):
+        BaseDirectory = os.path.abspath(target)
+        return [(os.path.basename(BaseDirectory), BaseDirectory)]
+    if not os.path.isfile(target):
+        raise ValueError('%s is neither a case folder nor a manifest' % target)
+    root = os.path.dirname(os.path.abspath(target))
+    if target.lower().endswith('.csv'):
+        manifest = pd.read_csv(target, dtype = str)
+        missing = [name for name in ('caseID', 'BaseDirectory') if name not in manifest.columns]
+        if missing:
+            raise ValueError('The manifest %s is missing the column(s): %s' % (target, ', '.join(missing)))
+        cases = list(zip(manifest['caseID'], manifest['BaseDirectory']))
+    else:
+        with open(target, 'r') as myfile:
+            folders = [line.strip() for line in myfile if line.strip() and not line.lstrip().startswith('#')]
+        cases = [(os.path.basename(os.path.normpath(folder)), folder) for folder in folders]
+    cases = [(caseID, os.path.normpath(os.path.join(root, BaseDirectory))) for caseID, BaseDirectory in cases]
+    for caseID, BaseDirectory in cases:
+        if not os.path.isdir(BaseDirectory):
+            raise ValueError('The case folder of %s does not exist: %s' % (caseID, BaseDirectory))
+    return cases
+
+
+def parse_shard(shard):
+    #'I/N' -> (I, N)
+    try:
+        index, count = (int(value) for value in shard.split('/'))
+    except ValueError:
+        raise ValueError('--shard must be I/N, not %s' % shard)
+    if count < 1 or not 0 <= index < count:
+        raise ValueError('--shard must have 0 <= I < N, not %s' % shard)
+    return index, count
+
+
+def list_units(cases, only = ()):
+    """
+    This function is used to list the wall lines to design
+    :param cases: list of (caseID, BaseDirectory)
+    :param only: filters 'X', 'Z', 'X/line1' ...; empty to design every wall line
+    :return: list of (caseID, BaseDirectory, direction, wall line name, number of floors)
+    """
+    from LoadDistribution import list_wall_lines
+
+    filters = [tuple(item.strip('/').split('/', 1)) for item in only]
+    for item in filters:
+        if item[0] not in ('X', 'Z'):
+            raise ValueError('--only must start with the direction X or Z, not %s' % '/'.join(item))
+    units = []
+    for caseID, BaseDirectory in cases:
+        numFloors = int(np.genfromtxt(os.path.join(BaseDirectory, 'Geometry', 'numberOfStories.txt')))
+        for direction in ('X', 'Z'):
+            for name in list_wall_lines(BaseDirectory, direction):
+                if not filters or (direction,) in filters or (direction, name) in filters:
+                    units.append((caseID, BaseDirectory, direction, name, numFloors))
+    return units
+
+
+def design_unit(unit, designParameters):
+    """
+    This function is used to design one wall line; failures are returned, not raised, so that one
+    wall line does not stop the batch
+    :param unit: (caseID, BaseDirectory, direction, wall line name, number of floors)
+    :param designParameters: (wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                             userDefinedDCTag, pruneCatalog, ELFDemandTag)
+    :return: dictionary with the unit, 'status' ('designed', 'infeasible' or 'error'), the design
+             frames, the final wall length, the message of a failure and the design time
+    """
+    #imported here so that the databases are read from the folder chosen on the command line
+    from FinalShearWallDesign import FinalShearWallDesign
+
+    caseID, BaseDirectory, direction, wall_line_name, numFloors = unit
+    (wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, pruneCatalog,
+     ELFDemandTag) = designParameters
+    result = {'unit': unit, 'status': 'designed', 'message': None}
+    start = time.perf_counter()
+    try:
+        design = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, 0, numFloors, wall_line_name,
+                                      reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag,
+                                      False, pruneCatalog, ELFDemandTag = ELFDemandTag)
+        result.update(sw_design = design.sw_final_design, tiedown_design = design.tiedown_final_design,
+                      finalWallLength = float(np.max(design.finalWallLength)), designSteps = int(design.designSteps))
+    except DesignInfeasibleError as error:
+        result.update(status = 'infeasible', message = str(error))
+    except Exception as error:
+        result.update(status = 'error', message = '%s: %s' % (type(error).__name__, error))
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def write_table(frame, path, fmt):
+    if fmt == 'csv':
+        frame.to_csv(path, index = False)
+    elif fmt == 'parquet':
+        frame.to_parquet(path, index = False)
+    else:
+        frame.to_json(path, orient = 'records', indent = 1)
+
+
+def check_format(fmt):
+    #parquet needs pyarrow or fastparquet, checked before any design is run
+    if fmt == 'parquet':
+        try:
+            pd.io.parquet.get_engine('auto')
+        except ImportError:
+            raise ValueError('--format parquet needs pyarrow or fastparquet')
+
+
+class BatchDesign():
+
+    def __init__(self, cases, output, fmt = 'csv', jobs = 1, only = (), profile = False, wallLength = 4.0,
+                 reDesignTag = False, userDefinedDetailingTag = False, userDefinedDriftTag = False,
+                 userDefinedDCTag = False, pruneCatalog = False, ELFDemandTag = False):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every wall line
+        :param cases: list of (caseID, BaseDirectory), see read_manifest()
+        :param output: output folder, created if needed
+        :param fmt: format of the design tables, see FORMATS
+        :param jobs: number of design processes (1 designs in this process)
+        :param only: direction or wall line filters, see list_units()
+        :param profile: if True, the stage and wall line timings are written to profile.json
+        """
+        self.cases = cases
+        #the design changes the working directory, so the output path is fixed here
+        self.output = os.path.abspath(output)
+        self.fmt = fmt
+        self.jobs = jobs
+        self.only = only
+        self.profile = profile
+        self.designParameters = (wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                                 userDefinedDCTag, pruneCatalog, ELFDemandTag)
+        #stage name -> wall clock time. Units: s
+        self.stages = {}
+
+        self.run()
+
+    def timed(self, stage, function, *args):
+        start = time.perf_counter()
+        value = function(*args)
+        self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+        return value
+
+    def design(self):
+        """
+        This method is used to design every wall line, in this process or in a process pool
+        :return: list of design results in the order of the units, see design_unit()
+        """
+        if self.jobs <= 1 or len(self.units) <= 1:
+            return [design_unit(unit, self.designParameters) for unit in self.units]
+        with ProcessPoolExecutor(max_workers = self.jobs) as pool:
+            return list(pool.map(design_unit, self.units, [self.designParameters]*len(self.units)))
+
+    def write(self):
+        """
+        This method is used to write the design tables, the summary and the profile
+        :return: summary dictionary
+        """
+        os.makedirs(self.output, exist_ok = True)
+        tables = {'sw_design': [], 'tiedown_design': []}
+        for result in self.results:
+            if result['status'] != 'designed':
+                continue
+            caseID, BaseDirectory, direction, wall_line_name, numFloors = result['unit']
+            for name in tables:
+                frame = result[name].copy()
+                frame.insert(0, 'wall line', wall_line_name)
+                frame.insert(0, 'direction', direction)
+                frame.insert(0, 'caseID', caseID)
+                tables[name].append(frame)
+        for name, frames in tables.items():
+            if frames:
+                write_table(pd.concat(frames, ignore_index = True), os.path.join(self.output, '%s.%s' % (name, self.fmt)),
+                            self.fmt)
+
+        status = [result['status'] for result in self.results]
+        self.summary = {'cases': len(self.cases),
+                        'wall lines': len(self.results),
+                        'designed': status.count('designed'),
+                        'infeasible': status.count('infeasible'),
+                        'errors': status.count('error'),
+                        'failures': [{'caseID': result['unit'][0], 'direction': result['unit'][2],
+                                      'wall line': result['unit'][3], 'status': result['status'],
+                                      'message': result['message']}
+                                     for result in self.results if result['status'] != 'designed'],
+                        'output': self.output}
+        with open(os.path.join(self.output, 'summary.json'), 'w') as myfile:
+            json.dump(self.summary, myfile, indent = 1)
+        return self.summary
+
+    def write_profile(self):
+        #stage timings, and the design time and steps of every wall line
+        profile = {'stages (s)': self.stages,
+                   'jobs': self.jobs,
+                   'wall lines': [{'caseID': result['unit'][0], 'direction': result['unit'][2],
+                                   'wall line': result['unit'][3], 'status': result['status'],
+                                   'time (s)': result['time'], 'design steps': result.get('designSteps')}
+                                  for result in self.results]}
+        with open(os.path.join(self.output, 'profile.json'), 'w') as myfile:
+            json.dump(profile, myfile, indent = 1)
+        return profile
+
+    def run(self):
+        """
+        This method is used to list, design and write every wall line of the cases
+        :return: exit code, see EXIT_OK ...
+        """
+        start = time.perf_counter()
+        self.units = self.timed('list wall lines', list_units, self.cases, self.only)
+        self.results = self.timed('design', self.design)
+        self.timed('write', self.write)
+        self.stages['total'] = time.perf_counter() - start
+        if self.profile:
+            self.write_profile()
+
+        if self.summary['errors']:
+            self.exitCode = EXIT_ERROR
+        elif self.summary['infeasible']:
+            self.exitCode = EXIT_INFEASIBLE
+        else:
+            self.exitCode = EXIT_OK
+        return self.exitCode
+
+    def summary_line(self):
+        #one line for the logs of a job array
+        return ('status=%s cases=%d wall_lines=%d designed=%d infeasible=%d errors=%d time=%.2fs output=%s'
+                % ({EXIT_OK: 'ok', EXIT_INFEASIBLE: 'infeasible', EXIT_ERROR: 'error'}[self.exitCode],
+                   self.summary['cases'], self.summary['wall lines'], self.summary['designed'],
+                   self.summary['infeasible'], self.summary['errors'], self.stages['total'], self.output))
+
+
+def main(argv = None):
+    """
+    This function is used to run the command line
+    :param argv: command line arguments, None for sys.argv[1:]
+    :return: exit code
+    """
+    arguments = parse_arguments(argv)
+    try:
+        check_format(arguments.format)
+        cases = read_manifest(arguments.target)
+        if arguments.shard is not None:
+            index, count = parse_shard(arguments.shard)
+            cases = cases[index::count]
+        if arguments.jobs < 1:
+            raise ValueError('--jobs must be at least 1, not %d' % arguments.jobs)
+    except ValueError as error:
+        print('error: %s' % error, file = sys.stderr)
+        return EXIT_USAGE
+
+    output = os.path.abspath(arguments.output)
+    if arguments.databases is not None:
+        #the databases are read from the working directory when the design modules are imported
+        os.chdir(arguments.databases)
+    try:
+        batch = BatchDesign(cases, output, arguments.format, arguments.jobs, arguments.only, arguments.profile,
+                            arguments.wall_length, *design_flags(arguments), arguments.prune, arguments.elf)
+    except (ValueError, OSError) as error:
+        print('error: %s' % error, file = sys.stderr)
+        return EXIT_USAGE
+
+    for failure in batch.summary['failures']:
+        print('%(status)s: %(caseID)s %(direction)s/%(wall line)s: %(message)s' % failure, file = sys.stderr)
+    if arguments.profile:
+        for stage, elapsed in batch.stages.items():
+            print('%-16s %8.3f s' % (stage, elapsed), file = sys.stderr)
+    print(batch.summary_line())
+    return batch.exitCode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
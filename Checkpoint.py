@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to save the results of long batch runs as they complete, so that a run that
+stops can resume where it stopped.
+
+The checkpoint is an append-only text file with one record per completed unit (case, direction,
+wall line). A unit that could not be designed is completed too: its record has the 'status'
+('infeasible' or 'error') and the 'message' of the failure instead of the design frames. Each record is one line: the CRC32 of the JSON text, a space and the JSON text. Records
+are buffered and written with one fsync per batch. When the file is opened, the records are checked
+and a partially written last record (a crash during the write) is cut off, so that new records are
+appended after the last complete one.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from FinalShearWallDesign import FinalShearWallDesign
+
+
+def to_json(value):
+    #numpy values in the design frames are not JSON serializable
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('%s is not JSON serializable' % type(value))
+
+
+class CheckpointStore():
+
+    def __init__(self, path, syncEvery = 50, syncInterval = 10.0, keepRecords = True):
+        """
+        :param path: checkpoint file, created if it does not exist
+        :param syncEvery: number of records written with one fsync
+        :param syncInterval: largest time between two fsync calls while records are waiting. Units: s
+        :param keepRecords: if False, only the keys of the records found on open are kept in memory
+                            and new records are only written to the file (streaming runs)
+        """
+        #the design changes the working directory, so the path is fixed here
+        self.path = os.path.abspath(path)
+        self.syncEvery = syncEvery
+        self.syncInterval = syncInterval
+        self.keepRecords = keepRecords
+        self.records = {}
+        self.pending = []
+        self.lastSync = time.time()
+        self.truncatedBytes = 0
+
+        self.load()
+        self.file = open(self.path, 'ab')
+
+    @staticmethod
+    def key(caseID, direction, wall_line_name):
+        return '%s/%s/%s' % (caseID, direction, wall_line_name)
+
+    def load(self):
+        """
+        This method is used to read the complete records and cut off a partially written last record
+        :return: number of complete records
+        """
+        if not os.path.exists(self.path):
+            return 0
+        validBytes = 0
+        with open(self.path, 'rb') as myfile:
+            for line in myfile:
+                if not line.endswith(b'\n'):
+                    break
+                checksum, _, text = line.rstrip(b'\n').partition(b' ')
+                try:
+                    if int(checksum, 16) != zlib.crc32(text):
+                        break
+                    record = json.loads(text.decode('utf-8'))
+                except ValueError:
+                    break
+                self.records[record['key']] = record if self.keepRecords else None
+                validBytes += len(line)
+        size = os.path.getsize(self.path)
+        if validBytes < size:
+            #everything after the first damaged record is dropped; those units are designed again
+            self.truncatedBytes = size - validBytes
+            with open(self.path, 'r+b') as myfile:
+                myfile.truncate(validBytes)
+                myfile.flush()
+                os.fsync(myfile.fileno())
+        return len(self.records)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def append(self, key, sw_final_design, tiedown_final_design, **extra):
+        """
+        This method is used to add the result of one unit. A unit already in the checkpoint is not written again
+        :param key: unit key, see CheckpointStore.key
+        :param sw_final_design, tiedown_final_design: design frames of the unit
+        :param extra: other JSON serializable values to keep with the result
+        """
+        if key in self.records:
+            return
+        record = {'key': key,
+                  'sw_final_design': sw_final_design.to_dict('records'),
+                  'tiedown_final_design': tiedown_final_design.to_dict('records')}
+        record.update(extra)
+        self.write_record(key, record)
+
+    def append_failure(self, key, status, message):
+        """
+        This method is used to add a unit that could not be designed, so that a resumed run does not
+        design it again
+        :param key: unit key, see CheckpointStore.key
+        :param status: 'infeasible' or 'error'
+        :param message: message of the failure
+        """
+        if key in self.records:
+            return
+        self.write_record(key, {'key': key, 'status': status, 'message': message})
+
+    def write_record(self, key, record):
+        text = json.dumps(record, default = to_json).encode('utf-8')
+        self.pending.append(b'%08x %s\n' % (zlib.crc32(text), text))
+        self.records[key] = json.loads(text.decode('utf-8')) if self.keepRecords else None
+        if len(self.pending) >= self.syncEvery or time.time() - self.lastSync >= self.syncInterval:
+            self.sync()
+
+    def sync(self):
+        """
+        This method is used to write the waiting records with a single fsync
+        """
+        if self.pending:
+            self.file.write(b''.join(self.pending))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = []
+        self.lastSync = time.time()
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def getDesign(self, key):
+        """
+        :return: shear wall and tie-down design frames of a unit
+        """
+        record = self.records[key]
+        if 'sw_final_design' not in record:
+            raise ValueError('%s was not designed (%s): %s' % (key, record['status'], record['message']))
+        return pd.DataFrame(record['sw_final_design']), pd.DataFrame(record['tiedown_final_design'])
+
+
+class CheckpointedBatchDesign():
+
+    def __init__(self, units, checkpointPath, wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog = False, syncEvery = 50):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every unit
+        :param units: iterable of (caseID, BaseDirectory, direction, wall line name), in run order
+        :param checkpointPath: checkpoint file; units already in it are not designed again
+        :param syncEvery: number of results written with one fsync
+        """
+        self.units = list(units)
+        self.checkpointPath = os.path.abspath(checkpointPath)
+        self.designParameters = (wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog)
+        self.syncEvery = syncEvery
+        self.resumedUnits = 0
+        self.designedUnits = 0
+
+        self.run()
+
+    def run(self):
+        """
+        This method is used to design the units in order, starting from the first unit that is
+        not in the checkpoint
+        :return: dictionary of (caseID, direction, wall line name): (shear wall design, tie-down design)
+        """
+        wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, \
+            userDefinedDCTag, iterateFlag, pruneCatalog = self.designParameters
+        with CheckpointStore(self.checkpointPath, self.syncEvery) as store:
+            self.truncatedBytes = store.truncatedBytes
+            for caseID, BaseDirectory, direction, wall_line_name in self.units:
+                key = store.key(caseID, direction, wall_line_name)
+                if key in store:
+                    self.resumedUnits += 1
+                    continue
+                design = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, counter, numFloors,
+                                              wall_line_name, reDesignTag, userDefinedDetailingTag,
+                                              userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog)
+                store.append(key, design.sw_final_design, design.tiedown_final_design,
+                             finalWallLength = np.ravel(design.finalWallLength))
+                self.designedUnits += 1
+            self.results = {(caseID, direction, wall_line_name): store.getDesign(store.key(caseID, direction, wall_line_name))
+                            for caseID, BaseDirectory, direction, wall_line_name in self.units}
+        return self.results
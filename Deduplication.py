@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design a batch of cases without designing identical inputs twice.
+
+The inputs are hashed after parsing, so files that only differ in formatting (white space, number
+format, line endings) give the same hash. Every case gets a building hash (the building level
+folders) and every wall line a line hash (its Geometry, Loads and MaterialProperties folders).
+The direction and the name of a wall line are not part of its hash, so the identical lines of a
+symmetric building are designed once. A case whose building and wall lines are all identical to an
+earlier case reuses all the designs of that case.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import hashlib
+import os
+import warnings
+
+import numpy as np
+
+from FinalShearWallDesign import FinalShearWallDesign
+from LoadDistribution import list_wall_lines
+from OpenSeesExport import MODEL_FOLDERS
+
+
+#folders of a wall line read by the design
+LINE_FOLDERS = ('Geometry', 'Loads', 'MaterialProperties')
+
+
+def parse_input_file(path):
+    """
+    This function is used to parse an input file the way the design reads it: numbers as a float
+    array, anything else as stripped text
+    :return: numpy array or string
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            values = np.genfromtxt(path, dtype = float)
+        except ValueError:
+            values = None
+    if values is not None and values.size > 0 and not np.isnan(values).any():
+        return values
+    with open(path, 'r') as myfile:
+        return myfile.read().strip()
+
+
+def update_hash(digest, value):
+    #add a parsed value to the hash with its type and shape, so that e.g. '1' and 1.0 differ
+    if isinstance(value, np.ndarray):
+        digest.update(b'a%r' % (value.shape,))
+        digest.update(np.ascontiguousarray(value + 0.0).tobytes())   #+ 0.0 turns -0.0 into 0.0
+    else:
+        digest.update(b's')
+        digest.update(str(value).encode('utf-8'))
+
+
+def hash_folders(directory, folders):
+    """
+    This function is used to hash the parsed content of every file in some folders
+    :param directory: parent directory of the folders
+    :param folders: folder names, e.g. MODEL_FOLDERS or LINE_FOLDERS
+    :return: hexadecimal hash
+    """
+    digest = hashlib.blake2b(digest_size = 16)
+    for folder in folders:
+        for root, dirs, files in os.walk(os.path.join(directory, folder)):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).replace(os.sep, '/').encode('utf-8'))
+                update_hash(digest, parse_input_file(path))
+    return digest.hexdigest()
+
+
+def building_input_hash(BaseDirectory):
+    """
+    :return: hash of the building level inputs of a case
+    """
+    return hash_folders(BaseDirectory, MODEL_FOLDERS)
+
+
+def wall_line_input_hash(BaseDirectory, direction, wall_line_name):
+    """
+    :return: hash of the inputs of one wall line, without its direction and name
+    """
+    return hash_folders(os.path.join(BaseDirectory, '%s_direction_wall' % direction, wall_line_name), LINE_FOLDERS)
+
+
+class DeduplicatedDesign():
+
+    def __init__(self, cases, wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, directions = ('X', 'Z'), pruneCatalog = False):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every wall line
+        :param cases: iterable of (caseID, BaseDirectory)
+        :param directions: directions whose wall lines are designed
+        """
+        self.cases = list(cases)
+        self.designParameters = (wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog)
+        self.directions = directions
+
+        #(building hash, line hash) -> FinalShearWallDesign
+        self.lineDesigns = {}
+        #case hash -> {(direction, wall line name): FinalShearWallDesign}
+        self.caseDesigns = {}
+        #caseID -> {(direction, wall line name): FinalShearWallDesign}
+        self.designs = {}
+        self.numberOfLines = 0
+
+        self.design_cases()
+
+    def design_line(self, caseID, BaseDirectory, direction, wall_line_name, key):
+        if key not in self.lineDesigns:
+            wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, \
+                userDefinedDCTag, iterateFlag, pruneCatalog = self.designParameters
+            self.lineDesigns[key] = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, counter,
+                                                         numFloors, wall_line_name, reDesignTag,
+                                                         userDefinedDetailingTag, userDefinedDriftTag,
+                                                         userDefinedDCTag, iterateFlag, pruneCatalog)
+        return self.lineDesigns[key]
+
+    def design_cases(self):
+        """
+        This method is used to hash and design all the cases; identical cases and identical wall
+        lines share one design
+        :return: dictionary of caseID: {(direction, wall line name): FinalShearWallDesign}
+        """
+        for caseID, BaseDirectory in self.cases:
+            buildingHash = building_input_hash(BaseDirectory)
+            lines = [(direction, name) for direction in self.directions
+                     for name in list_wall_lines(BaseDirectory, direction)]
+            lineHash = [wall_line_input_hash(BaseDirectory, direction, name) for direction, name in lines]
+            self.numberOfLines += len(lines)
+
+            digest = hashlib.blake2b(buildingHash.encode('utf-8'), digest_size = 16)
+            for (direction, name), h in zip(lines, lineHash):
+                digest.update(('%s/%s:%s;' % (direction, name, h)).encode('utf-8'))
+            caseHash = digest.hexdigest()
+
+            if caseHash not in self.caseDesigns:
+                self.caseDesigns[caseHash] = {line: self.design_line(caseID, BaseDirectory, line[0], line[1], (buildingHash, h))
+                                              for line, h in zip(lines, lineHash)}
+            self.designs[caseID] = self.caseDesigns[caseHash]
+        return self.designs
+
+    def getDedupSummary(self):
+        """
+        :return: dictionary with the number of cases and wall lines, how many were designed, and the
+                 dedup ratio (inputs / designs)
+        """
+        numberOfCases = len(self.designs)
+        return {'cases': numberOfCases,
+                'unique cases': len(self.caseDesigns),
+                'case dedup ratio': numberOfCases/max(len(self.caseDesigns), 1),
+                'wall lines': self.numberOfLines,
+                'designed wall lines': len(self.lineDesigns),
+                'wall line dedup ratio': self.numberOfLines/max(len(self.lineDesigns), 1)}
+
+    def report(self):
+        """
+        This method is used to print the dedup summary at the end of a batch run
+        """
+        summary = self.getDedupSummary()
+        print('%d cases, %d unique (dedup ratio %.2f)' % (summary['cases'], summary['unique cases'],
+                                                          summary['case dedup ratio']))
+        print('%d wall lines, %d designed (dedup ratio %.2f)' % (summary['wall lines'], summary['designed wall lines'],
+                                                                 summary['wall line dedup ratio']))
+        return summary
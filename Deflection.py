@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+This file has the deflection and drift equations of the shear wall design as pure functions.
+
+The functions have no side effects and use NumPy broadcasting, so they can be called with scalars
+(one wall), or with arrays of any shape, e.g. every assembly of the catalog times every trial length
+times every floor, without building design objects. DesignShearWall and ShearWallFloorDesign use
+them, so their results are the same.
+
+Units follow the design: forces in kips, lengths and story heights in ft, deflections in inches,
+EA in lb (chord area (in^2) * modulus of elasticity (psi)) and Ga in kips/in.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import time
+
+import numpy as np
+
+
+def demand(storyForce, length, storyHeight, axis = -1):
+    """
+    This function is used to get the unit shear and tension demand of the floors of a wall line
+    :param storyForce: story force per wall of every floor, top floor first along axis. Units: kips
+    :param length: wall length, broadcast to storyForce. Units: ft
+    :param storyHeight: story height of every floor, broadcast to storyForce. Units: ft
+    :return: unit shear (Units: klf) and tension demand (Units: kips) of every floor
+    """
+    unitShear = np.cumsum(storyForce, axis = axis)/length
+    tension = np.cumsum(unitShear * (np.asarray(storyHeight) - 1), axis = axis)
+    return unitShear, tension
+
+
+def rod_elongation(tension, storyHeight, rodArea, E = 29000):
+    """
+    :param tension: tension demand. Units: kips
+    :param storyHeight: story height. Units: ft
+    :param rodArea: effective area of the tie-down rod. Units: in^2
+    :param E: Youngs Modulus of steel. Units: ksi
+    :return: elongation of the tie-down rod over the story. Units: in
+    """
+    return tension * storyHeight*12/(E * rodArea)
+
+
+def shrinkage(initialMoisture, finalMoisture):
+    """
+    :param initialMoisture, finalMoisture: moisture content of the wood. Units: %
+    :return: shrinkage of the 2x sill plate. Units: in
+    """
+    return 0.0025*1.5*(np.asarray(initialMoisture, dtype = float) - finalMoisture)
+
+
+def assembly_deflection(tension, chordArea, initialMoisture, finalMoisture, takeup, rodElongation):
+    """
+    This function is used to get the assembly deflection (delta a) of the shear wall: sill plate
+    crushing, shrinkage, take-up deflection and rod elongation
+    :param tension: tension demand (ASD). Units: kips
+    :param chordArea: area of the chord. Units: in^2
+    :param initialMoisture, finalMoisture: moisture content of the wood. Units: %
+    :param takeup: take-up device deflection. Units: in
+    :param rodElongation: elongation of the tie-down rod. Units: in
+    :return: assembly deflection. Units: in
+    """
+    #LRFD compressive stress on the sill plate
+    compressive_force = tension/0.7/chordArea
+    crushing = 1.75*(0.04 -0.02*(1-compressive_force/0.625)/0.27)
+    return crushing + shrinkage(initialMoisture, finalMoisture) + takeup + rodElongation
+
+
+def wall_deflection(storyForce, length, storyHeight, EA, Ga, assemblyDeflection):
+    """
+    This function is used to get the shear wall deflection with the 3-term equation of SDPWS 2015:
+    chord bending, shear (apparent shear stiffness) and rotation
+    :param storyForce: story force per wall. Units: kips
+    :param length: wall length. Units: ft
+    :param storyHeight: story height. Units: ft
+    :param EA: chord area * modulus of elasticity. Units: lb
+    :param Ga: apparent shear stiffness of the assembly. Units: kips/in
+    :param assemblyDeflection: assembly deflection, see assembly_deflection(). Units: in
+    :return: shear wall deflection. Units: in
+    """
+    shear_demand = storyForce * 1000 / length
+    del_bending = 8*shear_demand*np.power(storyHeight, 3) / ((EA/1000) * length)/1000
+    del_shear = shear_demand * storyHeight/(1000 * Ga)
+    del_rotation = assemblyDeflection * storyHeight/(length - 1)
+    return del_bending + del_shear + del_rotation
+
+
+def story_drift(deflection, Cd, Ie):
+    """
+    :param deflection: elastic deflection. Units: in
+    :param Cd: deflection amplification factor
+    :param Ie: importance factor
+    :return: design story drift per ASCE 7-16. Units: in
+    """
+    return deflection * Cd / Ie
+
+
+def drift(storyForce, length, storyHeight, EA, Ga, chordArea, initialMoisture, finalMoisture, takeup,
+          Cd, Ie, tension, rodElongation = 0.0):
+    """
+    This function is used to get the design story drift of shear walls from their demand
+    :param storyForce: story force per wall. Units: kips
+    :param length: wall length. Units: ft
+    :param storyHeight: story height. Units: ft
+    :param EA: chord area * modulus of elasticity. Units: lb
+    :param Ga: apparent shear stiffness of the assembly. Units: kips/in
+    :param chordArea: area of the chord. Units: in^2
+    :param initialMoisture, finalMoisture: moisture content of the wood. Units: %
+    :param takeup: take-up device deflection. Units: in
+    :param Cd, Ie: deflection amplification and importance factors
+    :param tension: tension demand, see demand(). Units: kips
+    :param rodElongation: elongation of the tie-down rod, see rod_elongation(). Units: in
+    :return: design story drift, the broadcast shape of the inputs. Units: in
+    """
+    deltaA = assembly_deflection(tension, chordArea, initialMoisture, finalMoisture, takeup, rodElongation)
+    return story_drift(wall_deflection(storyForce, length, storyHeight, EA, Ga, deltaA), Cd, Ie)
+
+
+if __name__ == '__main__':
+    #benchmark: drift of every assembly of the catalog at every trial length for a 4 story wall line
+    import pandas as pd
+
+    Ga = pd.read_csv('shearwall_database.csv')['Ga(OSB)(kips/in)'].values
+    storyForce = np.array([6.0, 5.0, 3.5, 2.0])
+    storyHeight = np.full(4, 10.0)
+    for numberOfLengths in (100, 10000):
+        length = np.linspace(4.0, 40.0, numberOfLengths)
+        start = time.perf_counter()
+        unitShear, tension = demand(storyForce, length[:, None], storyHeight)
+        rod = rod_elongation(tension, storyHeight, 0.606)
+        result = drift(storyForce, length[:, None, None], storyHeight, 2*5.25*1.5*1.3e6, Ga[:, None],
+                       5.25*1.5, 19, 12, 0.1, 4.0, 1.0, tension[:, None, :], rod[:, None, :])
+        elapsed = time.perf_counter() - start
+        print('%8d drifts (lengths x assemblies x floors) in %.4f s' % (result.size, elapsed))
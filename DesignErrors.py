@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to define the errors of a design that cannot be completed. It does not import any
+other module of the package, so that the shear wall, tie-down and diaphragm designs and the batch
+drivers can all import it at the top of the file.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+class DesignInfeasibleError(ValueError):
+    """
+    Raised when a floor of a wall line cannot be designed, with the governing reason:
+    'strength', 'tie-down', 'drift', 'length cap', 'iteration cap', 'stalled' or 'diaphragm'
+    """
+
+    def __init__(self, reason, message, wall_line_name = None, level = None):
+        self.reason = reason
+        self.message = message
+        self.wall_line_name = wall_line_name
+        self.level = level
+        super().__init__('%s @ level %s: %s (%s)' % (wall_line_name, level, message, reason))
+
+    def __reduce__(self):
+        #rebuilt from its own arguments, so that it can be sent back from a process pool worker
+        return (type(self), (self.reason, self.message, self.wall_line_name, self.level))
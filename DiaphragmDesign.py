@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design the floor diaphragms of the cases for both directions at once.
+
+The diaphragm force of every floor follows ASCE 7-16 Section 12.10.1.1 (Equation 12.10-1) with the
+ELF story forces and floor weights of the case:
+    Fpx = sum(Fi, i >= x) / sum(wi, i >= x) * wpx,   0.2 SDS Ie wpx <= Fpx <= 0.4 SDS Ie wpx
+The diaphragm is taken as a simple span between the wall lines, so the largest unit shear is the
+reaction at either end over the depth of the diaphragm parallel to the load:
+    v = Fpx / (2 * depth)
+The diaphragm database (diaphragm_database.csv, columns 'Assembly' and 'LRFD(klf)', rows ordered by
+increasing capacity) is indexed like the tie-down database: the running maximum of the capacities
+is searched with one binary search for every floor, direction and case at once.
+
+The case inputs (ELF story forces, floor weights, SDS, Ie and plan dimensions) are taken from the
+ComputeSeismicForce objects the wall line design already reads (see
+VectorizedDesign.stack_wall_lines), so designing the diaphragms does not read the case again.
+
+Arrays are top floor first, same as the designs.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+import pandas as pd
+
+from DesignErrors import DesignInfeasibleError
+
+
+#load directions of the diaphragm design, in the order of the last axis of the arrays
+DIRECTIONS = ('X', 'Z')
+
+#stacked building inputs, one row per case, see building_inputs()
+BUILDING_INPUTS = ('storyForce', 'floorWeights', 'SDS', 'Ie', 'depth')
+
+
+class DiaphragmCatalog():
+
+    def __init__(self, diaphragm_database):
+        """
+        :param diaphragm_database: dataframe of diaphragm_database.csv, rows ordered by increasing capacity
+        """
+        missing = [name for name in ('Assembly', 'LRFD(klf)') if name not in diaphragm_database.columns]
+        if missing:
+            raise ValueError('The diaphragm database is missing required column(s): %s' % ', '.join(missing))
+        self.assembly = diaphragm_database['Assembly'].values
+        self.lrfd = diaphragm_database['LRFD(klf)'].values.astype(float)
+        self.numRows = len(self.lrfd)
+        if self.numRows == 0:
+            raise ValueError('The diaphragm database is empty')
+        #D/C ratio -> running maximum of the adjusted capacities
+        self._search_cache = {}
+
+    def __len__(self):
+        return self.numRows
+
+    def search_capacity(self, DCRatio = None):
+        """
+        This method is used to get the running maximum of the (D/C adjusted) capacities. The first row
+        whose running maximum meets a demand is the first row whose own capacity meets it
+        :return: running maximum of the adjusted capacities. Units: klf
+        """
+        DCRatio = None if DCRatio is None else float(DCRatio)
+        if DCRatio not in self._search_cache:
+            capacity = self.lrfd if DCRatio is None else self.lrfd * DCRatio
+            self._search_cache[DCRatio] = np.maximum.accumulate(capacity)
+        return self._search_cache[DCRatio]
+
+    def select(self, unitShear, DCRatio = None):
+        """
+        This method is used to select the first diaphragm of the database for any number of demands at once
+        :param unitShear: unit shear demand, any shape. Units: klf
+        :param DCRatio: target D/C ratio, None for no adjustment
+        :return: row of the diaphragm for every demand; len(self) where no diaphragm meets the demand
+        """
+        return np.searchsorted(self.search_capacity(DCRatio), unitShear, side = 'left')
+
+
+def diaphragm_force(storyForce, floorWeights, SDS, Ie):
+    """
+    This function is used to get the diaphragm design force of every floor, ASCE 7-16 Equation 12.10-1
+    :param storyForce: ELF story force of every floor, shape (..., floors), top floor first. Units: kips
+    :param floorWeights: seismic weight of every floor, same shape. Units: kips
+    :param SDS: design spectral acceleration at short periods, broadcast to (...)
+    :param Ie: importance factor, broadcast to (...)
+    :return: diaphragm force of every floor, shape of storyForce. Units: kips
+    """
+    storyForce = np.asarray(storyForce, dtype = float)
+    floorWeights = np.asarray(floorWeights, dtype = float)
+    #forces and weights of the floor and the floors above, summed from the top
+    Fpx = np.cumsum(storyForce, axis = -1)/np.cumsum(floorWeights, axis = -1) * floorWeights
+    SDSIe = (np.asarray(SDS, dtype = float) * Ie)[..., None]
+    return np.clip(Fpx, 0.2*SDSIe*floorWeights, 0.4*SDSIe*floorWeights)
+
+
+def building_inputs(ModelClass):
+    """
+    This function is used to get the inputs of the diaphragm design of a case from a ComputeSeismicForce
+    that has already read it (only the plan dimensions are read, the first time they are used)
+    :param ModelClass: ComputeSeismicForce of any wall line of the case
+    :return: dictionary of the BUILDING_INPUTS of the case, top floor first
+    """
+    numFloors = int(ModelClass.numberOfStories)
+    SDP = ModelClass.SeismicDesignParameter
+    #the plan dimensions are model inputs, listed first story first
+    depth = np.column_stack([np.broadcast_to(np.atleast_1d(ModelClass.floorMaximumXDimension).astype(float), (numFloors,)),
+                             np.broadcast_to(np.atleast_1d(ModelClass.floorMaximumZDimension).astype(float), (numFloors,))])
+    return {'storyForce': np.ravel(SDP['story_force'])[:numFloors].astype(float),
+            'floorWeights': np.atleast_1d(ModelClass.floorWeights)[:numFloors].astype(float),
+            'SDS': float(SDP['SDS']),
+            'Ie': float(SDP['Ie']),
+            'depth': depth[::-1]}
+
+
+class DiaphragmDesign():
+
+    def __init__(self, buildings, DCRatio = None):
+        """
+        :param buildings: stacked building inputs, one row per case: 'storyForce' and 'floorWeights'
+                          (cases, floors), 'SDS' and 'Ie' (cases,) and 'depth' (cases, floors, directions),
+                          the depth of the diaphragm parallel to the load in DIRECTIONS order (Units: ft).
+                          See building_inputs() and VectorizedDesign.stack_wall_lines()
+        :param DCRatio: target D/C ratio of the diaphragms, None for no adjustment
+        """
+        self.buildings = buildings
+        self.DCRatio = DCRatio
+        self.numCases, self.numFloors = np.shape(buildings['storyForce'])
+        self.levels = self.numFloors - np.arange(self.numFloors)
+
+        self.DiaphragmForce()
+        self.DiaphragmSelection()
+
+    def DiaphragmForce(self):
+        """
+        This method is used to get the diaphragm force and the unit shear of every floor and direction
+        :return: unit shear, shape (cases, floors, directions). Units: klf
+        """
+        self.Fpx = diaphragm_force(self.buildings['storyForce'], self.buildings['floorWeights'],
+                                   self.buildings['SDS'], self.buildings['Ie'])
+        self.unitShear = self.Fpx[:, :, None]/(2*np.asarray(self.buildings['depth'], dtype = float))
+        return self.unitShear
+
+    def DiaphragmSelection(self):
+        """
+        This method is used to select the diaphragm of every floor and direction of every case
+        :return: dictionary of arrays, shape (cases, floors, directions): 'assembly' (row in the
+                 database, -1 where no diaphragm meets the demand), 'capacity' and 'D/C Ratio'
+        """
+        #imported here so that the database is only read when diaphragms are designed
+        from global_variables import diaphragm_catalog
+
+        row = diaphragm_catalog.select(self.unitShear, self.DCRatio)
+        met = row < len(diaphragm_catalog)
+        capacity = np.where(met, diaphragm_catalog.lrfd[np.minimum(row, len(diaphragm_catalog) - 1)], np.nan)
+        self.feasible = met.all(axis = (1, 2))
+        self.design = {'assembly': np.where(met, row, -1),
+                       'capacity': capacity,
+                       'D/C Ratio': self.unitShear/capacity}
+        return self.design
+
+    def to_dataframe(self, case = 0):
+        """
+        This method is used to tabulate the diaphragm design of one case
+        :param case: position of the case in the stacked building inputs
+        :return: dataframe with one row per floor and direction (first rows are the top floor)
+        """
+        from global_variables import diaphragm_catalog
+
+        if not self.feasible[case]:
+            floor, direction = np.argwhere(self.design['assembly'][case] < 0)[0]
+            raise DesignInfeasibleError('diaphragm', 'unit shear demand %.3f klf exceeds the largest diaphragm capacity'
+                                        % self.unitShear[case, floor, direction], '%s direction diaphragm'
+                                        % DIRECTIONS[direction], self.levels[floor])
+        row = self.design['assembly'][case].ravel()
+        return pd.DataFrame({'Diaphragm Assembly': diaphragm_catalog.assembly[row],
+                             'level': np.repeat(self.levels, len(DIRECTIONS)),
+                             'direction': np.tile(DIRECTIONS, self.numFloors),
+                             'Fpx(kips)': np.repeat(self.Fpx[case], len(DIRECTIONS)),
+                             'Unit Shear(klf)': self.unitShear[case].ravel(),
+                             'LRFD(klf)': self.design['capacity'][case].ravel(),
+                             'D/C Ratio': self.design['D/C Ratio'][case].ravel()})
+
+
+def stack_buildings(buildings):
+    """
+    This function is used to stack the inputs of cases returned by building_inputs()
+    :param buildings: list of dictionaries, one per case
+    :return: dictionary of the stacked BUILDING_INPUTS, one row per case
+    """
+    return {name: np.array([building[name] for building in buildings], dtype = float) for name in BUILDING_INPUTS}
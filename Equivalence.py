@@ -0,0 +1,623 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to check that the design paths give the same designs as the original design.
+
+The reference is the design of the baseline commit (BASELINE_COMMIT), which selects the shear walls
+and tie-downs with DataFrame filters of the databases, not with the indexed catalogs of the paths
+below. Its designs are pinned in a JSON file for the default buildings (see pin_baseline()), or
+computed by running its modules from a checkout of that commit (see checkout_baseline()).
+
+Random synthetic buildings are written to disk with the same folders and files as a real case. Every
+wall line is designed with each path:
+    'per-object'            FinalShearWallDesign building a new DesignShearWall for every trial
+    'reuse floors'          FinalShearWallDesign re-evaluating the floors read once
+    'pruned catalog'        same, on the dominance-pruned catalog view (ShearWallCatalog.pareto_index)
+    'vectorized step'       StackedShearWallDesign, lengths stepped 0.5 ft at a time
+    'vectorized bisection'  StackedShearWallDesign, lengths bisected
+    'warm start'            FinalShearWallDesign re-evaluating the floors, with the warm start of the final pass
+    'vectorized warm start' StackedShearWallDesign, lengths stepped 0.5 ft at a time, with the warm start
+All the paths except the pruned catalog and the bisection (which can change the design, see
+ShearWallCatalog.py and VectorizedDesign.py) are expected to give the original designs: the warm
+start only keeps the designs of the iteration when no floor of the wall line changed its length. The
+original design has no length or iteration caps, so a wall line it cannot design raises or never
+ends; such a wall line is pinned as BASELINE_FAILURE and is not compared. The original tie-down
+design also raises for every wall line with a user defined tie-down D/C ratio, so the compared
+buildings have none (see synthetic_units()). The outputs are compared field by field (reason of an
+infeasible design, wall length, assemblies, drift, D/C ratio, rod elongation) with the tolerances of
+FIELDS, and the time of every path is compared with the per-object time.
+
+Running this file checks the pinned buildings and prints the report; "python Equivalence.py --pin"
+designs them again with the baseline commit and rewrites the pinned designs.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from DesignErrors import DesignInfeasibleError
+from FinalShearWallDesign import FinalShearWallDesign
+from LoadDistribution import list_wall_lines
+from VectorizedDesign import stack_wall_lines, StackedShearWallDesign
+
+
+#commit of the original design, the reference of the design paths
+BASELINE_COMMIT = '8cbc8ae'
+
+#designs of the original design for the default buildings and flags of the harness, see pin_baseline()
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'golden', 'baseline_designs.json')
+
+#reason pinned for a wall line the original design raised on or did not design in time
+BASELINE_FAILURE = 'baseline failure'
+
+#(reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag) combinations of the
+#pinned designs: no flag, the detailing filter, the redesign length and the user defined D/C ratio
+#(FinalShearWallDesign passes the first two to the drift check swapped, see BatchDesign.design_flags())
+DESIGN_FLAGS = ((False, False, False, False), (True, False, False, False), (False, True, False, False),
+                (False, False, False, True))
+
+#design path name -> (engine, options). The engine is 'per-floor' (FinalShearWallDesign) or 'stacked'
+#(StackedShearWallDesign)
+FAST_PATHS = {'per-object': ('per-floor', {'reuseFloors': False}),
+              'reuse floors': ('per-floor', {'warmStart': False}),
+              'pruned catalog': ('per-floor', {'warmStart': False, 'pruneCatalog': True}),
+              'vectorized step': ('stacked', {'warmStart': False, 'lengthSearch': 'step'}),
+              'vectorized bisection': ('stacked', {'warmStart': False, 'lengthSearch': 'bisection'}),
+              'warm start': ('per-floor', {'warmStart': True}),
+              'vectorized warm start': ('stacked', {'warmStart': True, 'lengthSearch': 'step'})}
+
+#compared output -> (relative tolerance, absolute tolerance); None for an exact comparison
+FIELDS = {'reason': None,
+          'wallLength': (0.0, 1e-9),
+          'Shear Wall Assembly': None,
+          'Tie-down Assembly': None,
+          'Drift(in)': (1e-6, 1e-9),
+          'D/C Ratio': (1e-6, 1e-9),
+          'Rod Elongation(in)': (1e-6, 1e-9)}
+
+#preferred (panel thickness, nail size, nail spacing) of the synthetic wall lines, blank for no preference
+DETAILING = (('', '', ''), ('15/32in', '', '4'), ('', '10d', ''), ('7/16in', '8d', '6'))
+
+
+def write_txt(path, value):
+    #strings are written as they are (the detailing files are read with open().read())
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    if isinstance(value, str):
+        with open(path, 'w') as myfile:
+            myfile.write(value)
+    else:
+        np.savetxt(path, np.atleast_1d(value), fmt = '%.6g')
+
+
+def write_synthetic_building(BaseDirectory, numFloors, seed = 0, numWallLines = 2, tieDownDCRatio = True):
+    """
+    This function is used to write a random building with the input files read by the design
+    :param BaseDirectory: folder of the building, created if needed
+    :param numFloors: number of stories
+    :param seed: seed of the random inputs
+    :param numWallLines: number of wall lines in each direction
+    :param tieDownDCRatio: False for no user defined tie-down D/C ratio on any wall line (True sets it on
+                           random wall lines); the random inputs do not depend on it
+    :return: BaseDirectory
+    """
+    random = np.random.default_rng(seed)
+    storyHeight = random.choice([108.0, 120.0, 144.0])
+    floorWeights = random.uniform(200.0, 700.0, numFloors)
+    geometry = os.path.join(BaseDirectory, 'Geometry')
+    write_txt(os.path.join(geometry, 'numberOfStories.txt'), np.array([numFloors]))
+    write_txt(os.path.join(geometry, 'storyHeights.txt'), np.full(numFloors, storyHeight))
+    write_txt(os.path.join(geometry, 'floorMaximumXDimension.txt'), np.full(numFloors, random.uniform(60.0, 160.0)))
+    write_txt(os.path.join(geometry, 'floorMaximumZDimension.txt'), np.full(numFloors, random.uniform(40.0, 100.0)))
+    write_txt(os.path.join(geometry, 'floorAreas.txt'), np.full(numFloors, 6000.0))
+    write_txt(os.path.join(BaseDirectory, 'Loads', 'floorWeights.txt'), floorWeights)
+    write_analysis_inputs(BaseDirectory, numFloors)
+
+    seismic = os.path.join(BaseDirectory, 'SeismicDesignParameters')
+    write_txt(os.path.join(seismic, 'SiteClass.txt'), str(random.choice(['C', 'D'])))
+    write_txt(os.path.join(seismic, 'Ss.txt'), np.array([random.uniform(0.75, 2.0)]))
+    write_txt(os.path.join(seismic, 'S1.txt'), np.array([random.uniform(0.3, 0.8)]))
+    write_txt(os.path.join(seismic, 'R.txt'), np.array([6.5]))
+    write_txt(os.path.join(seismic, 'I.txt'), np.array([random.choice([1.0, 1.25])]))
+    write_txt(os.path.join(seismic, 'Cd.txt'), np.array([4.0]))
+    write_txt(os.path.join(seismic, 'TL.txt'), np.array([8.0]))
+
+    for direction in ('X', 'Z'):
+        for line in range(numWallLines):
+            wallLine = os.path.join(BaseDirectory, '%s_direction_wall' % direction, 'line%d' % (line + 1))
+            geometry = os.path.join(wallLine, 'Geometry')
+            write_txt(os.path.join(geometry, 'storyHeights.txt'), np.full(numFloors, storyHeight/12))
+            write_txt(os.path.join(geometry, 'tribuitaryWidth.txt'), np.array([30.0]))
+            write_txt(os.path.join(geometry, 'tribuitaryLength.txt'), np.array([50.0]))
+            write_txt(os.path.join(geometry, 'floorAreas.txt'), np.full(numFloors, 6000.0))
+            write_txt(os.path.join(geometry, 'wallsPerLine.txt'), np.array([random.choice([1.0, 2.0])]))
+            write_txt(os.path.join(geometry, 'allowableDrift.txt'), np.array([random.choice([0.007, 0.01, 0.015, 0.02])]))
+            write_txt(os.path.join(geometry, 'tribuitaryLoadRatio.txt'), np.array([0.5]))
+            write_txt(os.path.join(wallLine, 'Loads', 'shearWall_load.txt'), np.full(numFloors, 0.3))
+
+            materials = os.path.join(wallLine, 'MaterialProperties')
+            panelThickness, nailSize, nailSpacing = DETAILING[random.integers(len(DETAILING))]
+            write_txt(os.path.join(materials, 'initial_moisture_content.txt'), np.array([random.choice([15.0, 19.0])]))
+            write_txt(os.path.join(materials, 'final_moisture_content.txt'), np.array([12.0]))
+            write_txt(os.path.join(materials, 'wood_modulusOfElasticity.txt'), np.array([random.choice([1400000, 1700000])]))
+            write_txt(os.path.join(materials, 'preferred_panel_thickness.txt'), panelThickness)
+            write_txt(os.path.join(materials, 'preferred_nail_size.txt'), nailSize)
+            write_txt(os.path.join(materials, 'preferred_nail_spacing.txt'), nailSpacing)
+            write_txt(os.path.join(materials, 'takeUpDeflection.txt'), np.full(numFloors, random.choice([0.02, 0.04, 0.08])))
+            write_txt(os.path.join(materials, 'chordArea.txt'), np.full(numFloors, random.choice([25.375, 38.5])))
+            write_txt(os.path.join(materials, 'userDefinedDriftLimit.txt'), np.array([0.015]))
+            write_txt(os.path.join(materials, 'userDefinedDCRatio.txt'), np.array([0.8]))
+            tieDownFlag = random.integers(2)
+            write_txt(os.path.join(materials, 'userDefinedDCRatioFlag_TieDown.txt'),
+                      np.array([tieDownFlag if tieDownDCRatio else 0]))
+            write_txt(os.path.join(materials, 'userDefinedDCRatio_TieDown.txt'), np.array([0.8]))
+            #story force per wall line, largest at the top floor
+            write_txt(os.path.join(materials, 'Fx_ToTestTheCode.txt'),
+                      np.sort(random.uniform(3.0, 16.0, numFloors))[::-1])
+    return BaseDirectory
+
+
+def write_analysis_inputs(BaseDirectory, numFloors):
+    """
+    This function is used to write the inputs of the OpenSees model and analyses of a building (leaning
+    columns, wood panels, live loads, analysis parameters, Pinching4 materials). The wall line design
+    does not use them, but the original design reads them (see BASELINE_COMMIT)
+    :param BaseDirectory: folder of the building
+    :param numFloors: number of stories
+    """
+    geometry = os.path.join(BaseDirectory, 'Geometry')
+    write_txt(os.path.join(geometry, 'leaningColumnNodesOpenSeesTags.txt'), np.arange(1, numFloors + 2))
+    write_txt(os.path.join(geometry, 'leaningColumnNodesXCoordinates.txt'), np.full(numFloors + 1, 50.0))
+    write_txt(os.path.join(geometry, 'leaningColumnNodesZCoordinates.txt'), np.full(numFloors + 1, 50.0))
+    for direction in ('X', 'Z'):
+        write_txt(os.path.join(geometry, 'numberOf%sDirectionWoodPanels.txt' % direction), np.full(numFloors, 2))
+        for coordinate in ('X', 'Z'):
+            path = os.path.join(geometry, '%sDirectionWoodPanels%sCoordinates.txt' % (direction, coordinate))
+            np.savetxt(path, np.tile([10.0, 60.0], (numFloors, 1)), fmt = '%.6g')
+        panels = os.path.join(BaseDirectory, 'StructuralProperties', '%sWoodPanels' % direction)
+        write_txt(os.path.join(panels, 'length.txt'), np.full(numFloors, 10.0))
+        write_txt(os.path.join(panels, 'height.txt'), np.full(numFloors, 10.0))
+        write_txt(os.path.join(panels, 'Pinching4MaterialNumber.txt'), np.ones(numFloors))
+    write_txt(os.path.join(BaseDirectory, 'Loads', 'liveLoads.txt'), np.full(numFloors, 0.0003))
+    write_txt(os.path.join(BaseDirectory, 'Loads', 'leaningcolumnLoads.txt'), np.full(numFloors, 500.0))
+
+    static = os.path.join(BaseDirectory, 'AnalysisParameters', 'StaticAnalysis')
+    write_txt(os.path.join(static, 'PushoverIncrementSize.txt'), np.array([0.01]))
+    write_txt(os.path.join(static, 'PushoverXDrift.txt'), np.array([0.1]))
+    write_txt(os.path.join(static, 'PushoverZDrift.txt'), np.array([0.1]))
+    dynamic = os.path.join(BaseDirectory, 'AnalysisParameters', 'DynamicAnalysis')
+    write_txt(os.path.join(dynamic, 'CollapseDriftLimit.txt'), np.array([0.1]))
+    write_txt(os.path.join(dynamic, 'DemolitionDriftLimit.txt'), np.array([0.01]))
+    write_txt(os.path.join(dynamic, 'dampingModel.txt'), 'Rayleigh')
+    write_txt(os.path.join(dynamic, 'dampingRatio.txt'), np.array([0.05]))
+
+    materials = os.path.join(BaseDirectory, 'StructuralProperties', 'Pinching4Materials')
+    for name in ('materialNumber', 'd1', 'd2', 'd3', 'd4', 'f1', 'f2', 'f3', 'f4', 'gD1', 'gDlim', 'gK1',
+                 'gKlim', 'rDisp', 'rForce', 'uForce'):
+        write_txt(os.path.join(materials, '%s.txt' % name), np.array([1.0]))
+
+
+def per_floor_outcome(design):
+    """
+    :param design: FinalShearWallDesign, or the DesignInfeasibleError it raised
+    :return: dictionary of the compared outputs (see FIELDS), one value per floor
+    """
+    if isinstance(design, DesignInfeasibleError):
+        return {'reason': design.reason}
+    outcome = {'reason': None, 'wallLength': np.asarray(design.finalWallLength, dtype = float)}
+    for name in ('Shear Wall Assembly', 'Drift(in)', 'D/C Ratio'):
+        outcome[name] = design.sw_final_design[name].values
+    for name in ('Tie-down Assembly', 'Rod Elongation(in)'):
+        outcome[name] = design.tiedown_final_design[name].values
+    return outcome
+
+
+def stacked_outcome(design, case):
+    """
+    :param design: StackedShearWallDesign
+    :param case: position of the wall line in the stacked inputs
+    :return: dictionary of the compared outputs (see FIELDS), one value per floor
+    """
+    if not design.feasible[case]:
+        return {'reason': design.reason[case]}
+    sw_design, tiedown_design = design.sw_design(case), design.tiedown_design(case)
+    outcome = {'reason': None, 'wallLength': design.iterationWallLength[case].astype(float)}
+    for name in ('Shear Wall Assembly', 'Drift(in)', 'D/C Ratio'):
+        outcome[name] = sw_design[name].values
+    for name in ('Tie-down Assembly', 'Rod Elongation(in)'):
+        outcome[name] = tiedown_design[name].values
+    return outcome
+
+
+def diff_outcomes(reference, outcome, fields = FIELDS):
+    """
+    This function is used to compare two outcomes of a wall line field by field
+    :return: list of (field, reference value, value) of the fields that differ
+    """
+    if reference.get('reason') == BASELINE_FAILURE:
+        #the original design raised or did not end (it has no caps), so there is nothing to compare with
+        return []
+    differences = []
+    for name, tolerance in fields.items():
+        if name not in reference and name not in outcome:
+            continue
+        expected, value = reference.get(name), outcome.get(name)
+        if expected is None or value is None or tolerance is None:
+            same = np.array_equal(np.asarray(expected, dtype = object), np.asarray(value, dtype = object))
+        else:
+            same = np.shape(expected) == np.shape(value) and np.allclose(value, expected, rtol = tolerance[0],
+                                                                          atol = tolerance[1], equal_nan = True)
+        if not same:
+            differences.append((name, expected, value))
+    return differences
+
+
+def short_text(value, width = 48):
+    #values of the mismatch report, cut to fit a line
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    text = str(value)
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+#script run by run_baseline() in a separate process whose working directory is the checkout of the
+#original design, so that its modules and databases are found first. It reads the request (designs,
+#wall length, time limit, output file) from stdin
+BASELINE_WORKER = '''
+import contextlib, io, json, os, signal, sys
+from FinalShearWallDesign import FinalShearWallDesign
+
+request = json.load(sys.stdin)
+
+def stop(signum, frame):
+    #raised again every second in case the error is caught inside a library call
+    signal.alarm(1)
+    raise TimeoutError('no design in %d s' % request['timeout'])
+
+signal.signal(signal.SIGALRM, stop)
+directory = os.getcwd()
+outcomes = {}
+for key, unit, flags in request['designs']:
+    caseID, BaseDirectory, direction, wall_line_name, numFloors = unit
+    signal.alarm(request['timeout'])
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            design = FinalShearWallDesign(caseID, BaseDirectory, direction, request['wallLength'], 0, numFloors,
+                                          wall_line_name, *flags, False)
+        sw, td = design.sw_final_design, design.tiedown_final_design
+        outcome = {'reason': None, 'wallLength': [float(value) for value in design.finalWallLength],
+                   'Shear Wall Assembly': [str(value) for value in sw['Shear Wall Assembly']],
+                   'Drift(in)': [float(value) for value in sw['Drift(in)']],
+                   'D/C Ratio': [float(value) for value in sw['D/C Ratio']],
+                   'Tie-down Assembly': [str(value) for value in td['Tie-down Assembly']],
+                   'Rod Elongation(in)': [float(value) for value in td['Rod Elongation(in)']]}
+    except Exception as error:
+        outcome = {'reason': request['failure'], 'message': '%s: %s' % (type(error).__name__, error)}
+    finally:
+        signal.alarm(0)
+        os.chdir(directory)
+    outcomes[key] = outcome
+with open(request['output'], 'w') as myfile:
+    json.dump(outcomes, myfile)
+'''
+
+
+def checkout_baseline(directory, commit = BASELINE_COMMIT):
+    """
+    This function is used to extract the modules and databases of the original design from the git
+    history of this repository
+    :param directory: folder the files are written to, created if needed
+    :param commit: commit of the original design
+    :return: directory
+    """
+    repository = os.path.dirname(os.path.abspath(__file__))
+    archive = subprocess.run(['git', '-C', repository, 'archive', '--format=tar', commit], check = True,
+                             stdout = subprocess.PIPE).stdout
+    os.makedirs(directory, exist_ok = True)
+    with tarfile.open(fileobj = io.BytesIO(archive)) as myfile:
+        myfile.extractall(directory)
+    return directory
+
+
+def run_baseline(baselineDirectory, designs, wallLength, timeout = 120):
+    """
+    This function is used to design wall lines with the original design, in a separate process
+    :param baselineDirectory: folder with the modules and databases of the original design, see checkout_baseline()
+    :param designs: list of (key, unit, flags), see unit_key()
+    :param wallLength: starting wall length of every design. Units: ft
+    :param timeout: largest design time of a wall line. Units: s
+    :return: dictionary of key: outcome (see per_floor_outcome(), with lists for the arrays); a wall line
+             that raised or was not designed in time has the reason BASELINE_FAILURE and the message
+    """
+    #the original global_variables reads the diaphragm database when it is imported, but the shear wall
+    #and tie-down designs do not use it, so an empty database is written when there is none to copy
+    diaphragms = os.path.join(baselineDirectory, 'diaphragm_database.csv')
+    database = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'diaphragm_database.csv')
+    if not os.path.exists(diaphragms):
+        if os.path.exists(database):
+            shutil.copy(database, diaphragms)
+        else:
+            pd.DataFrame(columns = ['Assembly', 'LRFD(klf)']).to_csv(diaphragms, index = False)
+    #the modules of the original design are found first, the other modules (e.g. MaterialProperties) after them
+    environment = dict(os.environ, PYTHONPATH = os.pathsep.join([baselineDirectory] + [path for path in sys.path if path]))
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'outcomes.json')
+        request = {'designs': [(key, list(unit), list(flags)) for key, unit, flags in designs],
+                   'wallLength': wallLength, 'timeout': int(timeout), 'failure': BASELINE_FAILURE, 'output': output}
+        subprocess.run([sys.executable, '-c', BASELINE_WORKER], input = json.dumps(request), text = True,
+                       cwd = baselineDirectory, env = environment, check = True)
+        with open(output, 'r') as myfile:
+            return json.load(myfile)
+
+
+def unit_key(flags, unit, buildingSeed):
+    """
+    :param flags: (reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag)
+    :param unit: (caseID, BaseDirectory, direction, wall line name, number of floors)
+    :param buildingSeed: seed the building of the unit was written with, see write_synthetic_building()
+    :return: key of the design of a wall line, which does not depend on the folder of the building
+    """
+    return 'seed%d/%d floors/%s/%s/%s' % (buildingSeed, unit[4], unit[2], unit[3],
+                                          ''.join('1' if flag else '0' for flag in flags))
+
+
+def synthetic_units(BaseDirectory, numBuildings, floors = (2, 3, 4), seed = 0, tieDownDCRatio = False):
+    """
+    This function is used to write random buildings and list their wall lines
+    :param BaseDirectory: folder where the buildings are written
+    :param numBuildings: number of buildings
+    :param floors: numbers of stories drawn for the buildings
+    :param seed: seed of the random buildings
+    :param tieDownDCRatio: True to set a user defined tie-down D/C ratio on random wall lines, which the
+                           original design cannot design (its tie-down design raises a KeyError)
+    :return: list of design units (caseID, BaseDirectory, direction, wall line name, number of floors),
+             and dictionary of caseID: seed of its building
+    """
+    random = np.random.default_rng(seed)
+    units = []
+    buildingSeeds = {}
+    for building in range(numBuildings):
+        caseID = 'case%d' % (building + 1)
+        numFloors = int(random.choice(floors))
+        buildingSeeds[caseID] = int(random.integers(2**31))
+        folder = write_synthetic_building(os.path.join(BaseDirectory, caseID), numFloors, seed = buildingSeeds[caseID],
+                                          tieDownDCRatio = tieDownDCRatio)
+        units += [(caseID, folder, direction, name, numFloors)
+                  for direction in ('X', 'Z') for name in list_wall_lines(folder, direction)]
+    return units, buildingSeeds
+
+
+def pin_baseline(path = GOLDEN_PATH, baselineDirectory = None, numBuildings = 8, floors = (2, 3, 4), seed = 0,
+                 wallLength = 4.0, designFlags = DESIGN_FLAGS, timeout = 60):
+    """
+    This function is used to design the random buildings with the original design and pin the designs
+    in a JSON file, the reference of EquivalenceHarness
+    :param path: JSON file of the pinned designs
+    :param baselineDirectory: folder with the original design, None to extract it from BASELINE_COMMIT
+    :param timeout: largest design time of a wall line. Units: s
+    Other parameters are the same as EquivalenceHarness
+    :return: dictionary of key: outcome, see run_baseline()
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        units, buildingSeeds = synthetic_units(os.path.join(directory, 'buildings'), numBuildings, floors, seed)
+        if baselineDirectory is None:
+            baselineDirectory = checkout_baseline(os.path.join(directory, 'baseline'))
+        designs = [(unit_key(flags, unit, buildingSeeds[unit[0]]), unit, flags)
+                   for flags in designFlags for unit in units]
+        outcomes = run_baseline(baselineDirectory, designs, wallLength, timeout)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+    with open(path, 'w') as myfile:
+        json.dump({'commit': BASELINE_COMMIT, 'wallLength': wallLength, 'outcomes': outcomes}, myfile,
+                  indent = 1, sort_keys = True)
+    return outcomes
+
+
+class EquivalenceHarness():
+
+    def __init__(self, BaseDirectory, numBuildings = 8, floors = (2, 3, 4), seed = 0, wallLength = 4.0,
+                 designFlags = DESIGN_FLAGS, paths = FAST_PATHS, fields = FIELDS, reference = GOLDEN_PATH):
+        """
+        :param BaseDirectory: folder where the synthetic buildings are written
+        :param numBuildings: number of random buildings
+        :param floors: numbers of stories drawn for the buildings
+        :param seed: seed of the random buildings
+        :param wallLength: starting wall length of every design. Units: ft
+        :param designFlags: (reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag)
+                            combinations, every wall line is designed with each of them
+        :param paths: design paths to compare with the original design, see FAST_PATHS
+        :param fields: compared outputs and their tolerances, see FIELDS
+        :param reference: JSON file of the pinned original designs (see pin_baseline()), or folder with the
+                          original design to design the wall lines with (see checkout_baseline())
+        """
+        self.BaseDirectory = BaseDirectory
+        self.numBuildings = numBuildings
+        self.floors = floors
+        self.seed = seed
+        self.wallLength = wallLength
+        self.designFlags = designFlags
+        self.paths = paths
+        self.fields = fields
+        self.reference = reference
+
+        self.generate()
+        self.run()
+        self.compare()
+
+    def generate(self):
+        """
+        This method is used to write the random buildings
+        :return: list of design units (caseID, BaseDirectory, direction, wall line name, number of floors)
+        """
+        self.units, self.buildingSeeds = synthetic_units(self.BaseDirectory, self.numBuildings, self.floors, self.seed)
+        self.keys = [unit_key(flags, unit, self.buildingSeeds[unit[0]]) for flags in self.designFlags for unit in self.units]
+        return self.units
+
+    def baseline(self):
+        """
+        This method is used to get the original design of every wall line, from the pinned designs or by
+        running the original design
+        :return: list of outcomes, in the order of (flags, unit)
+        """
+        if os.path.isdir(self.reference):
+            start = time.perf_counter()
+            designs = [(key, unit, flags) for key, (flags, unit) in
+                       zip(self.keys, ((flags, unit) for flags in self.designFlags for unit in self.units))]
+            pinned = run_baseline(self.reference, designs, self.wallLength)
+            self.elapsed['baseline'] = time.perf_counter() - start
+        else:
+            with open(self.reference, 'r') as myfile:
+                golden = json.load(myfile)
+            if golden['wallLength'] != self.wallLength:
+                raise ValueError('%s was pinned with a starting wall length of %s ft, not %s ft'
+                                 % (self.reference, golden['wallLength'], self.wallLength))
+            pinned = golden['outcomes']
+        missing = [key for key in self.keys if key not in pinned]
+        if missing:
+            raise ValueError('%d designs (e.g. %s) are not pinned in %s, see pin_baseline()'
+                             % (len(missing), missing[0], self.reference))
+        return [pinned[key] for key in self.keys]
+
+    def design_per_floor(self, unit, flags, options):
+        #FinalShearWallDesign changes the working directory and prints its progress
+        caseID, BaseDirectory, direction, wall_line_name, numFloors = unit
+        directory = os.getcwd()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return FinalShearWallDesign(caseID, BaseDirectory, direction, self.wallLength, 0, numFloors,
+                                            wall_line_name, *flags, False, **options)
+        except DesignInfeasibleError as error:
+            return error
+        finally:
+            os.chdir(directory)
+
+    def run(self):
+        """
+        This method is used to design every wall line with every path and get its original design
+        :return: dictionary of path name: list of outcomes, in the order of (flags, unit)
+        """
+        self.outcomes = {name: [] for name in self.paths}
+        self.elapsed = dict.fromkeys(self.outcomes, 0.0)
+        #time of the original design, only known when it is run
+        self.elapsed['baseline'] = np.nan
+        self.outcomes['baseline'] = self.baseline()
+
+        #the stacked engine designs the wall lines with the same number of floors together
+        groups = {}
+        for k, unit in enumerate(self.units):
+            groups.setdefault(unit[4], []).append(k)
+        directory = os.getcwd()
+        start = time.perf_counter()
+        stacked = {numFloors: stack_wall_lines([self.units[k][:4] for k in group]) for numFloors, group in groups.items()}
+        os.chdir(directory)
+        readTime = time.perf_counter() - start
+
+        for flags in self.designFlags:
+            for name, (engine, options) in self.paths.items():
+                if engine != 'per-floor':
+                    continue
+                for unit in self.units:
+                    start = time.perf_counter()
+                    design = self.design_per_floor(unit, flags, options)
+                    self.elapsed[name] += time.perf_counter() - start
+                    self.outcomes[name].append(per_floor_outcome(design))
+
+            for name, (engine, options) in self.paths.items():
+                if engine != 'stacked':
+                    continue
+                outcomes = [None]*len(self.units)
+                self.elapsed[name] += readTime
+                for numFloors, group in groups.items():
+                    start = time.perf_counter()
+                    design = StackedShearWallDesign(stacked[numFloors], self.wallLength, *flags, **options)
+                    self.elapsed[name] += time.perf_counter() - start
+                    for case, k in enumerate(group):
+                        outcomes[k] = stacked_outcome(design, case)
+                self.outcomes[name] += outcomes
+        return self.outcomes
+
+    def compare(self):
+        """
+        This method is used to diff every path against the original design
+        :return: dataframe with one row per differing field: path, flags, unit, field, baseline and path values
+        """
+        rows = []
+        keys = [(flags, unit) for flags in self.designFlags for unit in self.units]
+        for name in self.paths:
+            for (flags, unit), reference, outcome in zip(keys, self.outcomes['baseline'], self.outcomes[name]):
+                for field, expected, value in diff_outcomes(reference, outcome, self.fields):
+                    rows.append({'path': name, 'flags': flags, 'caseID': unit[0], 'direction': unit[2],
+                                 'wall line': unit[3], 'field': field, 'baseline': expected, 'value': value})
+        self.mismatches = pd.DataFrame(rows, columns = ['path', 'flags', 'caseID', 'direction', 'wall line',
+                                                        'field', 'baseline', 'value'])
+        return self.mismatches
+
+    def getSummary(self):
+        """
+        :return: dataframe with one row per path: designs compared, designs that differ, fields that
+                 differ, time and speed-up over the per-object path
+        """
+        numDesigns = len(self.designFlags)*len(self.units)
+        #wall lines the original design could not design are not compared
+        compared = numDesigns - sum(outcome['reason'] == BASELINE_FAILURE for outcome in self.outcomes['baseline'])
+        reference = self.elapsed.get('per-object', np.nan)
+        rows = []
+        for name in self.paths:
+            mismatches = self.mismatches[self.mismatches['path'] == name]
+            rows.append({'path': name, 'designs': compared,
+                         'mismatched designs': len(mismatches.drop_duplicates(['flags', 'caseID', 'direction', 'wall line'])),
+                         'mismatched fields': ', '.join(sorted(set(mismatches['field']))),
+                         'time(s)': self.elapsed[name],
+                         'speed-up': reference/max(self.elapsed[name], 1e-12)})
+        return pd.DataFrame(rows)
+
+    def report(self, maxMismatches = 10):
+        """
+        This method is used to print the summary and the first mismatches of every path
+        :return: summary dataframe, see getSummary()
+        """
+        summary = self.getSummary()
+        failures = sum(outcome['reason'] == BASELINE_FAILURE for outcome in self.outcomes['baseline'])
+        print('%d wall lines of %d buildings, %d flag combinations, original design (%s) %s; %d designs it '
+              'could not design are not compared'
+              % (len(self.units), self.numBuildings, len(self.designFlags), BASELINE_COMMIT,
+                 'pinned in %s' % self.reference if np.isnan(self.elapsed['baseline'])
+                 else '%.2f s' % self.elapsed['baseline'], failures))
+        print(summary.to_string(index = False))
+        for name in self.paths:
+            mismatches = self.mismatches[self.mismatches['path'] == name]
+            if len(mismatches):
+                print('\n%s: first mismatches' % name)
+                shown = mismatches.head(maxMismatches).drop(columns = 'path')
+                for column in ('baseline', 'value'):
+                    shown[column] = shown[column].map(lambda value: short_text(value))
+                print(shown.to_string(index = False))
+        return summary
+
+
+if __name__ == '__main__':
+    #check the design paths on the pinned buildings, or pin them again with --pin
+    if sys.argv[1:] == ['--pin']:
+        outcomes = pin_baseline()
+        print('%d designs of %s pinned in %s, %d it could not design'
+              % (len(outcomes), BASELINE_COMMIT, GOLDEN_PATH,
+                 sum(outcome['reason'] == BASELINE_FAILURE for outcome in outcomes.values())))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            harness = EquivalenceHarness(directory)
+            harness.report()
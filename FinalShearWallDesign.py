@@ -19,12 +19,17 @@ __author__ = 'Laxman Dahal'
 import pandas as pd
 import numpy as np
 
-from ShearWallDriftCheck_perFloor import ShearWallDriftCheck
+from ShearWallClass_perFloor import ShearWallFloorDesign
+from ShearWallDriftCheck_perFloor import ShearWallDriftCheck, FloorDriftCheck, MAX_WALL_LENGTH, MAX_ITERATIONS
+from global_variables import tiedown_catalog
 
 class FinalShearWallDesign():
     
     def __init__(self, caseID, BaseDirectory, direction, wallLength, counter, numFloors, wall_line_name, 
-                 reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag ):
+                 reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag,
+                 pruneCatalog = False, loadRatio = None, warmStart = False, reuseFloors = True,
+                 maxWallLength = MAX_WALL_LENGTH, maxIterations = MAX_ITERATIONS, maxRodChanges = None,
+                 ELFDemandTag = False):
         
         self.caseID = caseID
         self.BaseDirectory = BaseDirectory 
@@ -38,17 +43,38 @@ class FinalShearWallDesign():
         
         self.iterateFlag = iterateFlag
         self.counter = counter
+        self.pruneCatalog = pruneCatalog
+        #tribuitary load ratio per floor overriding tribuitaryLoadRatio.txt, None to read the file
+        self.loadRatio = loadRatio
+        #if True, the final pass reuses the per floor designs of DesignIteration when no floor changed its
+        #length (the final pass would then repeat the same walk), otherwise every floor is designed again
+        self.warmStart = warmStart
+        #if True, every floor is read once and re-evaluated for each trial (see ShearWallFloorDesign),
+        #otherwise every trial builds a new DesignShearWall
+        self.reuseFloors = reuseFloors
+        #hard caps of the redesign loop of every floor; a floor that cannot be designed within them
+        #raises a DesignInfeasibleError with the governing reason
+        self.maxWallLength = maxWallLength
+        self.maxIterations = maxIterations
+        #largest number of rod changes of the continuous tie-down run, None for the lightest rod of every floor
+        self.maxRodChanges = maxRodChanges
+        #if True, the demand is the ELF story force computed from the site (SeismicDesignParameters folder)
+        #instead of Fx_ToTestTheCode.txt
+        self.ELFDemandTag = ELFDemandTag
         
         self.userDefinedDriftTag = userDefinedDriftTag 
         self.wallLength = wallLength
         self.wallLengthHistory = []
         self.driftHistory = []
+        #number of shear wall designs evaluated by the drift check (both passes)
+        self.designSteps = 0
         
         #instantiate all the class methods so that the attributes can be used as class variables 
         self.DesignIteration()
         self.FinalDesign()
+        self.design_continuous_rod(self.maxRodChanges)
 
-        # self.getOpenSeesTag()
+        self.getOpenSeesTag()
         
         
     def DesignIteration(self):
@@ -56,12 +82,29 @@ class FinalShearWallDesign():
         temp1 = []
         temp2 = []
         d = []
+        #per floor drift check, reused by the final pass
+        self.iterationDesigns = []
+        #re-evaluable floor designs, shared by both passes
+        self.floors = []
         for i in range(0, self.numFloors):
-            sw = ShearWallDriftCheck(self.caseID, self.BaseDirectory, self.direction, self.wallLength,
-                                     self.counter, i, self.wall_line_name, self.userDefinedDetailingTag,               
-                                     self.reDesignTag, self.userDefinedDriftTag, self.userDefinedDCTag, 
-                                     self.iterateFlag)
+            if self.reuseFloors:
+                #the two flags are passed in the same positions as to ShearWallDriftCheck below
+                self.floors.append(ShearWallFloorDesign(self.caseID, self.BaseDirectory, self.direction, i,
+                                                        self.wall_line_name, self.reDesignTag,
+                                                        self.userDefinedDriftTag, self.userDefinedDCTag,
+                                                        self.pruneCatalog, self.loadRatio,
+                                                        ELFDemandTag = self.ELFDemandTag))
+                sw = FloorDriftCheck(self.floors[i], self.wallLength, self.counter, self.userDefinedDetailingTag,
+                                     self.iterateFlag, None, self.maxWallLength, self.maxIterations)
+            else:
+                sw = ShearWallDriftCheck(self.caseID, self.BaseDirectory, self.direction, self.wallLength,
+                                         self.counter, i, self.wall_line_name, self.userDefinedDetailingTag,               
+                                         self.reDesignTag, self.userDefinedDriftTag, self.userDefinedDCTag, 
+                                         self.iterateFlag, self.pruneCatalog, self.loadRatio, None,
+                                         self.maxWallLength, self.maxIterations, self.ELFDemandTag)
 
+            self.designSteps += len(sw.driftHistory)
+            self.iterationDesigns.append(sw)
             temp1.append(sw.wallName.sw_dict)
             temp2.append(sw.wallName.td_dict)
             d.append(sw.getFinalWallLength())
@@ -80,37 +123,119 @@ class FinalShearWallDesign():
         
         temp1 = []
         temp2 = []
+        #per floor story force and deflection of one wall, used to get the wall line stiffness
+        force = []
+        deflection = []
+        #per floor tension demand and story height of the tie-down run
+        tension = []
+        height = []
         self.lenss = np.array([max(self.finalWallLength)])
         # self.lenss = np.array([25, 29, 25])
         for i in range(0, self.numFloors):
-            sw = ShearWallDriftCheck(self.caseID, self.BaseDirectory, self.direction, max(self.lenss),
-                                      self.counter, i, self.wall_line_name, self.userDefinedDetailingTag,               
-                                      self.reDesignTag, self.userDefinedDriftTag, self.userDefinedDCTag, 
-                                      self.iterateFlag)
+            if self.warmStart and max(self.lenss) == self.wallLength:
+                #no floor changed its length, so the iteration already designed this floor at the final
+                #wall length with the initial flags; a floor that ends at the final length after a longer
+                #wall was tried was designed with the redesign demand (+0.5 ft) and is designed again.
+                #The catalog walk always starts from the lightest assembly: an assembly selected at a
+                #shorter length can be heavier than the one a longer wall needs
+                sw = self.iterationDesigns[i]
+            elif self.reuseFloors:
+                sw = FloorDriftCheck(self.floors[i], max(self.lenss), self.counter, self.userDefinedDetailingTag,
+                                     self.iterateFlag, None, self.maxWallLength, self.maxIterations)
+                self.designSteps += len(sw.driftHistory)
+            else:
+                sw = ShearWallDriftCheck(self.caseID, self.BaseDirectory, self.direction, max(self.lenss),
+                                          self.counter, i, self.wall_line_name, self.userDefinedDetailingTag,               
+                                          self.reDesignTag, self.userDefinedDriftTag, self.userDefinedDCTag, 
+                                          self.iterateFlag, self.pruneCatalog, self.loadRatio, None,
+                                          self.maxWallLength, self.maxIterations, self.ELFDemandTag)
+                self.designSteps += len(sw.driftHistory)
             temp1.append(sw.wallName.sw_dict)
             temp2.append(sw.wallName.td_dict)
+            force.append(float(sw.wallName.story_force_per_wall))
+            deflection.append(float(np.ravel(sw.wallName.sw_deflection)[0]))
+            tension.append(float(sw.wallName.tension_demand))
+            height.append(float(sw.wallName.story_height))
+        self.wallsPerLine = sw.wallName.wallsPerLine
+        self.tension_demand = np.array(tension)
+        self.story_height = np.array(height)
+        self.lastFloor = sw.wallName
+        self.story_force_per_wall = np.array(force)
+        self.sw_deflection = np.array(deflection)
+        #detailing filter the shear walls were selected from (None if no detailing was imposed)
+        if sw.wallName.userDefinedDetailingTag:
+            self.detailing = (sw.wallName.panelThickness, sw.wallName.nailSize, sw.wallName.nailSpacing)
+        else:
+            self.detailing = None
         self.sw_final_design = pd.DataFrame(temp1)
         
         self.tiedown_final_design = pd.DataFrame(temp2)
         
         return self.sw_final_design, self.tiedown_final_design
+    
+    def design_continuous_rod(self, maxRodChanges = None):
+        """
+        This method is used to design the tie-down rods of all floors as one continuous run, with the
+        rod elongation and shrinkage accumulated from the base (see TieDownDesign.TieDownCatalog)
+        :param maxRodChanges: largest number of rod changes over the height, None for the lightest rod of every floor
+        :return: dataframe of the continuous rod design, one row per floor (first row is the top floor)
+        """
+        floor = self.lastFloor
+        DCRatio = floor.userDefinedDCRatio_TieDown if floor.userDefinedDCRatioFlag_TieDown else None
+        self.rodDesign = tiedown_catalog.design(self.tension_demand, self.story_height, DCRatio,
+                                                initialMoisture = floor.initial_moisture_content,
+                                                finalMoisture = floor.final_moisture_content,
+                                                maxRodChanges = maxRodChanges, wall_line_name = self.wall_line_name,
+                                                levels = self.sw_final_design['level'].values)
+        self.continuous_rod_design = tiedown_catalog.to_dataframe(self.rodDesign, self.sw_final_design['level'].values)
+        return self.continuous_rod_design
+    
+    def getLineStiffness(self):
+        """
+        This method returns the secant stiffness of the whole wall line at the design force,
+        i.e. number of walls * story force per wall / three-term wall deflection
+        :return: wall line stiffness for each floor (first entry is the top floor). Units: kips/in
+        """
+        return self.wallsPerLine * self.story_force_per_wall / self.sw_deflection
         
         
         
-    # # #define a getter method that returns the openseestag for wall modelling in opensees
-    # def getOpenSeesTag(self):
-        
-    #     tag = self.sw_final_design['OpenSees Tag'].values  #extracts tag as an row array 
-    #     tag = tag[::-1]  #changes first row from roof to first story
-    #     tag = tag.reshape((-1,1))  #converts row array to column array
-    #     tag = np.repeat(tag, 2, axis = 0)  #repeat array for x, and y coordinates per Zhengxiang's code input
-    #     # tag = np.tile(tag, (1,2)) #double the rows 
-    #     self.tagPerWall = np.tile(tag, (1, int(self.wallName.wallsPerLine)))
-    #     return self.tagPerWall
-    #     # return self.tag
-        
-        
-        
-        
+    #define a getter method that returns the openseestag for wall modelling in opensees
+    def getOpenSeesTag(self):
         
-        
\ No newline at end of file
+        tag = self.sw_final_design['OpenSees Tag'].to_numpy().astype(int)  #extracts tag as an row array 
+        tag = tag[::-1]  #changes first row from roof to first story
+        tag = tag.reshape((-1,1))  #converts row array to column array
+        tag = np.repeat(tag, 2, axis = 0)  #repeat array for x, and y coordinates per Zhengxiang's code input
+        self.tagPerWall = np.tile(tag, (1, int(self.wallsPerLine)))
+        return self.tagPerWall
+
+
+
+def compare_pruned_design(caseID, BaseDirectory, direction, wallLength, counter, numFloors, wall_line_name, 
+                          reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag):
+    """
+    This function is used to compare the design of a wall line using the full shear wall catalog
+    with the design using the dominance-pruned catalog (see ShearWallCatalog.pareto_index)
+    Parameters are the same as FinalShearWallDesign
+    :return: a dataframe comparing the final design of every level, and a dictionary with the number
+             of catalog rows removed and the number of design steps of each run
+    """
+    from global_variables import shearwall_catalog
+    
+    designs = {}
+    for pruned in (False, True):
+        designs[pruned] = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, counter, numFloors, 
+                                               wall_line_name, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, 
+                                               userDefinedDCTag, iterateFlag, pruneCatalog = pruned)
+    full, pruned = designs[False], designs[True]
+    
+    columns = ['level', 'Shear Wall Assembly', 'LRFD(klf)', 'Ga(k/in)', 'Drift(in)', 'D/C Ratio']
+    comparison = full.sw_final_design[columns].merge(pruned.sw_final_design[columns], on = 'level', 
+                                                     suffixes = (' (full)', ' (pruned)'))
+    comparison['Same Assembly'] = comparison['Shear Wall Assembly (full)'] == comparison['Shear Wall Assembly (pruned)']
+    
+    summary = shearwall_catalog.pruning_summary(full.detailing)
+    summary.update({'wall length (full)': max(full.lenss), 'wall length (pruned)': max(pruned.lenss), 
+                    'design steps (full)': full.designSteps, 'design steps (pruned)': pruned.designSteps})
+    return comparison, summary
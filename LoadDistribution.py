@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to distribute the story forces to the shear wall lines of a building with a
+rigid diaphragm, based on the stiffness of the designed walls, and to iterate the wall line design
+and the load distribution until they agree.
+
+For every story, the diaphragm has three degrees of freedom (translation in X, translation in Z
+and rotation). The wall lines are springs at their line coordinate, so the diaphragm stiffness
+matrix of all stories is assembled and solved at once with numpy.linalg.solve for four load cases:
+story force in X and in Z, each applied at the center of mass shifted by +/- the accidental
+eccentricity (ASCE 7-16 Section 12.8.4.2). The load ratio of a wall line is the largest share of
+the story force it takes in its own direction.
+
+Each wall line needs a coordinate, read from lineCoordinate.txt in its Geometry folder:
+the Z coordinate of X direction wall lines and the X coordinate of Z direction wall lines, in the
+same units as floorMaximumXDimension.txt and floorMaximumZDimension.txt.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+
+import numpy as np
+
+from FinalShearWallDesign import FinalShearWallDesign
+
+
+def list_wall_lines(BaseDirectory, direction):
+    """
+    This function is used to list the wall line folders of a building in one direction
+    :param direction: 'X' or 'Z'
+    :return: sorted list of wall line names
+    """
+    directory = os.path.join(BaseDirectory, '%s_direction_wall' % direction)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+
+
+def rigid_diaphragm_load_ratio(stiffness, coordinate, isXLine, centerOfMass, eccentricity):
+    """
+    This function is used to compute the share of the story force taken by each wall line of a
+    rigid diaphragm, including accidental torsion
+    :param stiffness: wall line stiffness, shape (number of stories, number of lines). Units: kips/in
+    :param coordinate: line coordinate (Z for X lines, X for Z lines), shape (number of lines,)
+    :param isXLine: boolean array, True for wall lines resisting X direction forces, shape (number of lines,)
+    :param centerOfMass: (X, Z) coordinate of the center of mass, each a scalar or shape (number of stories,)
+    :param eccentricity: accidental eccentricity for (X, Z) direction forces, i.e. 5% of the
+                         building dimension perpendicular to the force, each a scalar or shape (number of stories,)
+    :return: load ratio of each wall line, shape (number of stories, number of lines)
+    """
+    stiffness = np.atleast_2d(stiffness)
+    numStories = stiffness.shape[0]
+    coordinate = np.asarray(coordinate, dtype = float)
+    isXLine = np.asarray(isXLine, dtype = bool)
+    xCM, zCM = [np.broadcast_to(np.asarray(c, dtype = float), (numStories,)) for c in centerOfMass]
+    eX, eZ = [np.broadcast_to(np.asarray(e, dtype = float), (numStories,)) for e in eccentricity]
+
+    #kinematics of each line: deformation = B @ (uX, uZ, theta)
+    #X line at z: uX - theta*z; Z line at x: uZ + theta*x
+    B = np.zeros((len(coordinate), 3))
+    B[isXLine, 0] = 1.0
+    B[isXLine, 2] = -coordinate[isXLine]
+    B[~isXLine, 1] = 1.0
+    B[~isXLine, 2] = coordinate[~isXLine]
+
+    #diaphragm stiffness matrix of every story: sum over lines of k * B^T B
+    K = np.einsum('sl,li,lj->sij', stiffness, B, B)
+
+    #unit story force in X at z = zCM +/- eX, and in Z at x = xCM +/- eZ
+    F = np.zeros((numStories, 4, 3))
+    F[:, 0:2, 0] = 1.0
+    F[:, 0, 2] = -(zCM + eX)
+    F[:, 1, 2] = -(zCM - eX)
+    F[:, 2:4, 1] = 1.0
+    F[:, 2, 2] = xCM + eZ
+    F[:, 3, 2] = xCM - eZ
+
+    u = np.linalg.solve(K[:, None, :, :], F[..., None])[..., 0]
+    lineForce = stiffness[:, None, :] * np.einsum('sci,li->scl', u, B)
+
+    #each line keeps the governing eccentricity of the force in its own direction
+    return np.where(isXLine[None, :], lineForce[:, 0:2, :].max(axis = 1), lineForce[:, 2:4, :].max(axis = 1))
+
+
+class CoupledLoadDistribution():
+
+    def __init__(self, caseID, BaseDirectory, wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, directions = ('X', 'Z'), tolerance = 0.01,
+                 maxIterations = 10, accidentalEccentricity = 0.05, pruneCatalog = False):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every wall line
+        :param directions: directions whose wall lines take part in the distribution
+        :param tolerance: convergence limit on the change of any load ratio between two iterations
+        :param maxIterations: maximum number of design <-> distribution iterations
+        :param accidentalEccentricity: accidental eccentricity as a fraction of the building dimension
+        """
+        self.caseID = caseID
+        self.BaseDirectory = BaseDirectory
+        self.wallLength = wallLength
+        self.counter = counter
+        self.numFloors = numFloors
+        self.reDesignTag = reDesignTag
+        self.userDefinedDetailingTag = userDefinedDetailingTag
+        self.userDefinedDriftTag = userDefinedDriftTag
+        self.userDefinedDCTag = userDefinedDCTag
+        self.iterateFlag = iterateFlag
+        self.pruneCatalog = pruneCatalog
+
+        self.directions = directions
+        self.tolerance = tolerance
+        self.maxIterations = maxIterations
+        self.accidentalEccentricity = accidentalEccentricity
+
+        #(direction, wall line, rounded load ratio) -> FinalShearWallDesign
+        self.designCache = {}
+        self.ratioHistory = []
+        self.converged = False
+
+        self.read_line_inputs()
+        self.solve()
+
+    def read_line_inputs(self):
+        """
+        This method is used to read the wall lines, their coordinates and tribuitary load ratios,
+        and the floor dimensions used for the center of mass and accidental eccentricity
+        """
+        self.lines = [(direction, name) for direction in self.directions
+                      for name in list_wall_lines(self.BaseDirectory, direction)]
+        self.isXLine = np.array([direction == 'X' for direction, name in self.lines])
+
+        coordinate = []
+        ratio = []
+        for direction, name in self.lines:
+            geometry = os.path.join(self.BaseDirectory, '%s_direction_wall' % direction, name, 'Geometry')
+            coordinate.append(float(np.genfromtxt(os.path.join(geometry, 'lineCoordinate.txt'))))
+            ratio.append(np.broadcast_to(np.genfromtxt(os.path.join(geometry, 'tribuitaryLoadRatio.txt')),
+                                         (self.numFloors,)))
+        self.coordinate = np.array(coordinate)
+        #load ratio of each line, shape (number of stories, number of lines)
+        self.loadRatio = np.array(ratio, dtype = float).T
+
+        geometry = os.path.join(self.BaseDirectory, 'Geometry')
+        xDimension = np.broadcast_to(np.genfromtxt(os.path.join(geometry, 'floorMaximumXDimension.txt')), (self.numFloors,))
+        zDimension = np.broadcast_to(np.genfromtxt(os.path.join(geometry, 'floorMaximumZDimension.txt')), (self.numFloors,))
+        #center of mass is taken at the center of the floor plan
+        self.centerOfMass = (xDimension/2, zDimension/2)
+        #X direction forces are shifted along Z and vice versa
+        self.eccentricity = (self.accidentalEccentricity*zDimension, self.accidentalEccentricity*xDimension)
+
+    def design_line(self, direction, wall_line_name, loadRatio):
+        """
+        This method is used to design a wall line for a given load ratio. Designs are cached on the
+        load ratio rounded to the convergence tolerance, so an iteration that does not change a
+        line's load ratio does not redesign it
+        :return: FinalShearWallDesign
+        """
+        decimals = max(int(np.ceil(-np.log10(self.tolerance))), 0)
+        key = (direction, wall_line_name, tuple(np.round(loadRatio, decimals)))
+        if key not in self.designCache:
+            self.designCache[key] = FinalShearWallDesign(self.caseID, self.BaseDirectory, direction, self.wallLength,
+                                                         self.counter, self.numFloors, wall_line_name, self.reDesignTag,
+                                                         self.userDefinedDetailingTag, self.userDefinedDriftTag,
+                                                         self.userDefinedDCTag, self.iterateFlag, self.pruneCatalog,
+                                                         np.array(key[2]))
+        return self.designCache[key]
+
+    def solve(self):
+        """
+        This method is used to iterate design and load distribution until the load ratios converge
+        :return: converged load ratio of each wall line, shape (number of stories, number of lines)
+        """
+        for iteration in range(self.maxIterations):
+            self.ratioHistory.append(self.loadRatio)
+            self.designs = [self.design_line(direction, name, self.loadRatio[:, j])
+                            for j, (direction, name) in enumerate(self.lines)]
+            self.stiffness = np.array([design.getLineStiffness() for design in self.designs]).T
+            newRatio = rigid_diaphragm_load_ratio(self.stiffness, self.coordinate, self.isXLine,
+                                                  self.centerOfMass, self.eccentricity)
+            change = np.max(np.abs(newRatio - self.loadRatio))
+            self.loadRatio = newRatio
+            if change <= self.tolerance:
+                self.converged = True
+                break
+
+        #final designs for the converged load ratios
+        self.designs = [self.design_line(direction, name, self.loadRatio[:, j])
+                        for j, (direction, name) in enumerate(self.lines)]
+        self.iterations = iteration + 1
+        return self.loadRatio
+
+    def getFinalDesign(self):
+        """
+        :return: dictionary of (direction, wall line name): (shear wall design, tie-down design)
+        """
+        return {line: (design.sw_final_design, design.tiedown_final_design)
+                for line, design in zip(self.lines, self.designs)}
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to calculate seismic story forces with the modal response spectrum analysis
+(MRSA) procedure per ASCE 07-16 section 12.9.1, as an alternative to the ELF procedure in
+ShearForces.py.
+
+The building is modelled as a shear building: one lumped mass per floor and one spring per story.
+All functions work on a batch of buildings at once (leading array axis), so a regional study can
+analyze many buildings in one call. Buildings in one call must have the same number of stories.
+Story arrays follow the same order as the design inputs: the first entry is the top floor.
+
+Units: kips, inches, seconds
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+
+
+#acceleration of gravity. Units: in/s^2
+GRAVITY = 386.1
+
+
+def design_response_spectrum(T, SDS, SD1, TL):
+    """
+    This function is used to compute the design response spectrum per ASCE 07-16 section 11.4.6
+    :param T: periods, any shape that broadcasts with the other parameters. Units: s
+    :param SDS: design spectral acceleration at short periods. Units: g
+    :param SD1: design spectral acceleration at 1 s. Units: g
+    :param TL: long-period transition period. Units: s
+    :return: design spectral acceleration Sa for each period. Units: g
+    """
+    T, SDS, SD1, TL = np.broadcast_arrays(*[np.asarray(x, dtype = float) for x in (T, SDS, SD1, TL)])
+    TS = SD1/SDS
+    T0 = 0.2*TS
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        Sa = np.where(T < T0, SDS*(0.4 + 0.6*T/T0),
+                      np.where(T <= TS, SDS,
+                               np.where(T <= TL, SD1/T, SD1*TL/T**2)))
+    return Sa
+
+
+def shear_building_stiffness(storyStiffness):
+    """
+    This function is used to assemble the stiffness matrix of a shear building
+    :param storyStiffness: story stiffness, shape (number of buildings, number of stories). Units: kips/in
+    :return: stiffness matrix, shape (number of buildings, number of stories, number of stories)
+    """
+    k = np.atleast_2d(np.asarray(storyStiffness, dtype = float))
+    numStories = k.shape[1]
+    #story i connects floor i to floor i+1 below it; the last story connects to the ground
+    K = np.zeros((k.shape[0], numStories, numStories))
+    diagonal = np.arange(numStories)
+    K[:, diagonal, diagonal] = k + np.concatenate([np.zeros((k.shape[0], 1)), k[:, :-1]], axis = 1)
+    K[:, diagonal[:-1], diagonal[1:]] = -k[:, :-1]
+    K[:, diagonal[1:], diagonal[:-1]] = -k[:, :-1]
+    return K
+
+
+def modal_analysis(floorWeights, storyStiffness, g = GRAVITY):
+    """
+    This function is used to solve the eigenvalue problem of a batch of shear buildings
+    :param floorWeights: floor seismic weight, shape (number of buildings, number of stories). Units: kips
+    :param storyStiffness: story stiffness, shape (number of buildings, number of stories). Units: kips/in
+    :return: dictionary with
+             'omega': circular frequencies, shape (buildings, modes), ascending. Units: rad/s
+             'period': periods, shape (buildings, modes). Units: s
+             'mode shape': mass normalized mode shapes, shape (buildings, stories, modes)
+             'participation factor': shape (buildings, modes)
+             'effective mass ratio': modal mass / total mass, shape (buildings, modes)
+    """
+    mass = np.atleast_2d(np.asarray(floorWeights, dtype = float))/g
+    K = shear_building_stiffness(storyStiffness)
+    #symmetric standard form: M^-1/2 K M^-1/2 v = w^2 v, phi = M^-1/2 v
+    invSqrtMass = 1/np.sqrt(mass)
+    A = K * invSqrtMass[:, :, None] * invSqrtMass[:, None, :]
+    omega2, v = np.linalg.eigh(A)
+    phi = v * invSqrtMass[:, :, None]
+    omega = np.sqrt(np.clip(omega2, 0, None))
+
+    participation = np.einsum('bs,bsm->bm', mass, phi)
+    effectiveMass = participation**2
+    return {'omega': omega,
+            'period': 2*np.pi/omega,
+            'mode shape': phi,
+            'participation factor': participation,
+            'effective mass ratio': effectiveMass/mass.sum(axis = 1, keepdims = True)}
+
+
+def cqc_correlation(omega, dampingRatio = 0.05):
+    """
+    This function is used to compute the modal correlation coefficients of the CQC rule
+    (Der Kiureghian, equal modal damping)
+    :param omega: circular frequencies, shape (buildings, modes)
+    :return: correlation coefficients, shape (buildings, modes, modes)
+    """
+    r = omega[:, None, :]/omega[:, :, None]
+    z = dampingRatio
+    return 8*z**2*(1 + r)*r**1.5/((1 - r**2)**2 + 4*z**2*r*(1 + r)**2)
+
+
+def modal_response_spectrum(floorWeights, storyStiffness, SDS, SD1, TL, R, Ie, combination = 'CQC',
+                            dampingRatio = 0.05, ELFBaseShear = None, g = GRAVITY):
+    """
+    This function is used to calculate the design story shears and story forces of a batch of
+    buildings with the modal response spectrum analysis.
+    :param floorWeights: floor seismic weight, shape (buildings, stories). Units: kips
+    :param storyStiffness: story stiffness, shape (buildings, stories). Units: kips/in
+    :param SDS, SD1, TL: design spectrum parameters, scalars or shape (buildings,)
+    :param R, Ie: response modification coefficient and importance factor, scalars or shape (buildings,)
+    :param combination: 'SRSS' or 'CQC' modal combination
+    :param dampingRatio: modal damping ratio used by CQC
+    :param ELFBaseShear: ELF base shear, scalar or shape (buildings,). If given, forces are scaled
+                         up so that the base shear is not less than it (ASCE 07-16 12.9.1.4.1)
+    :return: dictionary with the modal properties of modal_analysis() and
+             'story shear', 'story force': combined design values, shape (buildings, stories). Units: kips
+             'base shear': shape (buildings,). Units: kips
+             'scale factor': scaling applied to match the ELF base shear, shape (buildings,)
+    """
+    weights = np.atleast_2d(np.asarray(floorWeights, dtype = float))
+    modes = modal_analysis(weights, storyStiffness, g)
+    numBuildings = weights.shape[0]
+    column = lambda x: np.broadcast_to(np.asarray(x, dtype = float), (numBuildings,))[:, None]
+
+    Sa = design_response_spectrum(modes['period'], column(SDS), column(SD1), column(TL))
+    #modal floor forces F = phi * Gamma * m * Sa * g / (R/Ie), shape (buildings, stories, modes)
+    mass = weights/g
+    modalForce = mass[:, :, None] * modes['mode shape'] * (modes['participation factor'] * Sa * g
+                                                           / (column(R)/column(Ie)))[:, None, :]
+    #story shear: sum of the floor forces above, first floor is the top
+    modalShear = np.cumsum(modalForce, axis = 1)
+
+    if combination == 'SRSS':
+        storyShear = np.sqrt(np.sum(modalShear**2, axis = 2))
+    elif combination == 'CQC':
+        rho = cqc_correlation(modes['omega'], dampingRatio)
+        storyShear = np.sqrt(np.clip(np.einsum('bsi,bij,bsj->bs', modalShear, rho, modalShear), 0, None))
+    else:
+        raise ValueError('Modal combination must be SRSS or CQC, not %s' % combination)
+
+    scale = np.ones(numBuildings)
+    if ELFBaseShear is not None:
+        scale = np.maximum(1.0, column(ELFBaseShear)[:, 0]/storyShear[:, -1])
+        storyShear = storyShear*scale[:, None]
+
+    modes.update({'story shear': storyShear,
+                  'story force': np.diff(storyShear, axis = 1, prepend = 0),
+                  'base shear': storyShear[:, -1],
+                  'scale factor': scale})
+    return modes
+
+
+def story_stiffness_from_designs(designs):
+    """
+    This function is used to get the story stiffness of a building from its designed wall lines
+    :param designs: FinalShearWallDesign objects of all wall lines in one direction
+    :return: story stiffness, shape (stories,), first entry is the top story. Units: kips/in
+    """
+    return np.sum([design.getLineStiffness() for design in designs], axis = 0)
+
+
+def story_stiffness_from_pinching4(MaterialProperty, panelMaterial):
+    """
+    This function is used to get the initial story stiffness from the Pinching4 backbone
+    (f1/d1) of the wood panels of each story
+    :param MaterialProperty: MaterialProperty dictionary read by ComputeSeismicForce
+    :param panelMaterial: Pinching4 material number of each panel, shape (stories, panels).
+                          Material numbers that are not in the material list (e.g. 0) are skipped
+    :return: story stiffness, shape (stories,)
+    """
+    label = np.atleast_1d(MaterialProperty['MaterialLabel']).astype(int)
+    stiffness = np.atleast_1d(MaterialProperty['f1'])/np.atleast_1d(MaterialProperty['d1'])
+    order = np.argsort(label)
+    label, stiffness = label[order], stiffness[order]
+    panelMaterial = np.atleast_2d(panelMaterial).astype(int)
+    position = np.clip(np.searchsorted(label, panelMaterial), 0, len(label) - 1)
+    found = label[position] == panelMaterial
+    return np.where(found, stiffness[position], 0.0).sum(axis = 1)
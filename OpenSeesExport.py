@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to export the designed buildings as OpenSees model input folders.
+
+A model folder has the same layout as the building inputs read by ComputeSeismicForce (Geometry,
+Loads, AnalysisParameters, SeismicDesignParameters and StructuralProperties). The Pinching4 material
+number of every wood panel is replaced by the OpenSees Tag of the designed shear wall assembly, and
+the node tags of the panels are added to the Geometry folder. Files that do not depend on the design
+are hard linked to the base building when possible, so thousands of cases can be written in one run
+with little disk space. Cases are written one at a time as they are produced.
+
+The model input files list the first story first; the designs list the top story first.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+import shutil
+
+import numpy as np
+
+from Pushover import panel_material_from_designs
+
+
+#folders of the base building that are part of the model
+MODEL_FOLDERS = ('Geometry', 'Loads', 'AnalysisParameters', 'SeismicDesignParameters', 'StructuralProperties')
+
+#panel node tag offset of each direction: story*10000 + offset + panel*10 + 1 (bottom) or 2 (top)
+PANEL_TAG_OFFSET = {'X': 1000, 'Z': 3000}
+
+
+def panel_node_tags(numberOfPanels, direction):
+    """
+    This function is used to get the OpenSees node tags of the wood panels of one direction
+    :param numberOfPanels: number of panels of each story, first story first
+    :param direction: 'X' or 'Z'
+    :return: bottom and top node tags, each shape (stories, largest number of panels), 0 where a story
+             has fewer panels
+    """
+    numberOfPanels = np.atleast_1d(numberOfPanels).astype(int)
+    story = np.arange(1, len(numberOfPanels) + 1)[:, None]
+    panel = np.arange(1, max(numberOfPanels.max(), 1) + 1)[None, :]
+    exists = panel <= numberOfPanels[:, None]
+    bottom = np.where(exists, story*10000 + PANEL_TAG_OFFSET[direction] + panel*10 + 1, 0)
+    return bottom, np.where(exists, bottom + 1, 0)
+
+
+def model_panel_material(panelMaterial, numberOfPanels):
+    """
+    This function is used to put designed panel materials in the model layout
+    :param panelMaterial: OpenSees Tag of each designed panel, shape (stories, panels), top story first
+                          (see Pushover.panel_material_from_designs)
+    :param numberOfPanels: number of panels of each story in the model, first story first
+    :return: panel material, shape (stories, largest number of panels), first story first, 0 where a
+             story has fewer panels
+    """
+    material = np.atleast_2d(panelMaterial)[::-1].astype(int)
+    numberOfPanels = np.atleast_1d(numberOfPanels).astype(int)
+    if material.shape[0] != len(numberOfPanels):
+        raise ValueError('The designs have %d stories, the model has %d' % (material.shape[0], len(numberOfPanels)))
+    if material.shape[1] < numberOfPanels.max():
+        raise ValueError('The designs have %d walls per story, the model needs %d'
+                         % (material.shape[1], numberOfPanels.max()))
+    material = material[:, :numberOfPanels.max()]
+    return np.where(np.arange(material.shape[1])[None, :] < numberOfPanels[:, None], material, 0)
+
+
+class OpenSeesModelExport():
+
+    def __init__(self, BaseDirectory, outputDirectory, link = True):
+        """
+        :param BaseDirectory: directory of the base building inputs
+        :param outputDirectory: directory where a model folder is written for every case
+        :param link: if True, files that do not depend on the design are hard linked instead of copied
+        """
+        self.BaseDirectory = os.path.abspath(BaseDirectory)
+        self.outputDirectory = os.path.abspath(outputDirectory)
+        self.link = link
+        self.numberOfCases = 0
+
+        self.read_base_model()
+
+    def read_base_model(self):
+        """
+        This method is used to list the base building files and read the panel counts once for all cases
+        """
+        self.baseFiles = []
+        for folder in MODEL_FOLDERS:
+            for root, dirs, files in os.walk(os.path.join(self.BaseDirectory, folder)):
+                dirs.sort()
+                self.baseFiles.extend(os.path.relpath(os.path.join(root, name), self.BaseDirectory)
+                                      for name in sorted(files))
+        geometry = os.path.join(self.BaseDirectory, 'Geometry')
+        self.numberOfPanels = {direction: np.atleast_1d(np.genfromtxt(os.path.join(
+            geometry, 'numberOf%sDirectionWoodPanels.txt' % direction))).astype(int) for direction in ('X', 'Z')}
+        self.panelTags = {direction: panel_node_tags(self.numberOfPanels[direction], direction)
+                          for direction in ('X', 'Z')}
+
+    def place_file(self, relativePath, caseDirectory):
+        #hard link a base file into the case folder, or copy it when linking is not possible
+        source = os.path.join(self.BaseDirectory, relativePath)
+        target = os.path.join(caseDirectory, relativePath)
+        os.makedirs(os.path.dirname(target), exist_ok = True)
+        if os.path.exists(target):
+            os.remove(target)
+        if self.link:
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, target)
+
+    def export_case(self, caseID, XPanelMaterial, ZPanelMaterial):
+        """
+        This method is used to write the model folder of one case
+        :param caseID: name of the case folder
+        :param XPanelMaterial, ZPanelMaterial: OpenSees Tag of each designed panel, shape (stories, panels),
+                                               top story first
+        :return: path of the case folder
+        """
+        caseDirectory = os.path.join(self.outputDirectory, str(caseID))
+        material = {'X': XPanelMaterial, 'Z': ZPanelMaterial}
+        designed = ['StructuralProperties/%sWoodPanels/Pinching4MaterialNumber.txt' % direction for direction in ('X', 'Z')]
+        for relativePath in self.baseFiles:
+            if relativePath.replace(os.sep, '/') not in designed:
+                self.place_file(relativePath, caseDirectory)
+
+        for direction in ('X', 'Z'):
+            panelDirectory = os.path.join(caseDirectory, 'StructuralProperties', '%sWoodPanels' % direction)
+            os.makedirs(panelDirectory, exist_ok = True)
+            np.savetxt(os.path.join(panelDirectory, 'Pinching4MaterialNumber.txt'),
+                       model_panel_material(material[direction], self.numberOfPanels[direction]), fmt = '%d')
+            bottom, top = self.panelTags[direction]
+            np.savetxt(os.path.join(caseDirectory, 'Geometry', '%sDirectionWoodPanelsBotTag.txt' % direction), bottom, fmt = '%d')
+            np.savetxt(os.path.join(caseDirectory, 'Geometry', '%sDirectionWoodPanelsTopTag.txt' % direction), top, fmt = '%d')
+        self.numberOfCases += 1
+        return caseDirectory
+
+    def export_designs(self, caseID, XDesigns, ZDesigns):
+        """
+        This method is used to write the model folder of one case from its wall line designs
+        :param XDesigns, ZDesigns: FinalShearWallDesign objects of the wall lines in each direction
+        :return: path of the case folder
+        """
+        return self.export_case(caseID, panel_material_from_designs(XDesigns), panel_material_from_designs(ZDesigns))
+
+    def export_cases(self, cases):
+        """
+        This method is used to write many cases. Cases are consumed one at a time, so a generator
+        keeps only one case in memory
+        :param cases: iterable of (caseID, XPanelMaterial, ZPanelMaterial)
+        :return: list of the case folders
+        """
+        return [self.export_case(caseID, XPanelMaterial, ZPanelMaterial) for caseID, XPanelMaterial, ZPanelMaterial in cases]
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to run a nonlinear static (pushover) analysis of designed wood frame buildings
+directly in NumPy, using the Pinching4 backbone (d1..d4, f1..f4) read in ShearForces.py.
+
+Each story is a multilinear spring: the sum of the Pinching4 backbones of its wood panels, either
+the panels of the building model (XPanelMaterial / ZPanelMaterial) or the panels of the designed
+wall lines (OpenSees Tag of the selected assemblies). The lateral load pattern is held constant and
+the analysis is controlled by the drift of the critical story (the story with the smallest strength
+for the load pattern): the critical story follows its backbone, including the post-peak branch,
+while the other stories follow their backbone up to the peak base shear and unload elastically
+after it. P-Delta effects are not included.
+
+All functions work on a batch of buildings at once (leading array axis). Buildings in one call must
+have the same number of stories; panels are padded with material number 0.
+Story arrays follow the same order as the design inputs: the first entry is the top story.
+
+Units: kips, inches, seconds
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+
+from ModalResponseSpectrum import GRAVITY, modal_analysis
+
+
+def material_index(MaterialProperty, panelMaterial):
+    """
+    This function is used to find the position of every panel's Pinching4 material in the material list
+    :param MaterialProperty: MaterialProperty dictionary read by ComputeSeismicForce
+    :param panelMaterial: Pinching4 material number of each panel, any shape
+    :return: position in the material arrays and a boolean mask of the panels whose material exists,
+             both the shape of panelMaterial
+    """
+    label = np.atleast_1d(MaterialProperty['MaterialLabel']).astype(int)
+    order = np.argsort(label)
+    panelMaterial = np.asarray(panelMaterial).astype(int)
+    position = np.clip(np.searchsorted(label[order], panelMaterial), 0, len(label) - 1)
+    return order[position], label[order][position] == panelMaterial
+
+
+def panel_backbone(MaterialProperty, panelMaterial):
+    """
+    This function is used to look up the Pinching4 backbone of every panel
+    :param MaterialProperty: MaterialProperty dictionary read by ComputeSeismicForce
+    :param panelMaterial: Pinching4 material number of each panel, shape (..., stories, panels).
+                          Material numbers that are not in the material list (e.g. 0) get a zero backbone
+    :return: backbone displacements and forces, each shape (..., stories, panels, 4). Units: in, kips
+    """
+    d = np.stack([np.atleast_1d(MaterialProperty['d%d' % i]) for i in range(1, 5)], axis = -1).astype(float)
+    f = np.stack([np.atleast_1d(MaterialProperty['f%d' % i]) for i in range(1, 5)], axis = -1).astype(float)
+    position, found = material_index(MaterialProperty, panelMaterial)
+    #missing panels keep the displacements of a neighbouring material so that the slopes are defined
+    return d[position], np.where(found[..., None], f[position], 0.0)
+
+
+def story_backbone(panelD, panelF):
+    """
+    This function is used to add the panel backbones of each story into one multilinear story
+    backbone. A panel backbone goes through (0, 0), (d1, f1), ..., (d4, f4); beyond d4 its last
+    segment is extended and its force is not allowed to go below zero. The sum of the panels is
+    exact: every panel adds its corner points to the story backbone
+    :param panelD, panelF: panel backbones from panel_backbone(), shape (..., stories, panels, 4)
+    :return: corner displacements and forces of the story backbone, shape (..., stories, 5*panels),
+             and the slope after the last corner, shape (..., stories)
+    """
+    d0 = np.concatenate([np.zeros(panelD.shape[:-1] + (1,)), panelD], axis = -1)
+    f0 = np.concatenate([np.zeros(panelF.shape[:-1] + (1,)), panelF], axis = -1)
+    slope = np.diff(f0, axis = -1)/np.diff(d0, axis = -1)
+    #displacement where the extended last segment reaches zero force
+    softening = slope[..., -1] < 0
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        dZero = np.where(softening, panelD[..., -1] - panelF[..., -1]/slope[..., -1], panelD[..., -1])
+    corner = np.concatenate([d0[..., :-1], dZero[..., None]], axis = -1)
+    #change of slope at every corner of every panel
+    change = np.concatenate([slope[..., :1], np.diff(slope, axis = -1),
+                             np.where(softening, -slope[..., -1], 0.0)[..., None]], axis = -1)
+
+    corner = corner.reshape(corner.shape[:-2] + (-1,))
+    change = change.reshape(change.shape[:-2] + (-1,))
+    order = np.argsort(corner, axis = -1)
+    corner = np.take_along_axis(corner, order, axis = -1)
+    slopeAfter = np.cumsum(np.take_along_axis(change, order, axis = -1), axis = -1)
+    force = np.concatenate([np.zeros(corner.shape[:-1] + (1,)),
+                            np.cumsum(slopeAfter[..., :-1]*np.diff(corner, axis = -1), axis = -1)], axis = -1)
+    return corner, force, slopeAfter[..., -1]
+
+
+def row_searchsorted(a, v, side = 'left'):
+    """
+    This function is used to run numpy.searchsorted on every row of a batch with one call, by
+    shifting each row into its own interval
+    :param a: sorted rows, shape (..., n)
+    :param v: values to insert, shape (..., m), same leading shape as a
+    :return: insertion indices, shape (..., m)
+    """
+    a2 = a.reshape(-1, a.shape[-1])
+    v2 = v.reshape(-1, v.shape[-1])
+    low = np.minimum(a2.min(axis = 1), v2.min(axis = 1))[:, None]
+    scale = np.maximum(a2.max(axis = 1), v2.max(axis = 1))[:, None] - low
+    scale[scale <= 0] = 1.0
+    offset = 2.0*np.arange(a2.shape[0])[:, None]
+    index = np.searchsorted(((a2 - low)/scale + offset).ravel(), ((v2 - low)/scale + offset).ravel(), side)
+    return (index.reshape(v2.shape) - a2.shape[1]*np.arange(a2.shape[0])[:, None]).reshape(v.shape)
+
+
+def interpolate(x, xp, fp, side = 'right', searchRows = None):
+    """
+    This function is used to interpolate every row of a batch, like numpy.interp. Outside of xp the
+    end values are kept
+    :param x: points to evaluate, shape (..., m)
+    :param xp: ascending rows, shape (..., n)
+    :param fp: values at xp, shape (..., n)
+    :param side: 'left' to use the first of repeated xp values, 'right' to use the last
+    :param searchRows: ascending rows used to find the bracketing points instead of xp, shape (..., n).
+                       Used to invert a backbone on its running maximum
+    :return: interpolated values, shape (..., m)
+    """
+    upper = np.clip(row_searchsorted(xp if searchRows is None else searchRows, x, side), 1, xp.shape[-1] - 1)
+    lower = upper - 1
+    x0, x1 = np.take_along_axis(xp, lower, axis = -1), np.take_along_axis(xp, upper, axis = -1)
+    f0, f1 = np.take_along_axis(fp, lower, axis = -1), np.take_along_axis(fp, upper, axis = -1)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ratio = np.where(x1 > x0, (x - x0)/(x1 - x0), 0.0)
+    return f0 + np.clip(ratio, 0, 1)*(f1 - f0)
+
+
+def pushover(panelD, panelF, storyHeights, loadPattern, driftLimit = 0.1, numSteps = 500):
+    """
+    This function is used to run the pushover analysis of a batch of buildings
+    :param panelD, panelF: panel backbones from panel_backbone(), shape (buildings, stories, panels, 4)
+    :param storyHeights: story heights, shape (buildings, stories) or (stories,). Units: in
+    :param loadPattern: lateral force pattern (e.g. Cvx), shape (buildings, stories) or (stories,)
+    :param driftLimit: drift ratio of the critical story at which the analysis stops
+    :param numSteps: number of analysis steps
+    :return: dictionary with
+             'base shear': shape (buildings, steps). Units: kips
+             'roof displacement': shape (buildings, steps). Units: in
+             'story displacement': shape (buildings, steps, stories). Units: in
+             'story drift': drift ratio, shape (buildings, steps, stories)
+             'critical story': index of the critical story, shape (buildings,)
+             'initial stiffness': story initial stiffness, shape (buildings, stories). Units: kips/in
+    """
+    panelD = np.asarray(panelD, dtype = float)
+    panelF = np.asarray(panelF, dtype = float)
+    numBuildings, numStories = panelD.shape[:2]
+    heights = np.broadcast_to(np.asarray(storyHeights, dtype = float), (numBuildings, numStories))
+    pattern = np.broadcast_to(np.asarray(loadPattern, dtype = float), (numBuildings, numStories))
+    #share of the base shear taken by each story, first story is the top
+    shearRatio = np.cumsum(pattern, axis = 1)/np.sum(pattern, axis = 1, keepdims = True)
+
+    #story backbones, and the backbone of the critical story (smallest base shear strength for the
+    #load pattern) tabulated on its displacement grid, shape (buildings, steps)
+    corner, cornerForce, lastSlope = story_backbone(panelD, panelF)
+    initialStiffness = np.sum(panelF[..., 0]/panelD[..., 0], axis = 2)
+    uLimit = driftLimit*heights
+    strength = np.maximum(cornerForce.max(axis = 2), cornerForce[:, :, -1] + np.clip(lastSlope, 0, None)
+                          *np.clip(uLimit - corner[:, :, -1], 0, None))
+    critical = np.argmin(strength/shearRatio, axis = 1)
+    building = np.arange(numBuildings)
+    u = np.linspace(0, 1, numSteps)[None, :]*uLimit[building, critical][:, None]
+    lastCorner = corner[building, critical, -1:]
+    F = interpolate(u, corner[building, critical], cornerForce[building, critical]) \
+        + lastSlope[building, critical][:, None]*np.clip(u - lastCorner, 0, None)
+    baseShear = np.clip(F, 0, None)/shearRatio[building, critical][:, None]
+
+    #other stories load along their backbone up to the peak base shear and unload elastically after it
+    peakShear = np.maximum.accumulate(baseShear, axis = 1)
+    storyShear = peakShear[:, None, :]*shearRatio[:, :, None]
+    #first displacement at which the story backbone reaches the story shear: the corners are searched
+    #on their running maximum, beyond the last corner the hardening slope is followed
+    loading = interpolate(storyShear, cornerForce, corner, 'left', np.maximum.accumulate(cornerForce, axis = 2))
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        beyond = np.where(lastSlope[:, :, None] > 0, (storyShear - cornerForce[:, :, -1:])/lastSlope[:, :, None], 0.0)
+    loading = np.where(storyShear > cornerForce.max(axis = 2, keepdims = True), loading + np.clip(beyond, 0, None), loading)
+    storyDisplacement = loading - (peakShear - baseShear)[:, None, :]*shearRatio[:, :, None]/initialStiffness[:, :, None]
+    storyDisplacement[building, critical] = u
+    storyDisplacement = storyDisplacement.transpose(0, 2, 1)
+
+    return {'base shear': baseShear,
+            'roof displacement': storyDisplacement.sum(axis = 2),
+            'story displacement': storyDisplacement,
+            'story drift': storyDisplacement/heights[:, None, :],
+            'critical story': critical,
+            'initial stiffness': initialStiffness}
+
+
+def pushover_performance(result, floorWeights, designBaseShear, codePeriod, strengthLoss = 0.2, g = GRAVITY):
+    """
+    This function is used to get the overstrength and the period-based ductility of pushover
+    curves following FEMA P695 Section 6.3
+    :param result: dictionary returned by pushover()
+    :param floorWeights: floor seismic weight, shape (buildings, stories) or (stories,). Units: kips
+    :param designBaseShear: design (ELF) base shear, scalar or shape (buildings,). Units: kips
+    :param codePeriod: code period CuTa, scalar or shape (buildings,). Units: s
+    :param strengthLoss: strength loss that defines the ultimate roof displacement (0.2 = 80% of the peak)
+    :return: dictionary with
+             'peak base shear', 'overstrength', 'fundamental period',
+             'effective yield displacement', 'ultimate displacement', 'ductility', each shape (buildings,)
+    """
+    baseShear = result['base shear']
+    roof = result['roof displacement']
+    numBuildings, numSteps = baseShear.shape
+    weights = np.broadcast_to(np.asarray(floorWeights, dtype = float), result['initial stiffness'].shape)
+    column = lambda x: np.broadcast_to(np.asarray(x, dtype = float), (numBuildings,))
+
+    peak = baseShear.max(axis = 1)
+    peakStep = np.argmax(baseShear, axis = 1)
+
+    #effective yield roof displacement, FEMA P695 Eq. 6-7, with C0 from the first mode (roof is the first floor)
+    modes = modal_analysis(weights, result['initial stiffness'], g)
+    T1 = modes['period'][:, 0]
+    C0 = np.abs(modes['participation factor'][:, 0]*modes['mode shape'][:, 0, 0])
+    period = np.maximum(column(codePeriod), T1)
+    yieldDisplacement = C0*peak/weights.sum(axis = 1)*g/(4*np.pi**2)*period**2
+
+    #ultimate roof displacement: first point after the peak where the strength drops below the limit
+    step = np.arange(numSteps)[None, :]
+    below = (step > peakStep[:, None]) & (baseShear < (1 - strengthLoss)*peak[:, None])
+    hasDropped = below.any(axis = 1)
+    last = np.where(hasDropped, np.argmax(below, axis = 1), numSteps - 1)
+    building = np.arange(numBuildings)
+    V0, V1 = baseShear[building, np.maximum(last - 1, 0)], baseShear[building, last]
+    D0, D1 = roof[building, np.maximum(last - 1, 0)], roof[building, last]
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ratio = np.where(hasDropped & (V0 > V1), (V0 - (1 - strengthLoss)*peak)/(V0 - V1), 1.0)
+    ultimateDisplacement = D0 + ratio*(D1 - D0)
+
+    return {'peak base shear': peak,
+            'overstrength': peak/column(designBaseShear),
+            'fundamental period': T1,
+            'effective yield displacement': yieldDisplacement,
+            'ultimate displacement': ultimateDisplacement,
+            'ductility': ultimateDisplacement/yieldDisplacement}
+
+
+def panel_material_from_designs(designs):
+    """
+    This function is used to get the panel materials of a building from its designed wall lines:
+    every wall of a line uses the Pinching4 material (OpenSees Tag) of the selected assembly
+    :param designs: FinalShearWallDesign objects of all wall lines in one direction
+    :return: Pinching4 material number of each panel, shape (stories, panels), first entry is the top story
+    """
+    columns = []
+    for design in designs:
+        tag = np.asarray(design.sw_final_design['OpenSees Tag'], dtype = int)
+        columns.append(np.repeat(tag[:, None], int(design.wallsPerLine), axis = 1))
+    return np.concatenate(columns, axis = 1)
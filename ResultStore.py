@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to keep the designs of a study in a partitioned, column-oriented store that can be
+queried without loading every design.
+
+Every designed floor is one row: caseID, direction, wall line, level, the shear wall design (assembly,
+Ga, LRFD, drift, D/C ratio), the detailing of the assembly taken from the shear wall catalog (sheathing,
+nail size, panel thickness, nail spacing, sheathed sides) and the tie-down design (assembly, rod
+elongation, capacity, D/C ratio).
+
+The store is a folder:
+    manifest.json       columns, dictionaries of the category columns and the statistics of every partition
+    part-00000.npz ...  one file per partition, one array per column
+String columns are dictionary encoded: the partitions hold integer codes into one dictionary per column,
+which only grows, so the codes written earlier stay valid. Rows are split into partitions by the
+partition columns (level by default) and then by rowsPerPartition. Appended rows are kept in memory
+until a partition column value has rowsPerPartition rows, so that many small appends (one wall line at
+a time) still write full partitions; flush() or close() writes the rest and saves the manifest, which
+is only rewritten then. For every partition the manifest
+keeps the min and max of the numeric columns and the codes present in the category columns, so a
+query only opens the partitions whose statistics can match all its predicates (predicate pushdown),
+and only reads the columns it needs from them.
+
+The partitions are NumPy .npz files; pyarrow and the HDF5 libraries are not dependencies of this
+project, and the manifest statistics play the part of the Parquet row group statistics.
+
+Running this file benchmarks a query on a synthetic study of 100,000 wall lines.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import json
+import operator
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+#column name: kind of column. 'category' columns are dictionary encoded, the others are numeric
+RESULT_SCHEMA = {'caseID': 'category',
+                 'direction': 'category',
+                 'wall line': 'category',
+                 'level': 'int',
+                 'Shear Wall Assembly': 'category',
+                 'Sheathing': 'category',
+                 'nail size': 'category',
+                 'panel thickness': 'category',
+                 'nail spacing': 'int',
+                 'Sheathed sides': 'int',
+                 'Ga(k/in)': 'float',
+                 'LRFD(klf)': 'float',
+                 'Drift(in)': 'float',
+                 'D/C Ratio': 'float',
+                 'Tie-down Assembly': 'category',
+                 'Rod Elongation(in)': 'float',
+                 'Capacity(kips)': 'float',
+                 'Tie-down D/C Ratio': 'float'}
+
+#detailing columns of a row, looked up in the shear wall catalog from its assembly
+DETAILING_COLUMNS = ('Sheathing', 'nail size', 'panel thickness', 'nail spacing', 'Sheathed sides')
+
+#predicate operators of query()
+OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le,
+             '>': operator.gt, '>=': operator.ge, 'in': np.isin}
+
+MANIFEST = 'manifest.json'
+STORE_VERSION = 1
+
+
+def design_rows(caseID, direction, wall_line_name, sw_design, tiedown_design):
+    """
+    This function is used to get the rows of the store of one wall line design
+    :param sw_design, tiedown_design: design frames of the wall line (FinalShearWallDesign.sw_final_design
+                                      and tiedown_final_design), or their records as saved in a checkpoint
+    :return: dataframe with one row per floor and the columns of RESULT_SCHEMA, without the detailing columns
+    """
+    sw_design = pd.DataFrame(sw_design)
+    tiedown_design = pd.DataFrame(tiedown_design).rename(columns = {'D/C Ratio': 'Tie-down D/C Ratio'})
+    rows = sw_design.merge(tiedown_design, on = 'level', how = 'left')
+    rows.insert(0, 'wall line', wall_line_name)
+    rows.insert(0, 'direction', direction)
+    rows.insert(0, 'caseID', caseID)
+    return rows
+
+
+def assembly_detailing(assemblies):
+    """
+    This function is used to look up the detailing of shear wall assemblies in the catalog
+    :param assemblies: assembly names
+    :return: dictionary of DETAILING_COLUMNS, one value per assembly (empty / -1 for unknown assemblies)
+    """
+    from global_variables import shearwall_catalog
+
+    assemblyCodes = shearwall_catalog.columns['Assembly']
+    rowOf = dict(zip(assemblyCodes.tolist(), range(len(assemblyCodes))))
+    inverse, uniques = pd.factorize(np.asarray(assemblies))
+    rows = np.array([rowOf.get(shearwall_catalog.code_of('Assembly', name), -1) for name in uniques], dtype = int)[inverse]
+    known = rows >= 0
+    detailing = {}
+    for name in DETAILING_COLUMNS:
+        values = shearwall_catalog.value(name, np.where(known, rows, 0))
+        detailing[name] = np.where(known, values, '' if RESULT_SCHEMA[name] == 'category' else -1)
+    return detailing
+
+
+class ResultStore():
+
+    def __init__(self, directory, partitionBy = ('level',), rowsPerPartition = 65536):
+        """
+        :param directory: folder of the store, created if it does not exist; an existing store is opened
+        :param partitionBy: columns whose values are never mixed in a partition (for a new store)
+        :param rowsPerPartition: largest number of rows of a partition (for a new store)
+        """
+        self.directory = os.path.abspath(directory)
+        self.manifestPath = os.path.join(self.directory, MANIFEST)
+        #partitions opened and rows read by the last query
+        self.lastScan = {}
+        #frames appended but not encoded yet, and their number of rows
+        self.frames = []
+        self.frameRows = 0
+        #partition column values -> encoded columns not written yet, and their number of rows
+        self.pending = {}
+        self.pendingRows = {}
+
+        if os.path.exists(self.manifestPath):
+            self.load()
+        else:
+            os.makedirs(self.directory, exist_ok = True)
+            self.schema = dict(RESULT_SCHEMA)
+            self.partitionBy = list(partitionBy)
+            self.rowsPerPartition = rowsPerPartition
+            self.dictionaries = {name: [] for name, kind in self.schema.items() if kind == 'category'}
+            self.partitions = []
+            self.save()
+        self._codes = {name: {label: code for code, label in enumerate(labels)}
+                       for name, labels in self.dictionaries.items()}
+
+    def load(self):
+        with open(self.manifestPath, 'r') as myfile:
+            manifest = json.load(myfile)
+        if manifest['version'] != STORE_VERSION:
+            raise ValueError('%s was written by another version of the result store' % self.manifestPath)
+        self.schema = manifest['schema']
+        self.partitionBy = manifest['partitionBy']
+        self.rowsPerPartition = manifest['rowsPerPartition']
+        self.dictionaries = manifest['dictionaries']
+        self.partitions = manifest['partitions']
+
+    def save(self):
+        #the manifest is replaced in one step, so a failed write keeps the previous store readable
+        manifest = {'version': STORE_VERSION, 'schema': self.schema, 'partitionBy': self.partitionBy,
+                    'rowsPerPartition': self.rowsPerPartition, 'dictionaries': self.dictionaries,
+                    'partitions': self.partitions}
+        temporary = self.manifestPath + '.tmp'
+        with open(temporary, 'w') as myfile:
+            json.dump(manifest, myfile)
+        os.replace(temporary, self.manifestPath)
+
+    def flush(self):
+        """
+        This method is used to write the rows kept in memory as partitions and save the manifest
+        :return: number of partitions written
+        """
+        written = self.encode_frames() if self.frames else 0
+        written += sum(self.write_pending(key, True) for key in list(self.pending))
+        self.save()
+        return written
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return sum(partition['rows'] for partition in self.partitions) + self.frameRows + sum(self.pendingRows.values())
+
+    def encode(self, name, labels):
+        #dictionary codes of labels, new labels are added at the end of the dictionary
+        codes = self._codes[name]
+        dictionary = self.dictionaries[name]
+        inverse, uniques = pd.factorize(labels)
+        for label in uniques:
+            if label not in codes:
+                codes[label] = len(dictionary)
+                dictionary.append(label)
+        return np.array([codes[label] for label in uniques], dtype = np.int32)[inverse]
+
+    def append(self, rows):
+        """
+        This method is used to add rows to the store. The rows are kept in memory and written as
+        partitions of rowsPerPartition rows; the rest is written by flush()
+        :param rows: dataframe with the columns of RESULT_SCHEMA; the detailing columns are looked up in
+                     the shear wall catalog when missing (see design_rows())
+        :return: number of partitions written
+        """
+        rows = pd.DataFrame(rows)
+        if not len(rows):
+            return 0
+        missing = [name for name in self.schema if name not in rows and name not in DETAILING_COLUMNS]
+        if missing:
+            raise ValueError('The rows are missing the column(s): %s' % ', '.join(missing))
+        self.frames.append(rows)
+        self.frameRows += len(rows)
+        #the frames are encoded together once they can fill a partition
+        if self.frameRows < self.rowsPerPartition:
+            return 0
+        return self.encode_frames()
+
+    def encode_frames(self):
+        #encode the appended frames, split them by the partition columns and write the full partitions
+        rows = pd.concat(self.frames, ignore_index = True)
+        self.frames = []
+        self.frameRows = 0
+        if any(name not in rows or rows[name].isna().any() for name in DETAILING_COLUMNS):
+            detailing = assembly_detailing(rows['Shear Wall Assembly'].astype(str).values)
+            for name, values in detailing.items():
+                rows[name] = rows[name].where(rows[name].notna(), values) if name in rows else values
+
+        columns = {}
+        for name, kind in self.schema.items():
+            if kind == 'category':
+                columns[name] = self.encode(name, rows[name].astype(str).values)
+            else:
+                #drifts of floors designed without a drift check are written as 'NaN' strings
+                values = pd.to_numeric(rows[name], errors = 'coerce').values
+                columns[name] = values.astype(np.int64) if kind == 'int' and not np.isnan(values).any() else values.astype(float)
+
+        groups = pd.DataFrame({name: columns[name] for name in self.partitionBy}).groupby(self.partitionBy, sort = True).indices \
+            if self.partitionBy else {(): np.arange(len(rows))}
+        written = 0
+        for key, index in groups.items():
+            self.pending.setdefault(key, []).append({name: values[index] for name, values in columns.items()})
+            self.pendingRows[key] = self.pendingRows.get(key, 0) + len(index)
+            #the pending columns are only joined when they fill a partition
+            if self.pendingRows[key] >= self.rowsPerPartition:
+                written += self.write_pending(key, False)
+        return written
+
+    def write_pending(self, key, last):
+        #write the full partitions of the pending rows of one partition column value, and the rest if last
+        parts = self.pending.pop(key)
+        rows = self.pendingRows.pop(key)
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        end = rows if last else rows - rows % self.rowsPerPartition
+        for start in range(0, end, self.rowsPerPartition):
+            self.write_partition({name: values[start:start + self.rowsPerPartition] for name, values in columns.items()})
+        if end < rows:
+            self.pending[key] = [{name: values[end:] for name, values in columns.items()}]
+            self.pendingRows[key] = rows - end
+        return -(-end // self.rowsPerPartition)
+
+    def write_partition(self, columns):
+        #one npz file per partition and its statistics in the manifest
+        fileName = 'part-%05d.npz' % len(self.partitions)
+        np.savez(os.path.join(self.directory, fileName), **columns)
+        statistics = {}
+        for name, values in columns.items():
+            if self.schema[name] == 'category':
+                statistics[name] = {'codes': np.unique(values).tolist()}
+            else:
+                finite = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+                statistics[name] = {'min': finite.min().item() if len(finite) else None,
+                                    'max': finite.max().item() if len(finite) else None}
+        self.partitions.append({'file': fileName, 'rows': len(next(iter(columns.values()))), 'statistics': statistics})
+
+    def append_design(self, caseID, direction, wall_line_name, sw_design, tiedown_design):
+        """
+        This method is used to add one wall line design, see design_rows(). The rows are written with
+        the next full partition or by flush()
+        """
+        return self.append(design_rows(caseID, direction, wall_line_name, sw_design, tiedown_design))
+
+    def append_checkpoint(self, checkpointPath, batchSize = 10000):
+        """
+        This method is used to add the designs saved in a checkpoint file (see Checkpoint.py), batchSize
+        wall lines at a time
+        :return: number of wall lines added
+        """
+        from Checkpoint import CheckpointStore
+
+        with CheckpointStore(checkpointPath) as checkpoint:
+            #units that could not be designed have no design frames
+            records = [record for record in checkpoint.records.values() if 'sw_final_design' in record]
+        for start in range(0, len(records), batchSize):
+            frames = []
+            for record in records[start:start + batchSize]:
+                caseID, direction, wall_line_name = record['key'].split('/', 2)
+                frames.append(design_rows(caseID, direction, wall_line_name, record['sw_final_design'],
+                                          record['tiedown_final_design']))
+            self.append(pd.concat(frames, ignore_index = True))
+        self.flush()
+        return len(records)
+
+    def predicate(self, name, op, value):
+        """
+        This method is used to check a predicate and convert its value to the stored values
+        :return: (column name, operator function, stored value); category labels become codes
+        """
+        if name not in self.schema:
+            raise ValueError('The store has no column %s' % name)
+        if op not in OPERATORS:
+            raise ValueError('Unknown operator %s, use one of %s' % (op, ', '.join(OPERATORS)))
+        if self.schema[name] == 'category':
+            if op not in ('==', '!=', 'in'):
+                raise ValueError('Only ==, != and in can be used on the category column %s' % name)
+            if op == 'in':
+                value = np.array([self._codes[name].get(label, -1) for label in value])
+            else:
+                value = self._codes[name].get(value, -1)
+        elif op == 'in':
+            value = np.asarray(value)
+        return name, op, value
+
+    def may_match(self, partition, name, op, value):
+        """
+        This method is used to check with the statistics of a partition whether any of its rows can meet a predicate
+        """
+        statistics = partition['statistics'][name]
+        if 'codes' in statistics:
+            codes = np.array(statistics['codes'])
+            if op == '==':
+                return value in codes
+            if op == '!=':
+                return bool(np.any(codes != value))
+            return bool(np.isin(codes, value).any())
+        low, high = statistics['min'], statistics['max']
+        if low is None:
+            #only NaN values, which meet no comparison except !=
+            return op == '!='
+        if op == '==':
+            return low <= value <= high
+        if op == '!=':
+            return not low == high == value
+        if op == 'in':
+            return bool(np.any((value >= low) & (value <= high)))
+        return OPERATORS[op](low, value) or OPERATORS[op](high, value)
+
+    def scan(self, where = (), columns = None):
+        """
+        This method is used to read the rows that meet all the predicates, from the partitions whose
+        statistics can match them only
+        :param where: list of (column, operator, value) predicates, e.g. [('level', '==', 3),
+                      ('nail size', '==', '8d'), ('D/C Ratio', '>', 0.9)]; see OPERATORS
+        :param columns: columns to read, None for all
+        :return: dictionary of encoded column arrays
+        """
+        #rows kept in memory are written first, so that the query sees every appended row
+        if self.frames or self.pending:
+            self.flush()
+        predicates = [self.predicate(*item) for item in where]
+        columns = list(self.schema) if columns is None else list(columns)
+        for name in columns:
+            if name not in self.schema:
+                raise ValueError('The store has no column %s' % name)
+        needed = list(dict.fromkeys(columns + [name for name, op, value in predicates]))
+
+        parts = {name: [] for name in columns}
+        opened = rowsRead = 0
+        for partition in self.partitions:
+            if not all(self.may_match(partition, *item) for item in predicates):
+                continue
+            opened += 1
+            rowsRead += partition['rows']
+            with np.load(os.path.join(self.directory, partition['file'])) as data:
+                #only the needed members of the npz file are read
+                values = {name: data[name] for name in needed}
+            select = np.ones(partition['rows'], dtype = bool)
+            for name, op, value in predicates:
+                select &= OPERATORS[op](values[name], value)
+            for name in columns:
+                parts[name].append(values[name][select])
+        self.lastScan = {'partitions': len(self.partitions), 'partitions read': opened, 'rows read': rowsRead}
+        return {name: np.concatenate(values) if values else np.array([], dtype = int if self.schema[name] == 'category' else float)
+                for name, values in parts.items()}
+
+    def decode(self, columns):
+        #encoded column arrays -> dataframe with the category labels
+        frame = {}
+        for name, values in columns.items():
+            if self.schema[name] == 'category':
+                frame[name] = np.array(self.dictionaries[name], dtype = object)[values] if len(values) else np.array([], dtype = object)
+            else:
+                frame[name] = values
+        return pd.DataFrame(frame)
+
+    def query(self, where = (), columns = None):
+        """
+        This method is used to get the rows that meet all the predicates, e.g. all the level 3 walls
+        with 8d nails and a D/C ratio over 0.9:
+            store.query([('level', '==', 3), ('nail size', '==', '8d'), ('D/C Ratio', '>', 0.9)])
+        :param where: list of (column, operator, value) predicates, see scan()
+        :param columns: columns of the result, None for all
+        :return: dataframe of the matching rows
+        """
+        return self.decode(self.scan(where, columns))
+
+    def aggregate(self, column, by = 'caseID', how = 'max', where = ()):
+        """
+        This method is used to reduce a numeric column per group, e.g. the largest drift of every case:
+            store.aggregate('Drift(in)', by = 'caseID', how = 'max')
+        Only the two columns are read
+        :param how: 'max', 'min', 'mean', 'sum' or 'count'
+        :return: series indexed by the group labels
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        values = self.decode(self.scan(where, by + [column]))
+        return values.groupby(by)[column].agg(how)
+
+
+def synthetic_rows(numWallLines, numFloors = 3, seed = 0):
+    #rows of a synthetic study for the benchmark, with the assemblies of the shear wall catalog
+    from global_variables import shearwall_catalog, tiedown_catalog
+
+    random = np.random.default_rng(seed)
+    numRows = numWallLines*numFloors
+    line = np.repeat(np.arange(numWallLines), numFloors)
+    assembly = random.integers(len(shearwall_catalog), size = numRows)
+    rod = random.integers(len(tiedown_catalog), size = numRows)
+    rows = pd.DataFrame({'caseID': np.char.add('case', (line // 4).astype(str)),
+                         'direction': np.where(line % 4 < 2, 'X', 'Z'),
+                         'wall line': np.char.add('line', (line % 2 + 1).astype(str)),
+                         'level': np.tile(np.arange(numFloors, 0, -1), numWallLines),
+                         'Shear Wall Assembly': shearwall_catalog.value('Assembly', assembly),
+                         'Ga(k/in)': shearwall_catalog.Ga[assembly],
+                         'LRFD(klf)': shearwall_catalog.lrfd[assembly],
+                         'Drift(in)': random.uniform(0.2, 2.0, numRows),
+                         'D/C Ratio': random.uniform(0.3, 1.0, numRows),
+                         'Tie-down Assembly': tiedown_catalog.assembly[rod],
+                         'Rod Elongation(in)': random.uniform(0.02, 0.2, numRows),
+                         'Capacity(kips)': tiedown_catalog.capacity[rod],
+                         'Tie-down D/C Ratio': random.uniform(0.3, 1.0, numRows)})
+    return rows
+
+
+if __name__ == '__main__':
+    #benchmark: the level 3 walls with 8d nails and D/C > 0.9, and the largest drift of every case,
+    #from the store and from a csv of all the rows loaded in pandas
+    import tempfile
+
+    where = [('level', '==', 3), ('nail size', '==', '8d'), ('D/C Ratio', '>', 0.9)]
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        store = ResultStore(os.path.join(directory, 'store'), rowsPerPartition = 20000)
+        store.append(synthetic_rows(100000))
+        store.flush()
+        writeTime = time.perf_counter() - start
+        csvPath = os.path.join(directory, 'designs.csv')
+        store.query().to_csv(csvPath, index = False)
+        size = sum(os.path.getsize(os.path.join(store.directory, name)) for name in os.listdir(store.directory))
+        print('%d rows in %d partitions, written in %.2f s, %.1f MB (csv %.1f MB)'
+              % (len(store), len(store.partitions), writeTime, size/1e6, os.path.getsize(csvPath)/1e6))
+
+        start = time.perf_counter()
+        matches = store.query(where)
+        storeTime = time.perf_counter() - start
+        scan = store.lastScan
+        start = time.perf_counter()
+        drift = store.aggregate('Drift(in)', by = 'caseID', how = 'max')
+        aggregateTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frame = pd.read_csv(csvPath)
+        csvMatches = frame[(frame['level'] == 3) & (frame['nail size'] == '8d') & (frame['D/C Ratio'] > 0.9)]
+        csvDrift = frame.groupby('caseID')['Drift(in)'].max()
+        csvTime = time.perf_counter() - start
+
+        print('query %s: %d rows in %.3f s, %d of %d partitions read' % (where, len(matches), storeTime,
+                                                                         scan['partitions read'], scan['partitions']))
+        print('max drift of %d cases in %.3f s' % (len(drift), aggregateTime))
+        print('csv + pandas: both in %.3f s, same results: %s'
+              % (csvTime, len(csvMatches) == len(matches) and np.allclose(csvDrift.sort_index().values, drift.sort_index().values)))
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to run the wall lines of a batch on a process pool in the order of their predicted
+design effort, so that the batch does not end with one long wall line running alone.
+
+The design time of a wall line is mostly the number of steps of its redesign loop (one step is one
+assembly tried at one wall length), which grows with the drift demand. A cheap pre-pass reads the
+demand of every wall line (the files the design reads anyway) and, at the starting wall length:
+    - D/C ratio: unit shear demand over the largest LRFD capacity of the catalog (> 1: not feasible,
+      which the design finds at once)
+    - drift ratio: drift of the stiffest assembly over the drift limit
+    - predicted steps: for every floor, the assemblies walked from the strength selection to the first
+      one meeting the drift limit, or, if none does, the catalog rows above the strength selection
+      times the 0.5 ft length steps needed for the stiffest assembly (drift taken as inversely
+      proportional to the length)
+The predicted time is FLOOR_SECONDS per floor plus STEP_SECONDS per predicted step. The detailing and
+D/C ratio filters are not taken into account by the pre-pass.
+
+The wall lines are assigned to the workers longest first (LPT), each to the worker with the least
+predicted work. Every worker has one wall line running at a time and takes the next one from the front
+of its own queue; a worker whose queue is empty steals from the back of the queue with the most
+predicted work left. The report lists the predicted and actual time of every wall line.
+
+Running this file designs random buildings and compares the makespan of the schedules.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import collections
+import heapq
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from BatchDesign import design_unit
+from Deflection import demand, rod_elongation, assembly_deflection, wall_deflection, story_drift
+from ShearWallDriftCheck_perFloor import MAX_WALL_LENGTH
+
+
+#predicted design time: reading and setting up a floor, and one step of the redesign loop. Units: s
+FLOOR_SECONDS = 0.015
+STEP_SECONDS = 5e-5
+
+#length step of the redesign loop. Units: ft
+LENGTH_STEP = 0.5
+
+
+def predict_group(units, wallLength, userDefinedDriftTag, maxWallLength, ELFDemandTag):
+    #cost estimates of wall lines with the same number of floors, see predict_costs()
+    from VectorizedDesign import stack_wall_lines
+    from global_variables import shearwall_catalog, tiedown_catalog
+
+    inputs = stack_wall_lines([unit[:4] for unit in units], ELFDemandTag = ELFDemandTag)
+    storyForce, storyHeight = inputs['storyForce'], inputs['storyHeight']
+    lrfd, Ga = shearwall_catalog.lrfd, shearwall_catalog.Ga
+    numRows = len(lrfd)
+
+    unitShear, tension = demand(storyForce, wallLength, storyHeight)
+    #strength selection of every floor: first row whose running maximum capacity meets the demand
+    strengthRow = np.searchsorted(np.maximum.accumulate(lrfd), unitShear, side = 'left')
+    rod = np.minimum(tiedown_catalog.select(tension), len(tiedown_catalog) - 1)
+    rodElongation = rod_elongation(tension, storyHeight, tiedown_catalog.area[rod])
+    deltaA = assembly_deflection(tension, inputs['chordArea'], inputs['initialMoisture'][:, None],
+                                 inputs['finalMoisture'][:, None], inputs['takeup'], rodElongation)
+    #drift of every assembly of the catalog, shape (cases, floors, rows)
+    drift = story_drift(wall_deflection(storyForce[..., None], wallLength, storyHeight[..., None],
+                                        (inputs['chordArea']*inputs['elasticModulus'])[..., None], Ga, deltaA[..., None]),
+                        inputs['Cd'][:, None, None], inputs['Ie'][:, None, None])
+    limit = storyHeight*12*(inputs['userDefinedDrift'] if userDefinedDriftTag else inputs['allowableDrift'])[:, None]
+
+    met = (drift <= limit[..., None]) & (np.arange(numRows) >= strengthRow[..., None])
+    metAtStart = met.any(axis = -1)
+    walked = np.where(metAtStart, met.argmax(axis = -1) - strengthRow, 0)
+    driftRatio = drift[..., int(np.argmax(Ga))]/limit
+    neededLength = np.minimum(wallLength*driftRatio, maxWallLength)
+    lengthSteps = np.where(metAtStart, 0, np.ceil(np.maximum(neededLength - wallLength, 0)/LENGTH_STEP))
+    steps = (1 + walked + lengthSteps*np.maximum(numRows - strengthRow, 1)).sum(axis = 1)
+
+    DCRatio = unitShear.max(axis = 1)/lrfd.max()
+    feasible = DCRatio <= 1
+    numFloors = storyForce.shape[1]
+    return {'D/C Ratio': DCRatio,
+            'drift ratio': driftRatio.max(axis = 1),
+            'feasible': feasible,
+            'predicted steps': np.where(feasible, steps, 0),
+            'predicted time(s)': numFloors*FLOOR_SECONDS + np.where(feasible, steps, 0)*STEP_SECONDS}
+
+
+def predict_costs(units, wallLength = 4.0, userDefinedDriftTag = False, maxWallLength = MAX_WALL_LENGTH,
+                  ELFDemandTag = False):
+    """
+    This function is used to predict the design effort of wall lines with a cheap pre-pass
+    :param units: list of (caseID, BaseDirectory, direction, wall line name, number of floors), see
+                  BatchDesign.list_units()
+    :param wallLength: starting wall length of the design. Units: ft
+    :param userDefinedDriftTag: True if the design uses the user defined drift limit
+    :param ELFDemandTag: True if the design uses the ELF story forces of the site
+    :return: dataframe with one row per unit: 'D/C Ratio', 'drift ratio', 'feasible', 'predicted steps'
+             and 'predicted time(s)'. Units that cannot be read get a NaN prediction
+    """
+    columns = ('D/C Ratio', 'drift ratio', 'feasible', 'predicted steps', 'predicted time(s)')
+    costs = pd.DataFrame(np.nan, index = range(len(units)), columns = columns)
+    costs['feasible'] = costs['feasible'].astype(object)
+    groups = collections.defaultdict(list)
+    for position, unit in enumerate(units):
+        groups[unit[4]].append(position)
+    directory = os.getcwd()
+    for positions in groups.values():
+        try:
+            batches = [positions]
+            predictions = [predict_group([units[k] for k in positions], wallLength, userDefinedDriftTag, maxWallLength, ELFDemandTag)]
+        except Exception:
+            #one wall line with bad inputs; the others are predicted one at a time
+            batches, predictions = [], []
+            for k in positions:
+                try:
+                    predictions.append(predict_group([units[k]], wallLength, userDefinedDriftTag, maxWallLength, ELFDemandTag))
+                    batches.append([k])
+                except Exception:
+                    pass
+        finally:
+            #the inputs are read by changing the working directory
+            os.chdir(directory)
+        for batch, prediction in zip(batches, predictions):
+            for name in columns:
+                costs.loc[batch, name] = prediction[name]
+    return costs
+
+
+class CostAwareScheduler():
+
+    def __init__(self, units, designParameters, jobs = 2, designFunction = design_unit):
+        """
+        :param units: list of (caseID, BaseDirectory, direction, wall line name, number of floors), see
+                      BatchDesign.list_units()
+        :param designParameters: (wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                                 userDefinedDCTag, pruneCatalog, ELFDemandTag), see BatchDesign.design_unit()
+        :param jobs: number of worker processes (1 designs in this process, longest first)
+        :param designFunction: function(unit, designParameters) returning a dictionary with 'status' and
+                               'time'; must be picklable when jobs > 1
+        """
+        self.units = list(units)
+        self.designParameters = designParameters
+        self.jobs = max(1, int(jobs))
+        self.designFunction = designFunction
+
+        self.predict()
+        self.assign()
+        self.run()
+
+    def predict(self):
+        """
+        This method is used to predict the time of every unit; units without a prediction are taken as
+        the longest, so that their errors show up first
+        :return: predicted time of every unit. Units: s
+        """
+        start = time.perf_counter()
+        self.costs = predict_costs(self.units, self.designParameters[0], self.designParameters[3],
+                                   ELFDemandTag = self.designParameters[6])
+        self.predictTime = time.perf_counter() - start
+        predicted = self.costs['predicted time(s)'].values.astype(float)
+        self.predicted = np.where(np.isnan(predicted), np.nanmax(predicted, initial = 0.0)*2 + 1.0, predicted)
+        return self.predicted
+
+    def assign(self):
+        """
+        This method is used to assign the units to the workers longest first, each to the worker with
+        the least predicted work (LPT)
+        :return: list of the queues of the workers (positions of the units, longest first)
+        """
+        self.queues = [collections.deque() for _ in range(self.jobs)]
+        load = [(0.0, worker) for worker in range(self.jobs)]
+        for position in np.argsort(-self.predicted, kind = 'stable'):
+            work, worker = heapq.heappop(load)
+            self.queues[worker].append(int(position))
+            heapq.heappush(load, (work + self.predicted[position], worker))
+        return self.queues
+
+    def next_unit(self, worker):
+        """
+        This method is used to get the next unit of a worker: the front of its queue, or the back of the
+        queue with the most predicted work left
+        :return: (position of the unit, True if stolen), or (None, False) when no unit is left
+        """
+        if self.queues[worker]:
+            return self.queues[worker].popleft(), False
+        victim = max(range(self.jobs), key = lambda other: sum(self.predicted[k] for k in self.queues[other]))
+        if self.queues[victim]:
+            return self.queues[victim].pop(), True
+        return None, False
+
+    def record(self, position, worker, stolen, result, started):
+        self.results[position] = result
+        self.schedule[position] = {'worker': worker, 'stolen': stolen, 'start(s)': started - self.startTime,
+                                   'end(s)': time.perf_counter() - self.startTime}
+
+    def run(self):
+        """
+        This method is used to design every unit on the workers
+        :return: list of the design results in the order of the units
+        """
+        self.results = [None]*len(self.units)
+        self.schedule = [None]*len(self.units)
+        self.startTime = time.perf_counter()
+        if self.jobs == 1:
+            while True:
+                position, stolen = self.next_unit(0)
+                if position is None:
+                    break
+                started = time.perf_counter()
+                self.record(position, 0, stolen, self.designFunction(self.units[position], self.designParameters), started)
+        else:
+            with ProcessPoolExecutor(max_workers = self.jobs) as pool:
+                running = {}
+                def submit(worker):
+                    position, stolen = self.next_unit(worker)
+                    if position is not None:
+                        future = pool.submit(self.designFunction, self.units[position], self.designParameters)
+                        running[future] = (position, worker, stolen, time.perf_counter())
+                for worker in range(self.jobs):
+                    submit(worker)
+                while running:
+                    done, _ = wait(running, return_when = FIRST_COMPLETED)
+                    for future in done:
+                        position, worker, stolen, started = running.pop(future)
+                        self.record(position, worker, stolen, future.result(), started)
+                        submit(worker)
+        self.makespan = time.perf_counter() - self.startTime
+        return self.results
+
+    def getReport(self):
+        """
+        :return: dataframe with one row per unit: the pre-pass estimates, the predicted and actual design
+                 time and steps, the worker and whether the unit was stolen
+        """
+        report = pd.DataFrame({'caseID': [unit[0] for unit in self.units],
+                               'direction': [unit[2] for unit in self.units],
+                               'wall line': [unit[3] for unit in self.units]})
+        report = pd.concat([report, self.costs], axis = 1)
+        report['design steps'] = [result.get('designSteps') for result in self.results]
+        report['time(s)'] = [result['time'] for result in self.results]
+        report['status'] = [result['status'] for result in self.results]
+        report['worker'] = [entry['worker'] for entry in self.schedule]
+        report['stolen'] = [entry['stolen'] for entry in self.schedule]
+        return report
+
+    def getSummary(self):
+        """
+        :return: dictionary with the makespan, its lower bound (the longer of the total time over the
+                 number of workers and the longest unit), the number of stolen units and the rank
+                 correlation of the predicted and actual times
+        """
+        actual = np.array([result['time'] for result in self.results])
+        rank = lambda values: np.argsort(np.argsort(values))
+        return {'units': len(self.units),
+                'jobs': self.jobs,
+                'pre-pass (s)': self.predictTime,
+                'makespan (s)': self.makespan,
+                'lower bound (s)': max(actual.sum()/self.jobs, actual.max(initial = 0.0)),
+                'stolen units': sum(entry['stolen'] for entry in self.schedule),
+                'rank correlation': float(np.corrcoef(rank(self.predicted), rank(actual))[0, 1]) if len(actual) > 1 else np.nan}
+
+
+def simulate_makespan(durations, order, jobs):
+    """
+    This function is used to get the makespan of a list schedule: units are started in order, each on
+    the first worker that is free
+    :param durations: time of every unit. Units: s
+    :param order: positions of the units in the order they are started
+    :return: makespan. Units: s
+    """
+    free = [0.0]*jobs
+    for position in order:
+        heapq.heappush(free, heapq.heappop(free) + durations[position])
+    return max(free)
+
+
+if __name__ == '__main__':
+    #benchmark: design the wall lines of random buildings once, then compare the makespan of the input
+    #order, the predicted longest first order and the actual longest first order (with the measured
+    #times) on 4 and 8 workers. Run from the folder of the databases
+    import tempfile
+
+    from Equivalence import write_synthetic_building
+    from BatchDesign import list_units
+
+    random = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [('case%d' % k, write_synthetic_building(os.path.join(directory, 'case%d' % k), int(random.choice([2, 3, 4])),
+                                                         seed = int(random.integers(2**31)), numWallLines = 3))
+                 for k in range(24)]
+        scheduler = CostAwareScheduler(list_units(cases), (4.0, False, False, False, False, False, False), jobs = 1)
+    report = scheduler.getReport()
+    summary = scheduler.getSummary()
+    print('%d wall lines, pre-pass %.3f s, design %.2f s, rank correlation of predicted and actual time %.2f'
+          % (summary['units'], summary['pre-pass (s)'], summary['makespan (s)'], summary['rank correlation']))
+    print(report[['caseID', 'direction', 'wall line', 'D/C Ratio', 'drift ratio', 'predicted steps', 'design steps',
+                  'predicted time(s)', 'time(s)']].head(10).to_string(index = False))
+    actual = report['time(s)'].values
+    for jobs in (4, 8):
+        print('%d workers: input order %.3f s, predicted LPT %.3f s, actual LPT %.3f s, lower bound %.3f s'
+              % (jobs, simulate_makespan(actual, range(len(actual)), jobs),
+                 simulate_makespan(actual, np.argsort(-scheduler.predicted, kind = 'stable'), jobs),
+                 simulate_makespan(actual, np.argsort(-actual, kind = 'stable'), jobs),
+                 max(actual.sum()/jobs, actual.max())))
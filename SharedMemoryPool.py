@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to share the catalogs and the stacked case inputs with the design processes
+without copying them.
+
+A process pool worker normally imports global_variables again (and parses the shear wall and
+tie-down databases again), and every task receives its inputs as pickled arrays. Here the parent
+process copies the catalog arrays and the stacked inputs (see VectorizedDesign.stack_wall_lines)
+once into blocks of multiprocessing.shared_memory. The workers attach to the blocks and build
+their catalogs on NumPy views of them (read only, no copy), and a task only carries a small
+descriptor: the name of the block, the offset, dtype and shape of every array, and the range of
+cases to design.
+
+Running this file benchmarks the start-up time of the workers (databases parsed in every worker vs
+attached) and the overhead per task (pickled inputs vs shared descriptors).
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ShearWallCatalog import ShearWallCatalog
+from TieDownDesign import TieDownCatalog
+
+
+#start of every array in a block. Units: bytes
+ALIGNMENT = 64
+
+#tie-down catalog arrays, see TieDownCatalog.from_arrays()
+TIEDOWN_ARRAYS = ('assembly', 'capacity', 'area', 'grossArea')
+
+#case snapshots a worker keeps attached; older ones are closed
+SNAPSHOT_CACHE = 2
+
+#catalogs attached in this process (set by the worker initializer) and attached case snapshots
+_catalogs = None
+_snapshots = OrderedDict()
+
+
+def publish_arrays(arrays):
+    """
+    This function is used to copy arrays into a new shared memory block
+    :param arrays: dictionary of name: numpy array. Object arrays (e.g. strings read by pandas) are
+                   stored as fixed width strings
+    :return: (SharedMemory block, descriptor). The descriptor is a small picklable dictionary used to
+             attach to the block, see attach_arrays(). The caller owns the block and unlinks it
+    """
+    fields = []
+    offset = 0
+    values = {}
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        if array.dtype.hasobject:
+            array = array.astype(str)
+        values[name] = np.ascontiguousarray(array)
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        fields.append((name, values[name].dtype.str, values[name].shape, offset))
+        offset += values[name].nbytes
+    block = shared_memory.SharedMemory(create = True, size = max(offset, 1))
+    for name, dtype, shape, start in fields:
+        np.ndarray(shape, dtype, buffer = block.buf, offset = start)[...] = values[name]
+    return block, {'name': block.name, 'fields': fields, 'nbytes': offset}
+
+
+def attach_arrays(descriptor):
+    """
+    This function is used to attach to a shared memory block
+    :param descriptor: descriptor returned by publish_arrays()
+    :return: (SharedMemory block, dictionary of name: read only numpy view of the block)
+    """
+    block = shared_memory.SharedMemory(name = descriptor['name'])
+    arrays = {}
+    for name, dtype, shape, offset in descriptor['fields']:
+        arrays[name] = np.ndarray(shape, dtype, buffer = block.buf, offset = offset)
+        arrays[name].flags.writeable = False
+    return block, arrays
+
+
+def catalog_arrays(shearwall_catalog, tiedown_catalog):
+    """
+    :return: dictionary of the arrays of both catalogs, with the same 'col:' and 'cat:' keys as the
+             shear wall catalog cache file and 'tiedown:' keys for the tie-down catalog
+    """
+    arrays = {'col:' + name: values for name, values in shearwall_catalog.columns.items()}
+    arrays.update({'cat:' + name: labels for name, labels in shearwall_catalog.categories.items()})
+    arrays.update({'tiedown:' + name: getattr(tiedown_catalog, name) for name in TIEDOWN_ARRAYS})
+    if shearwall_catalog.costSource == 'user supplied':
+        #cost given with set_cost(), used by the dominance pruning
+        arrays['cost'] = shearwall_catalog.cost
+    return arrays
+
+
+def publish_catalogs(shearwall_catalog, tiedown_catalog):
+    """
+    This function is used to copy the catalogs into shared memory
+    :return: (SharedMemory block, descriptor), see attach_catalogs()
+    """
+    block, descriptor = publish_arrays(catalog_arrays(shearwall_catalog, tiedown_catalog))
+    descriptor['schema'] = shearwall_catalog.schema
+    descriptor['source'] = shearwall_catalog.source
+    return block, descriptor
+
+
+def attach_catalogs(descriptor):
+    """
+    This function is used to build the catalogs of this process on the shared arrays. It is the
+    initializer of the SharedDesignPool workers; global_variables imported afterwards uses these
+    catalogs instead of reading the databases
+    :param descriptor: descriptor returned by publish_catalogs()
+    :return: (ShearWallCatalog, TieDownCatalog)
+    """
+    global _catalogs
+    if _catalogs is None:
+        block, arrays = attach_arrays(descriptor)
+        columns = {name[4:]: values for name, values in arrays.items() if name.startswith('col:')}
+        categories = {name[4:]: values for name, values in arrays.items() if name.startswith('cat:')}
+        shearwall_catalog = ShearWallCatalog(columns, categories, descriptor['schema'], descriptor['source'])
+        if 'cost' in arrays:
+            shearwall_catalog.set_cost(arrays['cost'])
+        tiedown_catalog = TieDownCatalog.from_arrays(*[arrays['tiedown:' + name] for name in TIEDOWN_ARRAYS])
+        #the block is kept open for the life of the process, the catalogs are views of it
+        _catalogs = (shearwall_catalog, tiedown_catalog, block)
+    return _catalogs[:2]
+
+
+def attached_catalogs():
+    """
+    :return: (ShearWallCatalog, TieDownCatalog) attached in this process, None if there are none
+    """
+    return None if _catalogs is None else _catalogs[:2]
+
+
+def publish_inputs(inputs, wallLength = None):
+    """
+    This function is used to copy stacked inputs into shared memory
+    :param inputs: stacked inputs, see VectorizedDesign.stack_wall_lines()
+    :param wallLength: starting wall length of every case, kept with the inputs. Units: ft
+    :return: (SharedMemory block, descriptor), see attach_inputs()
+    """
+    from VectorizedDesign import FLOOR_INPUTS, CASE_INPUTS
+
+    arrays = {name: np.asarray(inputs[name]) for name in FLOOR_INPUTS + CASE_INPUTS}
+    numCases = len(arrays['storyForce'])
+    #preferred panel thickness, nail size and nail spacing as a (cases, 3) string array
+    arrays['detailing'] = np.array(inputs['detailing'], dtype = str).reshape(numCases, 3)
+    if wallLength is not None:
+        arrays['wallLength'] = np.broadcast_to(np.asarray(wallLength, dtype = float), (numCases,))
+    return publish_arrays(arrays)
+
+
+def attach_inputs(descriptor, start = 0, stop = None):
+    """
+    This function is used to get a range of cases of shared stacked inputs. The snapshot stays
+    attached in this process, so the next tasks on it cost nothing
+    :param descriptor: descriptor returned by publish_inputs()
+    :param start, stop: range of cases
+    :return: stacked inputs of the cases (read only views)
+    """
+    name = descriptor['name']
+    if name in _snapshots:
+        _snapshots.move_to_end(name)
+    else:
+        while len(_snapshots) >= SNAPSHOT_CACHE:
+            block, arrays = _snapshots.popitem(last = False)[1]
+            del arrays
+            try:
+                block.close()
+            except BufferError:
+                #views of the snapshot are still in use; the block is closed with them
+                pass
+        _snapshots[name] = attach_arrays(descriptor)
+    return {name: values[start:stop] for name, values in _snapshots[name][1].items()}
+
+
+#design results with one value per case, see StackedShearWallDesign
+CASE_RESULTS = ('finalWallLength', 'iterationWallLength', 'designSteps', 'feasible', 'reason', 'failedLevel')
+
+
+def design_cases(descriptor, start, stop, designParameters, options):
+    """
+    This function is used to design a range of the shared cases in a worker
+    :param descriptor: descriptor returned by publish_inputs() with the wall lengths
+    :param start, stop: range of cases
+    :param designParameters: StackedShearWallDesign parameters after the wall length
+    :param options: StackedShearWallDesign keyword parameters
+    :return: (start, stop, dictionary of the results), see merge_results()
+    """
+    #imported here so that the catalogs attached by the initializer are used
+    from VectorizedDesign import StackedShearWallDesign
+
+    inputs = attach_inputs(descriptor, start, stop)
+    design = StackedShearWallDesign(inputs, inputs['wallLength'], *designParameters, **options)
+    result = {name: getattr(design, name) for name in CASE_RESULTS}
+    result['design'] = design.design
+    result['rodDesign'] = design.rodDesign
+    return start, stop, result
+
+
+def merge_results(parts):
+    """
+    This function is used to put the results of the ranges of cases back together
+    :param parts: list of (start, stop, result) returned by design_cases(), in case order
+    :return: dictionary of the CASE_RESULTS arrays, 'design' and 'rodDesign' (dictionaries of arrays,
+             shape (cases, floors)), same as the attributes of StackedShearWallDesign
+    """
+    merged = {name: np.concatenate([result[name] for start, stop, result in parts]) for name in CASE_RESULTS}
+    for group in ('design', 'rodDesign'):
+        #a range without any feasible case has no rod design
+        templates = {}
+        for start, stop, result in parts:
+            for name, values in result[group].items():
+                templates.setdefault(name, values)
+        merged[group] = {}
+        for name, template in templates.items():
+            empty = -1 if template.dtype.kind == 'i' else np.nan
+            merged[group][name] = np.concatenate(
+                [result[group][name] if name in result[group]
+                 else np.full((stop - start,) + template.shape[1:], empty, dtype = template.dtype)
+                 for start, stop, result in parts])
+    return merged
+
+
+class SharedDesignPool():
+
+    def __init__(self, jobs = None, context = 'spawn'):
+        """
+        The catalogs of global_variables are published when the pool is created and every worker
+        attaches to them when it starts
+        :param jobs: number of worker processes, os.cpu_count() if None
+        :param context: multiprocessing start method of the workers
+        """
+        from global_variables import shearwall_catalog, tiedown_catalog
+
+        self.jobs = jobs or os.cpu_count()
+        self.catalogBlock, self.catalogs = publish_catalogs(shearwall_catalog, tiedown_catalog)
+        self.pool = ProcessPoolExecutor(self.jobs, mp_context = multiprocessing.get_context(context),
+                                        initializer = attach_catalogs, initargs = (self.catalogs,))
+
+    def design(self, inputs, wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+               userDefinedDCTag, casesPerTask = 1000, **options):
+        """
+        This method is used to design stacked cases in the workers; the inputs are published once and
+        every task designs a range of them. Design parameters are the same as StackedShearWallDesign
+        :param inputs: stacked inputs, see VectorizedDesign.stack_wall_lines()
+        :param casesPerTask: number of cases designed by one task
+        :param options: other StackedShearWallDesign keyword parameters
+        :return: dictionary of the results, see merge_results()
+        """
+        numCases = len(inputs['storyForce'])
+        block, descriptor = publish_inputs(inputs, wallLength)
+        designParameters = (reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag)
+        try:
+            futures = [self.pool.submit(design_cases, descriptor, start, min(start + casesPerTask, numCases),
+                                        designParameters, options)
+                       for start in range(0, numCases, casesPerTask)]
+            return merge_results([future.result() for future in futures])
+        finally:
+            block.close()
+            block.unlink()
+
+    def close(self):
+        self.pool.shutdown()
+        self.catalogBlock.close()
+        self.catalogBlock.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def worker_startup():
+    #time the worker took to get its catalogs and the time it was ready, see load_catalogs(). Units: s.
+    #the task is held briefly so that the tasks of the benchmark reach every worker
+    time.sleep(0.05)
+    return os.getpid(), _startupTime
+
+
+def load_catalogs(descriptor = None):
+    #worker initializer of the start-up benchmark: attach to the shared catalogs if given, then import
+    #global_variables (which parses the databases if there are none)
+    global _startupTime
+    start = time.perf_counter()
+    if descriptor is not None:
+        attach_catalogs(descriptor)
+    import global_variables
+    len(global_variables.shearwall_catalog)
+    _startupTime = (time.perf_counter() - start, time.time())
+
+
+def task_pickled(inputs):
+    #task of the overhead benchmark receiving its inputs pickled
+    return float(inputs['storyForce'].sum())
+
+
+def task_shared(descriptor, start, stop):
+    #task of the overhead benchmark receiving a shared snapshot descriptor
+    return float(attach_inputs(descriptor, start, stop)['storyForce'].sum())
+
+
+if __name__ == '__main__':
+    #benchmark: start-up time of 4 spawned workers with the databases parsed in every worker or
+    #attached from shared memory, using a catalog 1,000x the size of shearwall_database.csv, and the
+    #overhead per task of sending 2,000 stacked cases pickled or as a shared descriptor
+    import shutil
+    import tempfile
+
+    import pandas as pd
+
+    #the workers run the functions of the module, not of this script, so that the catalogs they attach
+    #are the ones global_variables finds
+    import SharedMemoryPool as shared
+    from VectorizedDesign import random_inputs
+
+    jobs = 4
+    databaseDirectory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        database = pd.read_csv(os.path.join(databaseDirectory, 'shearwall_database.csv'))
+        large = pd.concat([database]*1000, ignore_index = True).sort_values('LRFD(klf)', kind = 'stable')
+        large.to_csv(os.path.join(directory, 'shearwall_database.csv'), index = False)
+        shutil.copy(os.path.join(databaseDirectory, 'tie_down_database.csv'), directory)
+        os.chdir(directory)
+
+        catalog = ShearWallCatalog.from_csv('shearwall_database.csv', cache = False)
+        tiedown = TieDownCatalog(pd.read_csv('tie_down_database.csv'))
+        block, descriptor = shared.publish_catalogs(catalog, tiedown)
+        try:
+            for label, initargs in (('parse csv', (None,)), ('parse npz cache', (None,)), ('shared memory', (descriptor,))):
+                if label == 'parse csv' and os.path.exists('shearwall_database.catalog.npz'):
+                    os.remove('shearwall_database.catalog.npz')
+                start = time.time()
+                with ProcessPoolExecutor(jobs, mp_context = multiprocessing.get_context('spawn'),
+                                         initializer = shared.load_catalogs, initargs = initargs) as pool:
+                    futures = [pool.submit(shared.worker_startup) for _ in range(4*jobs)]
+                    startup = np.array(list(dict(future.result() for future in futures).values()))
+                print('%-16s %d rows: catalogs in %6.1f ms per worker, all %d workers ready after %6.1f ms'
+                      % (label, len(catalog), 1e3*startup[:, 0].mean(), len(startup), 1e3*(startup[:, 1].max() - start)))
+        finally:
+            block.close()
+            block.unlink()
+            os.chdir(databaseDirectory)
+
+    numCases, casesPerTask = 200000, 2000
+    inputs = random_inputs(numCases)
+    ranges = [(start, start + casesPerTask) for start in range(0, numCases, casesPerTask)]
+    block, descriptor = shared.publish_inputs(inputs)
+    try:
+        with ProcessPoolExecutor(jobs, mp_context = multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(shared.task_pickled, [{'storyForce': np.zeros(1)}]*jobs))
+            for label in ('pickled inputs', 'shared descriptor'):
+                start = time.perf_counter()
+                if label == 'pickled inputs':
+                    futures = [pool.submit(shared.task_pickled, {name: values[a:b] for name, values in inputs.items()})
+                               for a, b in ranges]
+                else:
+                    futures = [pool.submit(shared.task_shared, descriptor, a, b) for a, b in ranges]
+                total = sum(future.result() for future in futures)
+                elapsed = time.perf_counter() - start
+                print('%-17s %d tasks of %d cases: %7.3f ms per task (check %.1f)'
+                      % (label, len(ranges), casesPerTask, 1e3*elapsed/len(ranges), total))
+    finally:
+        block.close()
+        block.unlink()
@@ -4,6 +4,11 @@ This file is used to calculate seismic base shear using ELF procedure per ASCE 0
 seismic story forces (horizontal force distribution), shear wall demand and tension demand for
 anchorage design. 
 
+Only the inputs needed by the design (Geometry, Loads, SeismicDesignParameters and the wall line
+folders) are read when the demand is computed; the other input sections (floor plan, nodes, panels,
+analysis parameters, wood panel materials) are read the first time they are used and kept.
+Running this file counts the files opened per design for a building.
+
 Developed by: Laxman Dahal, UCLA
 
 Created on: Aug 2020, 
@@ -20,12 +25,75 @@ import os
 import pandas as pd
 
 
+#input sections that are not needed by the design, read on first use by ComputeSeismicForce.read_section
+INPUT_SECTIONS = ('plan', 'leaning_columns', 'panels', 'live_loads', 'pushover', 'dynamic', 'materials',
+                  'panel_properties')
+
+
+def input_section(section, name):
+    """
+    This function is used to define an attribute of ComputeSeismicForce that is read with its input
+    section the first time it is used, and kept for later use
+    :param section: name of the section, see INPUT_SECTIONS
+    :param name: name of the attribute
+    :return: property
+    """
+    def get(self):
+        return self.read_section(section)[name]
+
+    def set(self, value):
+        self.read_section(section)[name] = value
+
+    return property(get, set, doc = '%s, read with the %s inputs on first use' % (name, section))
+
+
 class ComputeSeismicForce(object):
+
+    ## Floor plan
+    floorMaximumXDimension = input_section('plan', 'floorMaximumXDimension')
+    floorMaximumZDimension = input_section('plan', 'floorMaximumZDimension')
+    floorAreas = input_section('plan', 'floorAreas')
+    ## Nodes
+    leaningColumnNodesOpenSeesTags = input_section('leaning_columns', 'leaningColumnNodesOpenSeesTags')
+    leaningColumnNodesXCoordinates = input_section('leaning_columns', 'leaningColumnNodesXCoordinates')
+    leaningColumnNodesZCoordinates = input_section('leaning_columns', 'leaningColumnNodesZCoordinates')
+    ## Panels
+    numberOfXDirectionWoodPanels = input_section('panels', 'numberOfXDirectionWoodPanels')
+    numberOfZDirectionWoodPanels = input_section('panels', 'numberOfZDirectionWoodPanels')
+    XDirectionWoodPanelsXCoordinates = input_section('panels', 'XDirectionWoodPanelsXCoordinates')
+    XDirectionWoodPanelsZCoordinates = input_section('panels', 'XDirectionWoodPanelsZCoordinates')
+    ZDirectionWoodPanelsXCoordinates = input_section('panels', 'ZDirectionWoodPanelsXCoordinates')
+    ZDirectionWoodPanelsZCoordinates = input_section('panels', 'ZDirectionWoodPanelsZCoordinates')
+    XDirectionWoodPanelsBotTag = input_section('panels', 'XDirectionWoodPanelsBotTag')
+    XDirectionWoodPanelsTopTag = input_section('panels', 'XDirectionWoodPanelsTopTag')
+    ZDirectionWoodPanelsBotTag = input_section('panels', 'ZDirectionWoodPanelsBotTag')
+    ZDirectionWoodPanelsTopTag = input_section('panels', 'ZDirectionWoodPanelsTopTag')
+    ## Loads
+    liveLoads = input_section('live_loads', 'liveLoads')
+    leaningcolumnLoads = input_section('live_loads', 'leaningcolumnLoads')
+    ## Analysis Parameters
+    PushoverParameter = input_section('pushover', 'PushoverParameter')
+    DynamicParameter = input_section('dynamic', 'DynamicParameter')
+    ## Wood Panel Materials
+    MaterialProperty = input_section('materials', 'MaterialProperty')
+    XPanelLength = input_section('panel_properties', 'XPanelLength')
+    XPanelHeight = input_section('panel_properties', 'XPanelHeight')
+    XPanelMaterial = input_section('panel_properties', 'XPanelMaterial')
+    ZPanelLength = input_section('panel_properties', 'ZPanelLength')
+    ZPanelHeight = input_section('panel_properties', 'ZPanelHeight')
+    ZPanelMaterial = input_section('panel_properties', 'ZPanelMaterial')
    
     def __init__(self, CaseID, BaseDirectory, wallLength, direction, 
-                 wall_line_name, reDesignTag, SeismicDesignParameterFlag = True):
+                 wall_line_name, reDesignTag, SeismicDesignParameterFlag = True, loadRatio = None,
+                 ELFDemandTag = False):
         
         self.wallLength = wallLength
+        #tribuitary load ratio to use instead of tribuitaryLoadRatio.txt (e.g. from a stiffness based
+        #load distribution, see LoadDistribution.py). None reads it from the wall line folder
+        self.loadRatioOverride = loadRatio
+        #if True, the demand is the ELF story force computed from the site (SeismicDesignParameter['story_force'])
+        #instead of Fx_ToTestTheCode.txt
+        self.ELFDemandTag = ELFDemandTag
         self.direction = direction
         self.wall_line_name = wall_line_name
         self.reDesignTag = reDesignTag
@@ -40,45 +108,11 @@ class ComputeSeismicForce(object):
         self.numberOfStories = None
         self.storyHeights = None
         self.floorHeights = None
-
-        self.floorMaximumXDimension = None
-        self.floorMaximumZDimension = None
-        self.floorAreas = None
-    ## Nodes
-        self.leaningColumnNodesOpenSeesTags = None
-        self.leaningColumnNodesXCoordinates = None
-        self.leaningColumnNodesZCoordinates = None
-    ## Panels
-        self.numberOfXDirectionWoodPanels = None
-        self.numberOfZDirectionWoodPanels = None
-
-        self.XDirectionWoodPanelsXCoordinates = None
-        self.XDirectionWoodPanelsZCoordinates = None
-        self.ZDirectionWoodPanelsXCoordinates = None
-        self.ZDirectionWoodPanelsZCoordinates = None
- 
-        self.XDirectionWoodPanelsBotTag = None
-        self.XDirectionWoodPanelsTopTag = None
-       
-        self.ZDirectionWoodPanelsBotTag = None
-        self.ZDirectionWoodPanelsTopTag = None
     ## Loads
         self.floorWeights = None
-        self.liveLoads = None
-        self.leaningcolumnLoads = None
-
-    ## Analysis Parameters
-        self.PushoverParameter = None
-        self.DynamicParameter = None
-    ## Wood Panel Materials
-        self.MaterialProperty = None
-        self.XPanelLength = None
-        self.XPanelHeight = None
-        self.XPanelMaterial = None
-
-        self.ZPanelLength = None
-        self.ZPanelHeight = None
-        self.ZPanelMaterial = None
+    ## Floor plan, nodes, panels, live loads, analysis parameters and wood panel materials are not
+    ## needed by the design: they are read the first time they are used (see read_section)
+        self._sections = {}
     ## Retrofit
         self.XRetrofitFlag = None 
         self.ZRetrofitFlag = None
@@ -113,136 +147,12 @@ class ComputeSeismicForce(object):
         self.floorHeights = np.cumsum(np.insert(self.storyHeights,0, 0))
         self.floor_heights = np.cumsum(self.storyHeights)
 
-        self.floorMaximumXDimension = np.genfromtxt('floorMaximumXDimension.txt')
-        self.floorMaximumZDimension = np.genfromtxt('floorMaximumZDimension.txt')
-        self.floorAreas = np.genfromtxt('floorAreas.txt')
-
-        self.leaningColumnNodesOpenSeesTags = np.genfromtxt('leaningColumnNodesOpenSeesTags.txt').astype(int)
-        self.leaningColumnNodesXCoordinates = np.genfromtxt('leaningColumnNodesXCoordinates.txt')
-        self.leaningColumnNodesZCoordinates = np.genfromtxt('leaningColumnNodesZCoordinates.txt')
-
-        self.numberOfXDirectionWoodPanels = np.genfromtxt('numberOfXDirectionWoodPanels.txt').astype(int)
-        self.numberOfZDirectionWoodPanels = np.genfromtxt('numberOfZDirectionWoodPanels.txt').astype(int)
-
-        self.XDirectionWoodPanelsXCoordinates = np.genfromtxt('XDirectionWoodPanelsXCoordinates.txt')
-        self.XDirectionWoodPanelsZCoordinates = np.genfromtxt('XDirectionWoodPanelsZCoordinates.txt')
-        self.ZDirectionWoodPanelsXCoordinates = np.genfromtxt('ZDirectionWoodPanelsXCoordinates.txt')
-        self.ZDirectionWoodPanelsZCoordinates = np.genfromtxt('ZDirectionWoodPanelsZCoordinates.txt')
-
-        temp1 = np.zeros([self.XDirectionWoodPanelsXCoordinates.shape[0],self.XDirectionWoodPanelsXCoordinates.shape[1]])
-        temp2 = np.zeros([self.XDirectionWoodPanelsXCoordinates.shape[0],self.XDirectionWoodPanelsXCoordinates.shape[1]])
-
-        temp3 = np.zeros([self.ZDirectionWoodPanelsZCoordinates.shape[0],self.ZDirectionWoodPanelsZCoordinates.shape[1]])
-        temp4 = np.zeros([self.ZDirectionWoodPanelsZCoordinates.shape[0],self.ZDirectionWoodPanelsZCoordinates.shape[1]])
-
-      # for i in range (self.numberOfStories):
-      #   for j in range(self.numberOfXDirectionWoodPanels[i]):    
-
-      #     temp1[i,j] = (i+1)*10000+1000+(j+1)*10+1
-      #     temp2[i,j] = (i+1)*10000+1000+(j+1)*10+2
-      # self.XDirectionWoodPanelsBotTag = temp1
-      # self.XDirectionWoodPanelsTopTag = temp2
-
-      # for i in range (self.numberOfStories):
-      #   for j in range(self.numberOfZDirectionWoodPanels[i]):    
-
-      #     temp3[i,j] = (i+1)*10000+3000+(j+1)*10+1
-      #     temp4[i,j] = (i+1)*10000+3000+(j+1)*10+2        
-      # self.ZDirectionWoodPanelsBotTag = temp3
-      # self.ZDirectionWoodPanelsTopTag = temp4
-          
 
 ##################################################################################################        
 # Read in Loads
         os.chdir(BaseDirectory + '/Loads')
         self.floorWeights = np.genfromtxt('floorWeights.txt'); # (kips)
-        self.liveLoads = np.genfromtxt('liveLoads.txt'); # (kips per square inch)
-        self.leaningcolumnLoads = np.genfromtxt('leaningcolumnLoads.txt'); # (kips)
-      
       
-      
-
-################################################################################################        
-# Read in Pushover Analysis Parameters
-        os.chdir(BaseDirectory + '/AnalysisParameters/StaticAnalysis')
-        Increment = np.genfromtxt('PushoverIncrementSize.txt')
-        XDriftLimit = np.genfromtxt('PushoverXDrift.txt')
-        ZDriftLimit = np.genfromtxt('PushoverZDrift.txt')
-
-        self.PushoverParameter = {'Increment': Increment,
-                                  'PushoverXDrift': XDriftLimit,
-                                  'PushoverZDrift': ZDriftLimit}
-
-##################################################################################################        
-# Read in Dynaimic Analysis Parameters
-        os.chdir(BaseDirectory + '/AnalysisParameters/DynamicAnalysis')
-        DriftLimit = np.genfromtxt('CollapseDriftLimit.txt')
-        DemolitionLimit = np.genfromtxt('DemolitionDriftLimit.txt')
-
-        with open('dampingModel.txt', 'r') as myfile:
-            dampingModel = myfile.read()  #For now, just use Rayleigh damping
-            dampingRatio = np.genfromtxt('dampingRatio.txt')
-
-        self.DynamicParameter = {'CollapseLimit': DriftLimit,
-                                 'DemolitionLimit': DemolitionLimit,
-                                 'DampingModel': dampingModel,
-                                 'DampingRatio':dampingRatio}
-        
-##################################################################################################        
-# Read in Structural Material Property
-        os.chdir(BaseDirectory + '/StructuralProperties/Pinching4Materials')
-
-      # For now, Pinching4 material is used
-        MaterialLabel = np.genfromtxt('materialNumber.txt')
-        d1 = np.genfromtxt('d1.txt')
-        d2 = np.genfromtxt('d2.txt')
-        d3 = np.genfromtxt('d3.txt')
-        d4 = np.genfromtxt('d4.txt')
-
-        f1 = np.genfromtxt('f1.txt')
-        f2 = np.genfromtxt('f2.txt')
-        f3 = np.genfromtxt('f3.txt')
-        f4 = np.genfromtxt('f4.txt')
-        
-        gD1 = np.genfromtxt('gD1.txt')
-        gDlim = np.genfromtxt('gDlim.txt')
-        
-        gK1 = np.genfromtxt('gK1.txt')
-        gKlim = np.genfromtxt('gKlim.txt')
-
-        rDisp = np.genfromtxt('rDisp.txt')
-        rForce = np.genfromtxt('rForce.txt')
-        uForce = np.genfromtxt('uForce.txt')
-        
-        self.MaterialProperty = {'MaterialLabel': MaterialLabel,
-                                 'd1': d1,
-                                 'd2': d2,
-                                 'd3': d3,
-                                 'd4': d4,
-                                 'f1': f1,
-                                 'f2': f2,
-                                 'f3': f3,
-                                 'f4': f4,
-                                 'gD1': gD1,
-                                 'gDlim': gDlim,
-                                 'gK1': gK1,
-                                 'gKlim': gKlim,
-                                 'rDisp': rDisp,
-                                 'rForce': rForce,
-                                 'uForce': uForce}
-                            
-######  ############################################################################################        
-# Read in Structural Panel Property
-        os.chdir(BaseDirectory + '/StructuralProperties/XWoodPanels')
-        self.XPanelLength = np.genfromtxt('length.txt')
-        self.XPanelHeight = np.genfromtxt('height.txt')
-        self.XPanelMaterial = np.genfromtxt('Pinching4MaterialNumber.txt')
-        
-        os.chdir(BaseDirectory + '/StructuralProperties/ZWoodPanels')
-        self.ZPanelLength = np.genfromtxt('length.txt')
-        self.ZPanelHeight = np.genfromtxt('height.txt')
-        self.ZPanelMaterial = np.genfromtxt('Pinching4MaterialNumber.txt')  
-        
             
 ##################################################################################################        
     
@@ -253,7 +163,10 @@ class ComputeSeismicForce(object):
         self.totalArea = np.genfromtxt('floorAreas.txt')  # wall stiffness of each wall segment
         self.wallsPerLine = np.genfromtxt('wallsPerLine.txt')
         self.allowableDrift = np.genfromtxt('allowableDrift.txt')
-        self.loadRatio = np.genfromtxt('tribuitaryLoadRatio.txt')
+        if self.loadRatioOverride is None:
+            self.loadRatio = np.genfromtxt('tribuitaryLoadRatio.txt')
+        else:
+            self.loadRatio = self.loadRatioOverride
             
         #read in shear wall lineal load 
         os.chdir(self.BaseDirectory + '/%s_direction_wall'%self.direction + '/%s'%self.wall_line_name + '/Loads')
@@ -280,7 +193,8 @@ class ComputeSeismicForce(object):
         self.userDefinedDCRatioFlag_TieDown = np.loadtxt('userDefinedDCRatioFlag_TieDown.txt')
         self.userDefinedDCRatio_TieDown = np.loadtxt('userDefinedDCRatio_TieDown.txt')
         
-        self.Fx = np.genfromtxt('Fx_ToTestTheCode.txt')
+        if not self.ELFDemandTag:
+            self.Fx = np.genfromtxt('Fx_ToTestTheCode.txt')
       
 ##################################################################################################
 # Define read in Seismic Design Parameter 
@@ -295,14 +209,27 @@ class ComputeSeismicForce(object):
                 site_class = myfile.read()  
         Ss = np.genfromtxt('Ss.txt')
         S1 = np.genfromtxt('S1.txt')
-        Fa = self.determine_Fa_coefficient(site_class, Ss)
-        Fv = self.determine_Fv_coefficient(site_class, S1)
-        SMS, SM1, SDS, SD1 = self.calculate_DBE_acceleration(Ss, S1, Fa, Fv)
-        Cu = self.determine_Cu_coefficient(SD1)
         R = np.genfromtxt('R.txt')
         Ie = np.genfromtxt('I.txt')
         Cd = np.genfromtxt('Cd.txt')
         TL = np.genfromtxt('TL.txt')
+        self.SeismicDesignParameter = self.calculate_seismic_design_parameter(Ss, S1, site_class, R, Ie, Cd, TL)
+        
+    def calculate_seismic_design_parameter(self, Ss, S1, site_class, R, Ie, Cd, TL):
+        """
+        This method is used to calculate the seismic design parameters and the ELF story forces of the
+        building for a site (ASCE 7-16 Chapter 11 and Section 12.8). Only the geometry and floor weights
+        already read are used, so the site can be changed without reading the inputs again
+        :param Ss, S1: mapped spectral accelerations at short periods and at 1 s. Units: g
+        :param site_class: 'A', 'B', 'C', 'D' or 'E'
+        :param R, Ie, Cd, TL: response modification coefficient, importance factor, deflection
+                              amplification factor and long-period transition period
+        :return: dictionary of the seismic design parameters, see SeismicDesignParameter
+        """
+        Fa = self.determine_Fa_coefficient(site_class, Ss)
+        Fv = self.determine_Fv_coefficient(site_class, S1)
+        SMS, SM1, SDS, SD1 = self.calculate_DBE_acceleration(Ss, S1, Fa, Fv)
+        Cu = self.determine_Cu_coefficient(SD1)
         x = 0.75 # for 'All other structural systems' specified in ASCE 7-16 Table 12.8-2
         Ct = 0.02 # for 'All other structural systems' specified in ASCE 7-16 Table 12.8-2
         hn = sum(self.storyHeights)/12 # transfer unit to ft
@@ -312,33 +239,121 @@ class ComputeSeismicForce(object):
         TotalWeight = sum(self.floorWeights)
         Cvx = self.calculate_Cvx(TotalWeight * Cs, self.floorWeights, self.floorHeights, k)
         seismic_force, story_shear= self.calculate_seismic_force(TotalWeight * Cs, self.floorWeights, self.floor_heights, k)
-        self.SeismicDesignParameter = {'Ss': Ss,
-                                       'S1': S1,
-                                       'Fa': Fa,
-                                       'Fv': Fv,
-                                       'SMS': SMS,
-                                       'SM1': SM1,
-                                       'SDS': SDS,
-                                       'SD1': SD1,
-                                       'Cu': Cu,
-                                       'R': R,
-                                       'Cd': Cd,
-                                       'Ie': Ie,
-                                       'TL': TL,
-                                       'x': x,
-                                       'Ct': Ct,
-                                       'Tu': Tu,
-                                       'Cs': Cs,
-                                       'ELF Base Shear': TotalWeight * Cs,
-                                       'Cvx': Cvx,
-                                       'story_force': seismic_force, 
-                                       'story_shear': story_shear,
-                                       'k': k
-                                      }
+        return {'Ss': Ss,
+                'S1': S1,
+                'Fa': Fa,
+                'Fv': Fv,
+                'SMS': SMS,
+                'SM1': SM1,
+                'SDS': SDS,
+                'SD1': SD1,
+                'Cu': Cu,
+                'R': R,
+                'Cd': Cd,
+                'Ie': Ie,
+                'TL': TL,
+                'x': x,
+                'Ct': Ct,
+                'Tu': Tu,
+                'Cs': Cs,
+                'ELF Base Shear': TotalWeight * Cs,
+                'Cvx': Cvx,
+                'story_force': seismic_force, 
+                'story_shear': story_shear,
+                'k': k
+               }
         
     def read_in_json_inputs(self, CaseID, BaseDirectory, SeismicDesignParameterFlag = True):
         pass
 
+    def read_section(self, section):
+        """
+        This method is used to read an input section the first time one of its attributes is used.
+        The files are read with absolute paths, so the working directory is not changed
+        :param section: name of the section, see INPUT_SECTIONS
+        :return: dictionary of the attributes of the section
+        """
+        if section not in self._sections:
+            self._sections[section] = getattr(self, 'read_%s' % section)()
+        return self._sections[section]
+
+    def read_all_sections(self):
+        """
+        This method is used to read every input section at once, e.g. to check all the inputs of a
+        building before an analysis
+        """
+        for section in INPUT_SECTIONS:
+            self.read_section(section)
+
+    def input_file(self, *path):
+        return os.path.join(self.BaseDirectory, *path)
+
+    def read_plan(self):
+        geometry = self.input_file('Geometry')
+        return {'floorMaximumXDimension': np.genfromtxt(os.path.join(geometry, 'floorMaximumXDimension.txt')),
+                'floorMaximumZDimension': np.genfromtxt(os.path.join(geometry, 'floorMaximumZDimension.txt')),
+                'floorAreas': np.genfromtxt(os.path.join(geometry, 'floorAreas.txt'))}
+
+    def read_leaning_columns(self):
+        geometry = self.input_file('Geometry')
+        return {'leaningColumnNodesOpenSeesTags': np.genfromtxt(os.path.join(geometry, 'leaningColumnNodesOpenSeesTags.txt')).astype(int),
+                'leaningColumnNodesXCoordinates': np.genfromtxt(os.path.join(geometry, 'leaningColumnNodesXCoordinates.txt')),
+                'leaningColumnNodesZCoordinates': np.genfromtxt(os.path.join(geometry, 'leaningColumnNodesZCoordinates.txt'))}
+
+    def read_panels(self):
+        #imported here so that the design does not load the analysis modules
+        from OpenSeesExport import panel_node_tags
+        
+        geometry = self.input_file('Geometry')
+        panels = {}
+        for direction in ('X', 'Z'):
+            number = np.genfromtxt(os.path.join(geometry, 'numberOf%sDirectionWoodPanels.txt' % direction)).astype(int)
+            panels['numberOf%sDirectionWoodPanels' % direction] = number
+            for coordinate in ('X', 'Z'):
+                name = '%sDirectionWoodPanels%sCoordinates' % (direction, coordinate)
+                panels[name] = np.genfromtxt(os.path.join(geometry, name + '.txt'))
+            panels['%sDirectionWoodPanelsBotTag' % direction], panels['%sDirectionWoodPanelsTopTag' % direction] = \
+                panel_node_tags(number, direction)
+        return panels
+
+    def read_live_loads(self):
+        loads = self.input_file('Loads')
+        return {'liveLoads': np.genfromtxt(os.path.join(loads, 'liveLoads.txt')), # (kips per square inch)
+                'leaningcolumnLoads': np.genfromtxt(os.path.join(loads, 'leaningcolumnLoads.txt'))} # (kips)
+
+    def read_pushover(self):
+        static = self.input_file('AnalysisParameters', 'StaticAnalysis')
+        return {'PushoverParameter': {'Increment': np.genfromtxt(os.path.join(static, 'PushoverIncrementSize.txt')),
+                                      'PushoverXDrift': np.genfromtxt(os.path.join(static, 'PushoverXDrift.txt')),
+                                      'PushoverZDrift': np.genfromtxt(os.path.join(static, 'PushoverZDrift.txt'))}}
+
+    def read_dynamic(self):
+        dynamic = self.input_file('AnalysisParameters', 'DynamicAnalysis')
+        with open(os.path.join(dynamic, 'dampingModel.txt'), 'r') as myfile:
+            dampingModel = myfile.read()  #For now, just use Rayleigh damping
+        return {'DynamicParameter': {'CollapseLimit': np.genfromtxt(os.path.join(dynamic, 'CollapseDriftLimit.txt')),
+                                     'DemolitionLimit': np.genfromtxt(os.path.join(dynamic, 'DemolitionDriftLimit.txt')),
+                                     'DampingModel': dampingModel,
+                                     'DampingRatio': np.genfromtxt(os.path.join(dynamic, 'dampingRatio.txt'))}}
+
+    def read_materials(self):
+        # For now, Pinching4 material is used
+        pinching4 = self.input_file('StructuralProperties', 'Pinching4Materials')
+        MaterialProperty = {'MaterialLabel': np.genfromtxt(os.path.join(pinching4, 'materialNumber.txt'))}
+        for name in ('d1', 'd2', 'd3', 'd4', 'f1', 'f2', 'f3', 'f4', 'gD1', 'gDlim', 'gK1', 'gKlim',
+                     'rDisp', 'rForce', 'uForce'):
+            MaterialProperty[name] = np.genfromtxt(os.path.join(pinching4, name + '.txt'))
+        return {'MaterialProperty': MaterialProperty}
+
+    def read_panel_properties(self):
+        properties = {}
+        for direction in ('X', 'Z'):
+            panels = self.input_file('StructuralProperties', '%sWoodPanels' % direction)
+            properties['%sPanelLength' % direction] = np.genfromtxt(os.path.join(panels, 'length.txt'))
+            properties['%sPanelHeight' % direction] = np.genfromtxt(os.path.join(panels, 'height.txt'))
+            properties['%sPanelMaterial' % direction] = np.genfromtxt(os.path.join(panels, 'Pinching4MaterialNumber.txt'))
+        return properties
+
     def determine_Fa_coefficient(self, site_class, Ss):
         
         """
@@ -581,18 +596,103 @@ class ComputeSeismicForce(object):
             story_shear[story] = np.sum(seismic_force[story:])
         return seismic_force, story_shear
  
+    def calculate_MRSA_story_force(self, storyStiffness, combination = 'CQC', scaleToELF = True):
+        """
+        This method is used to calculate the seismic story forces with the modal response spectrum
+        analysis (ASCE 07-16 Section 12.9.1) instead of the ELF procedure. The building is modelled
+        as a shear building with the floor weights and the story stiffness of the designed walls
+        :param storyStiffness: story stiffness in the direction considered, first entry is the top
+                               story (see ModalResponseSpectrum.story_stiffness_from_designs). Units: kips/in
+        :param combination: 'SRSS' or 'CQC' modal combination
+        :param scaleToELF: if True, forces are scaled so the base shear is not less than the ELF base shear
+        :return: story forces, same order as the ELF 'story_force'. Units: kips
+        """
+        #imported here so that the design does not load the analysis modules
+        from ModalResponseSpectrum import modal_response_spectrum
+        
+        SDP = self.SeismicDesignParameter
+        result = modal_response_spectrum(self.floorWeights, storyStiffness, SDP['SDS'], SDP['SD1'], SDP['TL'], 
+                                         SDP['R'], SDP['Ie'], combination, 
+                                         ELFBaseShear = SDP['ELF Base Shear'] if scaleToELF else None)
+        SDP['MRSA story_force'] = result['story force'][0]
+        SDP['MRSA story_shear'] = result['story shear'][0]
+        SDP['MRSA Base Shear'] = result['base shear'][0]
+        SDP['MRSA periods'] = result['period'][0]
+        SDP['MRSA effective mass ratio'] = result['effective mass ratio'][0]
+        return SDP['MRSA story_force']
+    
+    def run_pushover(self, panelMaterial = None, numSteps = None):
+        """
+        This method is used to run the NumPy pushover analysis of the building in the direction 
+        of the wall line, with the ELF vertical distribution (Cvx) as load pattern
+        :param panelMaterial: Pinching4 material number of each panel, shape (stories, panels).
+                              Default is the panel material of the building model in this direction
+                              (see Pushover.panel_material_from_designs for the designed walls)
+        :param numSteps: number of analysis steps. Default follows the pushover increment size
+        :return: dictionary with the pushover curve (see Pushover.pushover) and its overstrength and 
+                 period-based ductility (see Pushover.pushover_performance)
+        """
+        from Pushover import panel_backbone, pushover, pushover_performance
+        
+        if panelMaterial is None:
+            #model inputs list the first story first
+            panelMaterial = np.atleast_2d(self.XPanelMaterial if self.direction == 'X' else self.ZPanelMaterial)[::-1]
+        driftLimit = float(self.PushoverParameter['Pushover%sDrift' % self.direction])
+        if numSteps is None:
+            numSteps = int(np.ceil(driftLimit*max(self.storyHeights)/float(self.PushoverParameter['Increment']))) + 1
+        SDP = self.SeismicDesignParameter
+        panelD, panelF = panel_backbone(self.MaterialProperty, np.atleast_2d(panelMaterial)[None])
+        result = pushover(panelD, panelF, self.storyHeights, np.ravel(SDP['story_force']), driftLimit, numSteps)
+        result.update(pushover_performance(result, self.floorWeights, SDP['ELF Base Shear'], SDP['Tu']))
+        self.PushoverResult = result
+        return result
+    
+    def run_time_history(self, groundMotion, dt, panelMaterial = None, jobs = 1):
+        """
+        This method is used to run the NumPy nonlinear time history analysis of the building in the 
+        direction of the wall line for many ground motion records, with the damping and the collapse
+        and demolition drift limits of DynamicParameter
+        :param groundMotion: accelerations, shape (records, steps), see TimeHistory.read_ground_motion,
+                             stack_ground_motions and synthetic_ground_motions. Units: g
+        :param dt: time step of the records. Units: s
+        :param panelMaterial: Pinching4 material number of each panel, shape (stories, panels).
+                              Default is the panel material of the building model in this direction
+        :param jobs: number of processes used to run the records
+        :return: dictionary with the peak and residual drifts and the collapse and demolition flags
+                 (see TimeHistory.nonlinear_time_history)
+        """
+        from TimeHistory import nonlinear_time_history
+        
+        if panelMaterial is None:
+            #model inputs list the first story first
+            panelMaterial = np.atleast_2d(self.XPanelMaterial if self.direction == 'X' else self.ZPanelMaterial)[::-1]
+        self.TimeHistoryResult = nonlinear_time_history(groundMotion, dt, self.MaterialProperty, panelMaterial, 
+                                                        self.floorWeights, self.storyHeights, 
+                                                        self.DynamicParameter, jobs)
+        return self.TimeHistoryResult
+    
+    def wall_story_force(self, storyForce):
+        """
+        This method is used to get the story force taken by one wall of the wall line
+        :param storyForce: story force of the building at each floor level, top floor first. Unit: Kips
+        :return: story force per wall at each floor level. Unit: Kips
+        """
+        return np.ravel(storyForce)[:self.numberOfStories] * self.loadRatio / self.wallsPerLine
+    
     def SW_shear_demand(self):
         """
         This method is used to calculate unit shear demand on shear wall in
         terms of klf
-        :attribute Fx: Seismic Forces at each floor level. Unit: Kips 
+        :attribute Fx: Seismic Forces at each floor level (ELF story forces with ELFDemandTag). Unit: Kips 
         :attribute loadRatio: tribuitary load ratio taken by the wall 
         :attribute wallsPerLine: number of walls per shear wall line 
         
         :return: lineal shear demand on the shear wall. Unit: klf
         """
-        # self.story_force_per_wall = self.SeismicDesignParameter['story_force'] * self.loadRatio / self.wallsPerLine
-        self.story_force_per_wall = self.Fx * self.loadRatio / self.wallsPerLine
+        if self.ELFDemandTag:
+            self.story_force_per_wall = self.wall_story_force(self.SeismicDesignParameter['story_force'])
+        else:
+            self.story_force_per_wall = self.wall_story_force(self.Fx)
         self.target_unit_shear = np.cumsum(self.story_force_per_wall)/self.wallLength
 
         return self.target_unit_shear
@@ -606,8 +706,28 @@ class ComputeSeismicForce(object):
         self.tension_demand = np.cumsum(self.target_unit_shear * (self.story_height - 1))
         
         return self.tension_demand
-        
-        
-        
 
 
+if __name__ == '__main__':
+    #benchmark: files opened to compute the demand of every wall line of a building, reading only the
+    #sections needed by the design and reading every section as before
+    #usage: python ShearForces.py <absolute path of the building inputs>
+    import sys
+
+    from LoadDistribution import list_wall_lines
+
+    opened = []
+    sys.addaudithook(lambda event, args: opened.append(args[0]) if event == 'open' and isinstance(args[0], str) else None)
+
+    BaseDirectory = os.path.abspath(sys.argv[1])
+    lines = [(direction, name) for direction in ('X', 'Z') for name in list_wall_lines(BaseDirectory, direction)]
+    for readAll in (False, True):
+        count = len(opened)
+        for direction, name in lines:
+            ModelClass = ComputeSeismicForce('benchmark', BaseDirectory, 1.0, direction, name, False)
+            if readAll:
+                ModelClass.read_all_sections()
+        files = [path for path in opened[count:] if path.endswith('.txt')]
+        print('%-14s %4d files opened per design, %5d for %d wall lines'
+              % ('all sections' if readAll else 'design only', len(files) // max(len(lines), 1), len(files), len(lines)))
+
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to load the shear wall assembly database into a compact, category-encoded
+catalog. String columns (sheathing, nail size, panel thickness and assembly name) are stored as
+small integer codes into per-column category tables and numeric columns are stored as contiguous
+NumPy arrays, so the capacity and detailing filters used during design are binary searches and
+integer comparisons rather than string comparisons over a DataFrame.
+
+The parsed catalog is cached next to the csv file in a binary (.npz) file which is reused until
+the csv file changes.
+
+The catalog can also give a dominance-pruned view of itself: rows for which another assembly has
+at least the LRFD capacity and Ga at no higher cost are removed, which shortens the assembly walk
+of the drift redesign. The pruning is opt-in (pruneCatalog) and can change the design. The cost of a
+row is taken from a 'Cost' column of the csv file or from set_cost(); without either, a placeholder
+relative cost model is used (PANEL_COST and the factors below), which is not based on real prices.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+import time
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+
+#column name: kind of column. 'category' columns are integer encoded, the others are numeric
+SHEARWALL_SCHEMA = {'Sheathing': 'category',
+                    'nail size': 'category',
+                    'panel thickness': 'category',
+                    'nail spacing': 'int',
+                    'Vs (plf)': 'float',
+                    'Ga(OSB)(kips/in)': 'float',
+                    'Sheathed sides': 'int',
+                    'LRFD(klf)': 'float',
+                    'ASD': 'float',
+                    'Assembly': 'category',
+                    'OpenSeesTag': 'int'}
+
+#optional columns that are carried along when the csv file has them
+OPTIONAL_SCHEMA = {'Cost': 'float'}
+
+#placeholder relative cost model used for the dominance pruning when the catalog has no 'Cost' column
+#and no cost is given with set_cost(). The factors are not real prices.
+#cost per foot of wall = sheathed sides * (sheathing grade factor * thickness(in) * PANEL_COST
+#                                          + nail size factor * nails per foot of panel edge)
+PANEL_COST = 10.0
+SHEATHING_COST_FACTOR = {'WSP': 1.0, 'Structural I': 1.15}
+NAIL_COST_FACTOR = {'6d': 0.8, '8d': 1.0, '10d': 1.3}
+
+#bump this whenever the layout of the binary cache changes
+CACHE_VERSION = 2
+
+
+class ShearWallCatalog():
+
+    def __init__(self, columns, categories, schema = SHEARWALL_SCHEMA, source = None):
+        """
+        :param columns: dictionary of column name: numpy array. Category columns hold integer codes
+        :param categories: dictionary of category column name: numpy array of category labels
+        :param schema: dictionary of column name: column kind used to validate the catalog
+        :param source: path of the csv file the catalog was read from (for information only)
+        """
+        self.schema = schema
+        self.columns = columns
+        self.categories = categories
+        self.source = source
+        self.numRows = len(next(iter(columns.values())))
+
+        self.lrfd = self.columns['LRFD(klf)']
+        self.Ga = self.columns['Ga(OSB)(kips/in)']
+        #the legacy design walks the database top to bottom, so rows have to stay in csv order.
+        #when LRFD is sorted (as in shearwall_database.csv) the capacity filter is a binary search
+        self.isCapacitySorted = bool(np.all(np.diff(self.lrfd) >= 0))
+        self.allIndex = np.arange(self.numRows)
+
+        #reverse lookup of category label -> code for every category column
+        self._code_lookup = {name: {label: code for code, label in enumerate(labels)}
+                             for name, labels in self.categories.items()}
+        #(detailing filter, pruned) -> row indices, their LRFD and whether that LRFD is sorted,
+        #so repeated filters cost nothing
+        self._detailing_cache = {}
+        self._cost = None
+        self.costSource = 'Cost column' if 'Cost' in self.columns else 'placeholder'
+
+        self.validate()
+
+    @classmethod
+    def from_dataframe(cls, df, schema = SHEARWALL_SCHEMA, source = None):
+        """
+        This method is used to encode a database dataframe into a catalog
+        :param df: dataframe with (at least) the columns listed in schema
+        :return: ShearWallCatalog
+        """
+        missing = [name for name in schema if name not in df.columns]
+        if missing:
+            raise ValueError('Catalog %s is missing required column(s): %s' % (source, ', '.join(missing)))
+        schema = dict(schema, **{name: kind for name, kind in OPTIONAL_SCHEMA.items() if name in df.columns})
+
+        columns = {}
+        categories = {}
+        for name, kind in schema.items():
+            values = df[name]
+            if values.isnull().any():
+                raise ValueError('Catalog %s has empty entries in column "%s"' % (source, name))
+            if kind == 'category':
+                labels, codes = np.unique(values.astype(str).values, return_inverse = True)
+                #smallest integer type that can hold all codes keeps large catalogs compact
+                columns[name] = codes.astype(np.min_scalar_type(max(len(labels) - 1, 0)))
+                categories[name] = labels
+            else:
+                if not pd.api.types.is_numeric_dtype(values):
+                    raise ValueError('Catalog %s column "%s" must be numeric' % (source, name))
+                columns[name] = values.values.astype(np.int64 if kind == 'int' else np.float64)
+
+        return cls(columns, categories, schema, source)
+
+    @classmethod
+    def from_csv(cls, path, schema = SHEARWALL_SCHEMA, cache = True):
+        """
+        This method is used to read a catalog from a csv file. If cache is True, the encoded
+        catalog is stored in a binary file next to the csv file and reused until the csv changes
+        :param path: path to the csv file
+        :return: ShearWallCatalog
+        """
+        cache_path = os.path.splitext(path)[0] + '.catalog.npz'
+        stat = os.stat(path)
+        signature = np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype = np.int64)
+
+        if cache and os.path.exists(cache_path):
+            try:
+                catalog = cls._read_cache(cache_path, signature, schema, path)
+            except (OSError, KeyError, ValueError):
+                catalog = None
+            if catalog is not None:
+                return catalog
+
+        catalog = cls.from_dataframe(pd.read_csv(path), schema, source = path)
+        if cache:
+            catalog._write_cache(cache_path, signature)
+        return catalog
+
+    @classmethod
+    def _read_cache(cls, cache_path, signature, schema, source):
+        with np.load(cache_path, allow_pickle = False) as data:
+            if not np.array_equal(data['__signature__'], signature):
+                return None
+            schema = dict(schema, **{name: kind for name, kind in OPTIONAL_SCHEMA.items() if 'col:' + name in data})
+            columns = {name: data['col:' + name] for name in schema}
+            categories = {name: data['cat:' + name] for name, kind in schema.items() if kind == 'category'}
+        return cls(columns, categories, schema, source)
+
+    def _write_cache(self, cache_path, signature):
+        arrays = {'__signature__': signature}
+        arrays.update({'col:' + name: values for name, values in self.columns.items()})
+        #labels are stored as fixed width strings; object arrays cannot be read back without pickle
+        arrays.update({'cat:' + name: np.asarray(labels, dtype = str) for name, labels in self.categories.items()})
+        #write to a temporary file first so that a half written cache is never picked up
+        temp_path = cache_path + '.%d.tmp' % os.getpid()
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            #the cache is an optimization only; read-only library folders simply skip it
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def validate(self):
+        """
+        This method is used to validate the schema and values of the catalog
+        :return: None. Raises ValueError if the catalog is not usable for design
+        """
+        for name, kind in self.schema.items():
+            if name not in self.columns:
+                raise ValueError('Catalog %s is missing required column "%s"' % (self.source, name))
+            if len(self.columns[name]) != self.numRows:
+                raise ValueError('Catalog %s column "%s" has the wrong length' % (self.source, name))
+            if kind == 'category':
+                if np.any(self.columns[name] >= len(self.categories[name])):
+                    raise ValueError('Catalog %s column "%s" has invalid category codes' % (self.source, name))
+            elif not np.all(np.isfinite(self.columns[name])):
+                raise ValueError('Catalog %s column "%s" has non-finite values' % (self.source, name))
+
+        if self.numRows == 0:
+            raise ValueError('Catalog %s is empty' % self.source)
+        if np.any(self.lrfd <= 0) or np.any(self.Ga <= 0):
+            raise ValueError('Catalog %s must have positive LRFD capacity and Ga' % self.source)
+        if 'nail spacing' in self.columns and np.any(self.columns['nail spacing'] <= 0):
+            raise ValueError('Catalog %s must have positive nail spacing' % self.source)
+
+    def __len__(self):
+        return self.numRows
+
+    @property
+    def nbytes(self):
+        """
+        :return: memory held by the catalog arrays in bytes
+        """
+        return sum(values.nbytes for values in self.columns.values()) + \
+            sum(labels.nbytes for labels in self.categories.values())
+
+    def code_of(self, name, label):
+        """
+        :param name: category column name
+        :param label: category label, e.g. '8d'
+        :return: integer code of the label, -1 if the label does not exist (matches no row)
+        """
+        return self._code_lookup[name].get(label, -1)
+
+    def value(self, name, index):
+        """
+        :return: value of column name at row index, category columns are decoded to labels
+        """
+        if self.schema.get(name) == 'category':
+            return self.categories[name][self.columns[name][index]]
+        return self.columns[name][index]
+
+    def to_dataframe(self, index = None):
+        """
+        This method is used to decode (part of) the catalog back to the csv dataframe layout
+        :param index: row indices to decode. All rows if None
+        :return: pandas dataframe
+        """
+        index = self.allIndex if index is None else index
+        return pd.DataFrame({name: self.value(name, index) for name in self.schema})
+
+    def set_cost(self, cost):
+        """
+        This method is used to give the real cost of the assemblies used by the dominance pruning
+        :param cost: cost of every row (e.g. per foot of wall), array in catalog order or dictionary
+                     of assembly name: cost covering every assembly of the catalog
+        :return: None. Raises ValueError if a cost is missing, negative or not finite
+        """
+        if isinstance(cost, dict):
+            assembly = self.value('Assembly', self.allIndex)
+            missing = [name for name in assembly if name not in cost]
+            if missing:
+                raise ValueError('No cost is given for %d assemblies, e.g. %s' % (len(missing), missing[0]))
+            cost = [cost[name] for name in assembly]
+        cost = np.asarray(cost, dtype = float)
+        if cost.shape != (self.numRows,):
+            raise ValueError('One cost per catalog row is needed (%d), not %s' % (self.numRows, cost.shape))
+        if not np.all(np.isfinite(cost)) or np.any(cost < 0):
+            raise ValueError('Costs must be finite and not negative')
+        self._cost = cost
+        self.costSource = 'user supplied'
+        #the pruned views depend on the cost
+        self._detailing_cache = {key: value for key, value in self._detailing_cache.items() if not key[-1]}
+
+    @property
+    def cost(self):
+        """
+        :return: cost of every row. Taken from set_cost() or the 'Cost' column if the catalog has one,
+                 otherwise estimated with the placeholder relative cost model at the top of this file
+        """
+        if self._cost is None:
+            if 'Cost' in self.columns:
+                self._cost = self.columns['Cost']
+            else:
+                thickness = np.array([float(Fraction(label.replace('in', '').strip()))
+                                      for label in self.categories['panel thickness']])
+                sheathing = np.array([SHEATHING_COST_FACTOR.get(label, 1.0) for label in self.categories['Sheathing']])
+                nail = np.array([NAIL_COST_FACTOR.get(label, 1.0) for label in self.categories['nail size']])
+                self._cost = self.columns['Sheathed sides'] * (
+                    sheathing[self.columns['Sheathing']] * thickness[self.columns['panel thickness']] * PANEL_COST
+                    + nail[self.columns['nail size']] * 12.0 / self.columns['nail spacing'])
+        return self._cost
+
+    def detailing_index(self, panelThickness, nailSize, nailSpacing, pruned = False):
+        """
+        This method is used to find the rows that meet the user's detailing specification.
+        A specification is only applied if it is given, i.e. panel thickness and nail size strings
+        with at least two characters and a nail spacing string with at least one character
+        (same convention as the preferred_*.txt inputs)
+        :param panelThickness: preferred panel thickness string, e.g. '15/32in'
+        :param nailSize: preferred nail size string, e.g. '8d'
+        :param nailSpacing: preferred nail spacing string, e.g. '4'
+        :param pruned: if True, only the Pareto-efficient rows among them are returned (see pareto_index)
+        :return: row indices, in catalog order (ascending LRFD if pruned)
+        """
+        return self._detailing(panelThickness, nailSize, nailSpacing, pruned)[0]
+
+    def _detailing(self, panelThickness, nailSize, nailSpacing, pruned = False):
+        key = (panelThickness, nailSize, nailSpacing, pruned)
+        if key not in self._detailing_cache:
+            if pruned:
+                index = self.detailing_index(panelThickness, nailSize, nailSpacing)
+                index = self.pareto_index(index)
+                isSorted = True
+            else:
+                mask = np.ones(self.numRows, dtype = bool)
+                if len(panelThickness) >= 2:
+                    mask &= self.columns['panel thickness'] == self.code_of('panel thickness', '%s' % panelThickness)
+                if len(nailSize) >= 2:
+                    mask &= self.columns['nail size'] == self.code_of('nail size', '%s' % nailSize)
+                if len(nailSpacing) >= 1:
+                    mask &= self.columns['nail spacing'] == int(nailSpacing)
+                index = np.flatnonzero(mask)
+                isSorted = self.isCapacitySorted
+            self._detailing_cache[key] = (index, self.lrfd[index], isSorted)
+        return self._detailing_cache[key]
+
+    def pareto_index(self, index = None, chunk = 1024):
+        """
+        This method is used to remove dominated rows. A row is dominated if another row has equal or
+        higher LRFD capacity and Ga at equal or lower cost, and is better in at least one of them
+        (of several identical rows the first one is kept).
+        :param index: rows to prune. All rows if None
+        :param chunk: number of rows compared against all others at once (bounds the memory use)
+        :return: indices of the Pareto-efficient rows, ordered by ascending LRFD for the redesign walk
+        """
+        index = self.allIndex if index is None else np.asarray(index)
+        lrfd, Ga, cost = self.lrfd[index], self.Ga[index], self.cost[index]
+        position = np.arange(len(index))
+        dominated = np.zeros(len(index), dtype = bool)
+        for start in range(0, len(index), chunk):
+            i = slice(start, start + chunk)
+            #rows j (columns) that are at least as good as rows i (rows) in all three criteria
+            noWorse = (lrfd[None, :] >= lrfd[i, None]) & (Ga[None, :] >= Ga[i, None]) & (cost[None, :] <= cost[i, None])
+            better = (lrfd[None, :] > lrfd[i, None]) | (Ga[None, :] > Ga[i, None]) | (cost[None, :] < cost[i, None])
+            #identical rows: the one that comes first in the catalog dominates the later ones
+            earlier = position[None, :] < position[i, None]
+            dominated[i] = np.any(noWorse & (better | earlier), axis = 1)
+        kept = index[~dominated]
+        return kept[np.argsort(self.lrfd[kept], kind = 'stable')]
+
+    def pruning_summary(self, detailing = None):
+        """
+        This method is used to report how much of the catalog the dominance pruning removes
+        :param detailing: (panelThickness, nailSize, nailSpacing) strings, see detailing_index().
+                          The whole catalog if None
+        :return: dictionary with the number of rows before and after pruning and the 'cost model'
+                 ('Cost column', 'user supplied', or 'placeholder' for the relative cost model, which
+                 is not based on real prices)
+        """
+        detailing = ('', '', '') if detailing is None else detailing
+        rows = len(self.detailing_index(*detailing))
+        kept = len(self.detailing_index(*detailing, pruned = True))
+        return {'rows': rows, 'kept': kept, 'removed': rows - kept,
+                'removed fraction': (rows - kept)/rows if rows else 0.0, 'cost model': self.costSource}
+
+    def capacity_index(self, demand, DCRatio = None, detailing = None, pruned = False):
+        """
+        This method is used to find the rows whose (D/C adjusted) LRFD capacity meets the demand
+        :param demand: unit shear demand. Units: klf
+        :param DCRatio: target D/C ratio. If given, capacity is multiplied by it before comparison
+        :param detailing: (panelThickness, nailSize, nailSpacing) strings to restrict the search
+                          to, see detailing_index(). All rows if None
+        :param pruned: if True, search the dominance-pruned view only
+        :return: row indices, in catalog order (ascending LRFD if pruned)
+        """
+        if detailing is None and not pruned:
+            index, lrfd, isSorted = self.allIndex, self.lrfd, self.isCapacitySorted
+        else:
+            index, lrfd, isSorted = self._detailing(*(('', '', '') if detailing is None else detailing), pruned)
+
+        if not isSorted:
+            capacity = lrfd if DCRatio is None else lrfd * DCRatio
+            return index[capacity >= demand]
+
+        if DCRatio is None:
+            return index[np.searchsorted(lrfd, demand, side = 'left'):]
+
+        #binary search on demand/DCRatio, then nudge the boundary so the comparison is made
+        #exactly as LRFD * DCRatio >= demand
+        start = int(np.searchsorted(lrfd, demand/DCRatio, side = 'left'))
+        while start > 0 and lrfd[start - 1] * DCRatio >= demand:
+            start -= 1
+        while start < len(lrfd) and lrfd[start] * DCRatio < demand:
+            start += 1
+        return index[start:]
+
+    def start_at(self, index, row):
+        """
+        This method is used to drop the candidates that come before a given row, e.g. to restart
+        a search from an assembly selected earlier
+        :param index: candidate row indices, e.g. from capacity_index()
+        :param row: row to start from
+        :return: the candidates from row on; if row is not a candidate, the candidates with at least its LRFD capacity
+        """
+        position = np.flatnonzero(index == row)
+        if len(position):
+            return index[position[0]:]
+        return index[self.lrfd[index] >= self.lrfd[row]]
+
+
+if __name__ == '__main__':
+    #benchmark: memory and filter cost for the shipped database and a catalog 100 times larger
+    base = pd.read_csv('shearwall_database.csv')
+    for scale in (1, 100):
+        df = pd.concat([base] * scale, ignore_index = True)
+        df['Assembly'] = df['Assembly'] + pd.Series(np.arange(len(df)) // len(base), dtype = str)
+        df = df.sort_values('LRFD(klf)', kind = 'stable', ignore_index = True)
+        catalog = ShearWallCatalog.from_dataframe(df)
+
+        start = time.perf_counter()
+        for demand in np.linspace(0.1, 2.7, 2000):
+            catalog.capacity_index(demand, detailing = ('15/32in', '10d', '4'))
+            catalog.capacity_index(demand)
+        elapsed = (time.perf_counter() - start) / 2000
+
+        start = time.perf_counter()
+        for demand in np.linspace(0.1, 2.7, 200):
+            dfs = df[df['LRFD(klf)'] >= demand]
+            dfs.loc[(dfs['panel thickness'] == '15/32in') & (dfs['nail spacing'] == 4) & (dfs['nail size'] == '10d')]
+        elapsed_df = (time.perf_counter() - start) / 200
+
+        print('%6d rows: catalog %8.1f kB, %7.2f us/filter | dataframe %8.1f kB, %7.2f us/filter'
+              % (len(catalog), catalog.nbytes/1e3, elapsed*1e6, df.memory_usage(deep = True).sum()/1e3, elapsed_df*1e6))
+
+    catalog = ShearWallCatalog.from_dataframe(base)
+    for detailing in (None, ('15/32in', '', ''), ('', '8d', ''), ('', '', '4')):
+        print('dominance pruning, detailing %s: %s' % (detailing, catalog.pruning_summary(detailing)))
@@ -15,21 +15,25 @@ __author__ = 'Laxman Dahal'
 
 
 
+import copy
 import numpy as np 
 import pandas as pd 
 import os
 import re 
 import sys 
 
-from global_variables import shearwall_database
-from global_variables import tiedown_database
+from global_variables import shearwall_catalog
+from global_variables import tiedown_catalog
 from ShearForces import ComputeSeismicForce
+from Deflection import assembly_deflection, wall_deflection, story_drift
+from DesignErrors import DesignInfeasibleError
 
 
 class DesignShearWall():
     
     def __init__(self, caseID, BaseDirectory, direction, wallLength, counter, floorIndex, wall_line_name, 
-                 userDefinedDetailingTag, reDesignTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag):
+                 userDefinedDetailingTag, reDesignTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag,
+                 pruneCatalog = False, loadRatio = None, startAssembly = None, ELFDemandTag = False):
         self.caseID = caseID 
         self.BaseDirectory = BaseDirectory 
         self.direction = direction 
@@ -43,6 +47,10 @@ class DesignShearWall():
         self.iterateFlag = iterateFlag
         self.counter = counter
         self.floorIndex = floorIndex
+        #if True, dominated assemblies are skipped (see ShearWallCatalog.pareto_index)
+        self.pruneCatalog = pruneCatalog
+        #catalog row of an assembly selected before; weaker candidates are skipped (warm start)
+        self.startAssembly = startAssembly
         
         #shear wall information
         self.tribuitaryWidth = None 
@@ -52,6 +60,9 @@ class DesignShearWall():
         # self.wallLength = None    
         self.Ga = None
         self.loadRatio = None
+        self.loadRatioOverride = loadRatio
+        #if True, the demand is the ELF story force of the site instead of Fx_ToTestTheCode.txt
+        self.ELFDemandTag = ELFDemandTag
         #shear wall lineal loads
         self.loads = None 
         self.story_height = None
@@ -60,7 +71,8 @@ class DesignShearWall():
         self.userInputFlag = None 
 
         ModelClass = ComputeSeismicForce(caseID, BaseDirectory,self.wallLength, self.direction,
-                                         self.wall_line_name, self.reDesignTag, SeismicDesignParameterFlag = True)
+                                         self.wall_line_name, self.reDesignTag, SeismicDesignParameterFlag = True,
+                                         loadRatio = self.loadRatioOverride, ELFDemandTag = self.ELFDemandTag)
         
         # self.Fx = ModelClass.SeismicDesignParameter['story_force']
         
@@ -84,8 +96,8 @@ class DesignShearWall():
         
         self.read_sw_user_inputs()
         # self.SW_shear_demand()
-        self.find_shearwall_candidate(shearwall_database)
-        self.anchorage_design(tiedown_database, E = 29000)
+        self.find_shearwall_candidate(shearwall_catalog)
+        self.anchorage_design(tiedown_catalog, E = 29000)
         self.calculate_assembly_deflection()
         self.calculate_SW_deflection()
         self.calculate_story_drift()
@@ -117,7 +129,10 @@ class DesignShearWall():
         self.totalArea = np.genfromtxt('floorAreas.txt')  # wall stiffness of each wall segment
         self.wallsPerLine = np.genfromtxt('wallsPerLine.txt')
         self.allowableDrift = np.genfromtxt('allowableDrift.txt')
-        self.loadRatio = np.genfromtxt('tribuitaryLoadRatio.txt')
+        if self.loadRatioOverride is None:
+            self.loadRatio = np.genfromtxt('tribuitaryLoadRatio.txt')
+        else:
+            self.loadRatio = self.loadRatioOverride
         
         #read in shear wall lineal load 
         os.chdir(self.BaseDirectory + '/%s_direction_wall'%self.direction + '/%s'%self.wall_line_name + '/Loads')
@@ -144,7 +159,8 @@ class DesignShearWall():
         self.userDefinedDCRatioFlag_TieDown = np.loadtxt('userDefinedDCRatioFlag_TieDown.txt')
         self.userDefinedDCRatio_TieDown = np.loadtxt('userDefinedDCRatio_TieDown.txt')
         
-        self.Fx = np.genfromtxt('Fx_ToTestTheCode.txt')
+        if not self.ELFDemandTag:
+            self.Fx = np.genfromtxt('Fx_ToTestTheCode.txt')
         
     # def increaseLength(self):
         """
@@ -180,116 +196,75 @@ class DesignShearWall():
     
     #     return self.target_unit_shear
 
-    def find_shearwall_candidate(self, shearwall_database):
+    def find_shearwall_candidate(self, shearwall_catalog):
         """
         This method is used to find the most economical shear wall that satisfies the demand
         computed in method SW_shear_demand().
-        :param shearwall_database: a dataframe read from shearwall_database.csv in Library folder
+        :param shearwall_catalog: a ShearWallCatalog read from shearwall_database.csv in Library folder
         :attribute target_unit_shear: unit shear deman on the shear wall. Units: klf
         :return: a pandas dataframe of shear wall design for every floor
         """
         # instantiate a dummy list for the purpose of creating a dataframe later
         d = []
-        # floorindex = i 
-        # length of the self.target_unit_shear gives the number of stories 
-        #loop through the number of stories to design shear wall at each story individually 
+        #the catalog filters return row indices (in database order), so the first index is the
+        #most economical assembly, same as the first row of the filtered database
             #check if user has specified D/C ratio.
             # if the D/C ratio is specified, multiply LRFD capacity with D/C ratio such that the code selects...
             #...shear wall with higher strength
-
         if self.userDefinedDCTag:
-            df = shearwall_database[shearwall_database['LRFD(klf)']*self.userDefinedDCRatio >= self.target_unit_shear]
-            #if D/C ratio is not specified, filter the database with capacity greater than the demand
+            DCRatio = self.userDefinedDCRatio
         else: 
-            df = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear]
+            #if D/C ratio is not specified, filter the database with capacity greater than the demand
+            DCRatio = None
+        index = shearwall_catalog.capacity_index(self.target_unit_shear, DCRatio, pruned = self.pruneCatalog)
                 
             #make copy of the filtered database for later use     
-        df1 = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear]
+        index1 = shearwall_catalog.capacity_index(self.target_unit_shear, pruned = self.pruneCatalog)
             #check if user has specified shear wall assembly detailing input 
         if self.userDefinedDetailingTag:
-                # if self.userDefinedDCTag:
-                #     df = shearwall_database[shearwall_database['LRFD(klf)']*self.userDefinedDCRatio >= self.target_unit_shear[i]]
-                #     #if D/C ratio is not specified, filter the database with capacity greater than the demand
-                # else: 
-                #     df = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear[i]]
-                    
-                #if all three detailing specifications (nail spacing, nail size, and panel thickness) are user input
-            if (len(self.panelThickness)>= 2) & (len(self.nailSize)>= 2) & (len(self.nailSpacing) >= 1):
-                #filter database that meets user input requirements
-                df = df.loc[(df['panel thickness'] == '%s'%self.panelThickness) & (df['nail spacing'] == int(self.nailSpacing)) \
-                            & (df['nail size'] == '%s'%self.nailSize)]
-                # if only one or two (out of 3) detailing are user inputs filter the database to meet criteria
-            else: 
-                    # if panel thickness and nail size are user inputs
-                if (len(self.panelThickness)>= 2) & (len(self.nailSize)>= 2) & (len(self.nailSpacing) < 1): 
-                    df = df.loc[(df['panel thickness'] == '%s'%self.panelThickness) & (df['nail size'] == '%s'%self.nailSize)]
-                        # if nail spacing and nail size are user inputs 
-                if (len(self.panelThickness)< 2) & (len(self.nailSize)>= 2) & (len(self.nailSpacing) >= 1):
-                    df = df.loc[(df['nail spacing'] == int(self.nailSpacing)) & (df['nail size'] == '%s'%self.nailSize)]
-                        #if panel thickness and nail spacing are user inputs  
-                if (len(self.panelThickness)>= 2) & (len(self.nailSize)< 2) & (len(self.nailSpacing) >= 1):
-                    df = df.loc[(df['nail spacing'] == int(self.nailSpacing)) & (df['panel thickness'] == '%s'%self.panelThickness)]
-                        # if only panel thickness is the user input 
-                if (len(self.panelThickness)>= 2) & (len(self.nailSize)< 2) & (len(self.nailSpacing) < 1):
-                    df = df.loc[df['panel thickness'] == '%s'%self.panelThickness]    
-                        # if only nail size is the user input 
-                if (len(self.panelThickness)< 2) & (len(self.nailSize)>= 2) & (len(self.nailSpacing) < 1):
-                    df = df.loc[df['nail size'] == '%s'%self.nailSize]
-                        #if only nai spacing is the user input  
-                if (len(self.panelThickness)< 2) & (len(self.nailSize)< 2) & (len(self.nailSpacing) >= 1):
-                    df = df.loc[df['nail spacing'] == int(self.nailSpacing)]
+            #only the detailing specifications (nail spacing, nail size, and panel thickness) that are
+            #user inputs are used to filter the database
+            index = shearwall_catalog.capacity_index(self.target_unit_shear, DCRatio, 
+                                                     detailing = (self.panelThickness, self.nailSize, self.nailSpacing),
+                                                     pruned = self.pruneCatalog)
         else:
             pass 
+        
+        #warm start: the search restarts from the assembly selected before
+        if self.startAssembly is not None:
+            index = shearwall_catalog.start_at(index, self.startAssembly)
+            index1 = shearwall_catalog.start_at(index1, self.startAssembly)
             
         if (not self.userDefinedDetailingTag) & (not self.userDefinedDCTag):
             
                 # self.counter = 0
-            df = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear]
-            # df = shearwall_database[(shearwall_database['LRFD(klf)'] >= self.target_unit_shear) \
-            #                         & (shearwall_database['LRFD(klf)'] <= self.target_unit_shear/0.6)]
-                                 
+            index = index1
 
             if self.iterateFlag:
-                # try:
-                df = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear]
                 print(self.counter)
                 print(self.target_unit_shear)
-                df = df.iloc[self.counter]
-                df = pd.DataFrame([df])
-
-                # except Exception as e:
-                #     print(e.__doc__)
-                #     if self.counter > 50:
-                #         sys.exit(1)
-                # # # except: 
-                #     df = shearwall_database[(shearwall_database['LRFD(klf)'] >= self.target_unit_shear) \
-                #                             & (shearwall_database['LRFD(klf)'] <= self.target_unit_shear/0.6)]
-                    
-                    
-                        
-                # try:
-                #     # df = shearwall_database[shearwall_database['LRFD(klf)'].between(self.target_unit_shear[i], self.target_unit_shear[i]*1.05, inclusive = False)]
-                #     df = shearwall_database[(shearwall_database['LRFD(klf)'] >= self.target_unit_shear[i]) \
-                #                             & (shearwall_database['LRFD(klf)'] < self.target_unit_shear[i]*1.05)]
-                #     df = df.sort_values(by = ['Ga(OSB)(kips/in)'], ascending = False)
-                # except IndexError:
-                #     df = shearwall_database[shearwall_database['LRFD(klf)'] >= self.target_unit_shear[i]]
+                #walk up the database from the first assembly that meets the demand
+                index = index1[[self.counter]]
                 
             #for each loop, calculate the level,
         # level = len(self.target_unit_shear) - self.floorIndex
         level = self.numFloors - self.floorIndex
             # get the shear wall detailing at the first index
         try:
-            self.sw_dict= {'Shear Wall Assembly':df['Assembly'].iloc[0], 'Ga(k/in)':df['Ga(OSB)(kips/in)'].iloc[0],
-                      'level':level, 'LRFD(klf)': df['LRFD(klf)'].iloc[0], 'Drift(in)': 'NaN', 'D/C Ratio':self.target_unit_shear/df['LRFD(klf)'].iloc[0],
-                      'OpenSees Tag':df['OpenSeesTag'].iloc[0]}
+            self.assemblyIndex = index[0]
             #if no shear wall exists (might happen if detailing specification is desired), user the dataframe 
             #that does not filter based on detailing specificatin
         except IndexError: 
             print('No shearwall found. Please try different detailing or use default values @ level %d' %level)
-            self.sw_dict= {'Shear Wall Assembly':df1['Assembly'].iloc[0], 'Ga(k/in)':df1['Ga(OSB)(kips/in)'].iloc[0],
-                      'level':level, 'LRFD(klf)': df1['LRFD(klf)'].iloc[0], 'Drift(in)': 'NaN', 'D/C Ratio':self.target_unit_shear/df1['LRFD(klf)'].iloc[0],
-                      'OpenSees Tag':df1['OpenSeesTag'].iloc[0]}
+            if len(index1) == 0:
+                raise DesignInfeasibleError('strength', 'unit shear demand %.3f klf exceeds the largest LRFD capacity '
+                                            '%.3f klf of the catalog' %(self.target_unit_shear, shearwall_catalog.lrfd.max()),
+                                            self.wall_line_name, level)
+            self.assemblyIndex = index1[0]
+        i = self.assemblyIndex
+        self.sw_dict= {'Shear Wall Assembly':shearwall_catalog.value('Assembly', i), 'Ga(k/in)':shearwall_catalog.Ga[i],
+                  'level':level, 'LRFD(klf)': shearwall_catalog.lrfd[i], 'Drift(in)': 'NaN', 'D/C Ratio':self.target_unit_shear/shearwall_catalog.lrfd[i],
+                  'OpenSees Tag':shearwall_catalog.value('OpenSeesTag', i)}
             
         d.append(self.sw_dict)
         #create a database
@@ -299,10 +274,10 @@ class DesignShearWall():
         return self.sw_dict
 
     
-    def anchorage_design(self, tiedown_database, E = 29000 ): 
+    def anchorage_design(self, tiedown_catalog, E = 29000 ): 
         """
         This method is user to design anchorage
-        :param tiedown_database: database compiled based on AISC Manual Table 7-17
+        :param tiedown_catalog: TieDownCatalog of the database compiled based on AISC Manual Table 7-17
         :param E: Youngs Modulus of steel. Set to be 29000 as default
         :returns: dataframe of tie down design for each floor 
         """
@@ -312,39 +287,25 @@ class DesignShearWall():
         # counter_moment = 0.72 * self.loads * self.wallLength /2 
         
         # self.tension_demand = np.cumsum(self.target_unit_shear * (self.story_height - 1))
-        #instantiate a dummy list for the purpose of creating a dataframe later 
-        d = []
-        #loop over the number of stories as tie down is designed for each floor
-        # for i in range (0, len(self.story_height)):
-        #     #check if overturning moment exceeds the counter moment
-        #     if overturning_moment[i] > counter_moment[i]:
-                #if tie down is needed, calculate the tension demand
-                # self.tension_demand = np.cumsum(self.target_unit_shear * (self.story_height - 1))
-                # print(self.tension_demand[i])
-                #if D/C ratio is desired for tie-down, multiply the capacity by the ratio
+        #the D/C ratio of the tie-down, if desired, multiplies the capacity of the rods
         if self.userDefinedDCRatioFlag_TieDown:
-                    #filter the database such that only the ones that meet demand is left
-            df = tiedown_database[tiedown_database['Capacity(kips)'] * self.userDefinedDCRatio_TieDown >= self.tension_demand]
+            DCRatio = self.userDefinedDCRatio_TieDown
         else:
-                    #if no D/C ratio is specified, database is not multiplied by the anything
-            df = tiedown_database[tiedown_database['Capacity(kips)'] >= self.tension_demand]
-            # else: 
-            # #if no tiedown is required, do nothing 
-            #     df = tiedown_database[tiedown_database['Capacity(kips)'] >= 4.0] #make this a default tiedown design
-                # pass
-            #keep track of level for each loop
-            # level = len(self.story_height) - i
-            level = self.numFloors - self.floorIndex
-            #calculate rod elongation due to the tension demand 
-            deflection = self.tension_demand * self.story_height*12/(E * df['Ae(in^2)'].iloc[0] )
-        
-            self.td_dict = {'Tie-down Assembly':df['Assembly'].iloc[0], 'Rod Elongation(in)':deflection, 
-                            'Capacity(kips)': df['Capacity(kips)'].iloc[0], 'level':level, 
-                            'D/C Ratio': self.tension_demand / df['Capacity(kips)'].iloc[0]}
-            d.append(self.td_dict)
+            DCRatio = None
+        level = self.numFloors - self.floorIndex
+        #first rod of the database that meets the demand
+        rod = tiedown_catalog.select(self.tension_demand, DCRatio)
+        if rod == len(tiedown_catalog):
+            raise DesignInfeasibleError('tie-down', 'tension demand %.2f kips exceeds the largest tie-down capacity'
+                                        %self.tension_demand, self.wall_line_name, level)
+        #calculate rod elongation due to the tension demand 
+        deflection = tiedown_catalog.rod_elongation(self.tension_demand, self.story_height, rod, E)
+        
+        self.td_dict = {'Tie-down Assembly':tiedown_catalog.assembly[rod], 'Rod Elongation(in)':deflection, 
+                        'Capacity(kips)': tiedown_catalog.capacity[rod], 'level':level, 
+                        'D/C Ratio': self.tension_demand / tiedown_catalog.capacity[rod]}
         #create a dataframe for tiedown design 
-        self.tiedown_design = pd.DataFrame(d)
-        # return self.tiedown_designs
+        self.tiedown_design = pd.DataFrame([self.td_dict])
         return self.td_dict
     
     def calculate_assembly_deflection(self):
@@ -354,23 +315,12 @@ class DesignShearWall():
         """  
         #calulate tension demand in terms of ASD
         # tension_demand = np.cumsum(self.target_unit_shear * (self.story_height -1))
-        #convert ASD demand to LRFD
-        LRFD_demand = self.tension_demand/0.7
-        #calculate compressive force 
-        compressive_force = LRFD_demand/self.chordArea 
-        #calculate deflection due to sill plate crushing 
-        #assumptions: 
-        crushing = 1.75*(0.04 -0.02*(1-compressive_force/0.625)/0.27)
-        #calculate deflection due to shrinkage of the wood due to moisture content
-        # shrinkage = np.full(len(self.story_height), 0.0025 * 1.5 * \
-        #                     (self.initial_moisture_content - self.final_moisture_content)) #uses 2X sill
-        
-        shrinkage =  0.0025*1.5*(self.initial_moisture_content - self.final_moisture_content)
-    
         #get deflection due to rod elongation from previous method        
-        rod_elongation = self.tiedown_design['Rod Elongation(in)'].values 
-        # combine all the deflections 
-        self.total_assembly_deflection = crushing + shrinkage + self.takeup_deflection + rod_elongation
+        rod_elongation = self.td_dict['Rod Elongation(in)']
+        #combine sill plate crushing, shrinkage, take-up and rod elongation (see Deflection.py)
+        self.total_assembly_deflection = assembly_deflection(self.tension_demand, self.chordArea, 
+                                                             self.initial_moisture_content, self.final_moisture_content,
+                                                             self.takeup_deflection, rod_elongation)
     
         return self.total_assembly_deflection
     
@@ -383,24 +333,13 @@ class DesignShearWall():
         
         :return: total shear wall deflection 
         """
-        #get the per story shear demand (not the seismic force), for each story 
-        # shear_demand = np.concatenate((np.array(self.target_unit_shear[0]).reshape(1,), \
-        #                                 np.diff(self.target_unit_shear)))*1000
-        shear_demand = self.story_force_per_wall * 1000 / self.wallLength
-        # create a length array if self.wallLength attribute is an integer instead of an array 
-        # length = np.full(shape = len(self.story_height), fill_value = self.wallLength)
         #calculate EA for simplicity
         EA = self.chordArea*self.elastic_modulus 
         #Get apparent shear stiffness from the designed shear walls for each floor 
         Ga = self.sw_design['Ga(k/in)'].values
-        #calculate deflection due to chord bending
-        del_bending = 8*shear_demand*np.power(self.story_height, 3) / ((EA/1000) * self.wallLength)/1000
-        #calculate due to apparent shear failure ( nail slipping and shear deformation)
-        del_shear = shear_demand * self.story_height/(1000 * Ga)
-        #calculate deflection due to rotation
-        del_rotation = self.total_assembly_deflection * self.story_height/(self.wallLength - 1)
-        #create an instance of the deflecton 
-        self.sw_deflection = del_bending + del_shear + del_rotation
+        #deflection due to chord bending, shear and rotation (see Deflection.py)
+        self.sw_deflection = wall_deflection(self.story_force_per_wall, self.wallLength, self.story_height, EA, Ga,
+                                             self.total_assembly_deflection)
         # print(self.sw_deflection)
         return self.sw_deflection
     
@@ -411,8 +350,7 @@ class DesignShearWall():
         :return: story drift for each story. Units: inches
         """
         #calculate story drift per ASCE 07-16
-        self.story_drift = self.sw_deflection * self.Cd / self.Ie
-        # print(self.story_drift)
+        self.story_drift = story_drift(self.sw_deflection, self.Cd, self.Ie)
         return self.story_drift
     
     
@@ -468,3 +406,226 @@ class DesignShearWall():
         
         
         
+
+
+class ShearWallFloorDesign(DesignShearWall):
+    
+    def __init__(self, caseID, BaseDirectory, direction, floorIndex, wall_line_name, userDefinedDetailingTag,
+                 userDefinedDriftTag, userDefinedDCTag, pruneCatalog = False, loadRatio = None, E = 29000,
+                 ELFDemandTag = False):
+        """
+        Re-evaluable design of one floor of a wall line. The inputs are read and the length independent
+        parts of the design are computed once; evaluate() then updates only the demand, deflection and
+        drift for a trial wall length and shear wall assembly, so the redesign loop of the drift check
+        does not read files or build dataframes. Results are the same as DesignShearWall.
+        Parameters are the same as DesignShearWall
+        :param E: Youngs Modulus of the tie-down rods. Units: ksi
+        :param ELFDemandTag: if True, the demand is the ELF story force of the site instead of Fx_ToTestTheCode.txt
+        """
+        self.caseID = caseID 
+        self.BaseDirectory = BaseDirectory 
+        self.direction = direction 
+        self.wall_line_name = wall_line_name
+        self.userDefinedDetailingTag = userDefinedDetailingTag
+        self.userDefinedDriftTag = userDefinedDriftTag
+        self.userDefinedDCTag = userDefinedDCTag
+        self.floorIndex = floorIndex
+        self.pruneCatalog = pruneCatalog
+        self.loadRatioOverride = loadRatio
+        self.E = E
+        self.ELFDemandTag = ELFDemandTag
+        
+        #the demand is computed for a unit length once; the story forces do not depend on the length
+        ModelClass = ComputeSeismicForce(caseID, BaseDirectory, 1.0, self.direction, self.wall_line_name, False,
+                                         SeismicDesignParameterFlag = True, loadRatio = self.loadRatioOverride,
+                                         ELFDemandTag = self.ELFDemandTag)
+        self.Cd = ModelClass.SeismicDesignParameter['Cd']
+        self.Ie = ModelClass.SeismicDesignParameter['Ie']
+        self.numFloors = ModelClass.numberOfStories
+        self.baseShear = ModelClass.SeismicDesignParameter['ELF Base Shear']
+        self.story_force_per_wall = ModelClass.story_force_per_wall[self.floorIndex]
+        
+        self.read_sw_user_inputs()
+        self.calculate_drift_limit()
+        self.prepare_evaluation(ModelClass, tiedown_catalog)
+        
+    def prepare_evaluation(self, ModelClass, tiedown_catalog):
+        """
+        This method is used to compute the length independent parts of the design and to allocate
+        the work arrays used by evaluate()
+        :param ModelClass: ComputeSeismicForce of the wall line
+        :param tiedown_catalog: TieDownCatalog of the database compiled based on AISC Manual Table 7-17
+        """
+        #story forces of this floor and the floors above, summed from the top
+        self.cumulativeForce = np.cumsum(ModelClass.story_force_per_wall)[:self.floorIndex + 1]
+        self.momentArm = np.atleast_1d(ModelClass.story_height)[:self.floorIndex + 1] - 1
+        #work arrays of the unit shear and tension demand of the floors above, updated in place
+        self.unitShear = np.empty_like(self.cumulativeForce)
+        self.tension = np.empty_like(self.cumulativeForce)
+        self.demandLength = None
+        self.candidateKey = None
+        
+        #tie-down rods: binary search on the running maximum of the (D/C adjusted) capacities
+        self.tiedownCatalog = tiedown_catalog
+        self.tiedownCapacity = tiedown_catalog.search_capacity(self.userDefinedDCRatio_TieDown
+                                                               if self.userDefinedDCRatioFlag_TieDown else None)
+        
+        #length independent deflection term
+        self.EA = self.chordArea*self.elastic_modulus
+        
+    def update_demand(self, length):
+        """
+        This method is used to update the unit shear and tension demand for a wall length
+        :param length: wall length the demand is computed for. Units: ft
+        :return: unit shear demand of this floor. Units: klf
+        """
+        if length != self.demandLength:
+            np.divide(self.cumulativeForce, length, out = self.unitShear)
+            np.multiply(self.unitShear, self.momentArm, out = self.tension)
+            np.cumsum(self.tension, out = self.tension)
+            self.target_unit_shear = self.unitShear[-1]
+            self.tension_demand = self.tension[-1]
+            self.demandLength = length
+        return self.target_unit_shear
+    
+    def candidates(self, length, startAssembly = None):
+        """
+        This method is used to find the shear wall assemblies that meet the demand of a wall length,
+        with the same filters as DesignShearWall.find_shearwall_candidate(). The candidates are only
+        searched again when the length changes
+        :param length: wall length the demand is computed for. Units: ft
+        :param startAssembly: catalog row to start the search from (warm start), None for the whole catalog
+        :return: candidates meeting the user's D/C ratio and detailing, and candidates meeting the demand
+        """
+        self.update_demand(length)
+        if self.candidateKey != (length, startAssembly):
+            DCRatio = self.userDefinedDCRatio if self.userDefinedDCTag else None
+            detailing = (self.panelThickness, self.nailSize, self.nailSpacing) if self.userDefinedDetailingTag else None
+            index1 = shearwall_catalog.capacity_index(self.target_unit_shear, pruned = self.pruneCatalog)
+            if self.userDefinedDCTag or self.userDefinedDetailingTag:
+                index = shearwall_catalog.capacity_index(self.target_unit_shear, DCRatio, detailing = detailing,
+                                                         pruned = self.pruneCatalog)
+            else:
+                index = index1
+            if startAssembly is not None:
+                index = shearwall_catalog.start_at(index, startAssembly)
+                index1 = shearwall_catalog.start_at(index1, startAssembly)
+            self.candidateIndex, self.candidateIndex1 = index, index1
+            self.candidateKey = (length, startAssembly)
+        return self.candidateIndex, self.candidateIndex1
+    
+    def select_assembly(self, length, counter, iterateFlag, startAssembly = None):
+        """
+        This method is used to select the shear wall assembly the way DesignShearWall does
+        :param length: wall length the demand is computed for. Units: ft
+        :param counter: position in the candidates when iterating through the database
+        :param iterateFlag: if True (and no detailing or D/C ratio is imposed), take the candidate at counter
+        :return: catalog row of the selected assembly
+        """
+        index, index1 = self.candidates(length, startAssembly)
+        if (not self.userDefinedDetailingTag) & (not self.userDefinedDCTag) & iterateFlag:
+            return index1[counter]
+        if len(index):
+            return index[0]
+        print('No shearwall found. Please try different detailing or use default values @ level %d'
+              %(self.numFloors - self.floorIndex))
+        return index1[0]
+    
+    def evaluate(self, length, assembly_index, demandLength = None):
+        """
+        This method is used to update the demand, tie-down, deflection and drift of this floor for a
+        trial wall length and shear wall assembly. Nothing is read and no dataframe is built
+        :param length: wall length. Units: ft
+        :param assembly_index: catalog row of the shear wall assembly
+        :param demandLength: wall length the demand is computed for if not length (ComputeSeismicForce
+                             adds 0.5 ft to the length when redesigning). Units: ft
+        :return: story drift. Units: in
+        """
+        self.update_demand(length if demandLength is None else demandLength)
+        self.wallLength = length
+        self.assemblyIndex = assembly_index
+        
+        #tie-down and rod elongation, same as anchorage_design()
+        self.tiedownIndex = np.searchsorted(self.tiedownCapacity, self.tension_demand, side = 'left')
+        if self.tiedownIndex == len(self.tiedownCapacity):
+            raise DesignInfeasibleError('tie-down', 'tension demand %.2f kips exceeds the largest tie-down capacity'
+                                        %self.tension_demand, self.wall_line_name, self.numFloors - self.floorIndex)
+        self.rod_elongation = self.tiedownCatalog.rod_elongation(self.tension_demand, self.story_height,
+                                                                 self.tiedownIndex, self.E)
+        
+        #assembly deflection and three-term shear wall deflection (see Deflection.py)
+        self.total_assembly_deflection = assembly_deflection(self.tension_demand, self.chordArea,
+                                                             self.initial_moisture_content, self.final_moisture_content,
+                                                             self.takeup_deflection, self.rod_elongation)
+        self.sw_deflection = wall_deflection(self.story_force_per_wall, length, self.story_height, self.EA,
+                                             shearwall_catalog.Ga[assembly_index], self.total_assembly_deflection)
+        self.story_drift = story_drift(self.sw_deflection, self.Cd, self.Ie)
+        return self.story_drift
+    
+    def feasibility(self, wallLength, reDesignTag, maxWallLength):
+        """
+        This method is used to check, before the redesign loop, whether this floor can be designed at a
+        length the loop can reach (wallLength to maxWallLength in 0.5 ft steps). The strength is checked
+        against the largest LRFD capacity of the catalog, the tie-down against the largest rod, and the
+        drift with the stiffest assembly (largest Ga) of the catalog at every reachable length, which is
+        a lower bound of the drift of any assembly at that length
+        :param wallLength: starting wall length. Units: ft
+        :param reDesignTag: redesign tag the loop starts with
+        :param maxWallLength: largest wall length the loop may reach. Units: ft
+        :return: dictionary with 'feasible', the governing 'reason' (None, 'strength', 'tie-down' or 'drift'),
+                 the 'level' and a diagnostic 'message'
+        """
+        report = {'feasible': False, 'level': self.numFloors - self.floorIndex}
+        demandLength = wallLength + 0.5 if reDesignTag else wallLength
+        
+        #strength and tie-down: the loop stops with no candidate if they are not met at the starting length
+        maxCapacity = shearwall_catalog.lrfd.max()
+        if self.update_demand(demandLength) > maxCapacity:
+            report.update(reason = 'strength', message = 'unit shear demand %.3f klf exceeds the largest LRFD capacity '
+                          '%.3f klf of the catalog; a wall length of at least %.1f ft is needed'
+                          %(self.target_unit_shear, maxCapacity, self.cumulativeForce[-1]/maxCapacity))
+            return report
+        if self.tension_demand > self.tiedownCapacity[-1]:
+            report.update(reason = 'tie-down', message = 'tension demand %.2f kips exceeds the largest tie-down '
+                          'capacity %.2f kips; a wall length of at least %.1f ft is needed'
+                          %(self.tension_demand, self.tiedownCapacity[-1],
+                            demandLength*self.tension_demand/self.tiedownCapacity[-1]))
+            return report
+        
+        #drift: smallest drift with the stiffest assembly over the reachable lengths
+        stiffest = int(np.argmax(shearwall_catalog.Ga))
+        length = wallLength
+        bestDrift = np.inf
+        while True:
+            bestDrift = min(bestDrift, float(self.evaluate(length, stiffest, demandLength)))
+            if bestDrift <= self.driftLimit:
+                report.update(feasible = True, reason = None, message = '')
+                return report
+            length += 0.5
+            demandLength = length + 0.5
+            if length > maxWallLength:
+                break
+        report.update(reason = 'drift', message = 'the drift of the stiffest assembly (Ga = %.1f k/in) is at least %.3f in '
+                      'up to the length cap of %.1f ft; the drift limit is %.3f in'
+                      %(shearwall_catalog.Ga[stiffest], bestDrift, maxWallLength, self.driftLimit))
+        return report
+    
+    def getDesign(self):
+        """
+        This method is used to build the shear wall and tie-down design of the last evaluation,
+        with the same entries as DesignShearWall
+        :return: a copy of this floor holding the design, which later evaluations do not change
+        """
+        i = self.assemblyIndex
+        j = self.tiedownIndex
+        design = copy.copy(self)
+        design.sw_dict = {'Shear Wall Assembly':shearwall_catalog.value('Assembly', i), 'Ga(k/in)':shearwall_catalog.Ga[i],
+                          'level':self.numFloors - self.floorIndex, 'LRFD(klf)': shearwall_catalog.lrfd[i], 
+                          'Drift(in)': float(self.story_drift), 'D/C Ratio':self.target_unit_shear/shearwall_catalog.lrfd[i],
+                          'OpenSees Tag':shearwall_catalog.value('OpenSeesTag', i)}
+        design.td_dict = {'Tie-down Assembly':self.tiedownCatalog.assembly[j], 'Rod Elongation(in)':self.rod_elongation, 
+                          'Capacity(kips)': self.tiedownCatalog.capacity[j], 'level':self.numFloors - self.floorIndex, 
+                          'D/C Ratio': self.tension_demand / self.tiedownCatalog.capacity[j]}
+        design.sw_design = pd.DataFrame([design.sw_dict])
+        design.tiedown_design = pd.DataFrame([design.td_dict])
+        return design
@@ -15,15 +15,25 @@ Last Modified: Oct 2020
 __author__ = 'Laxman Dahal'
 
 
+import numpy as np
 
+from DesignErrors import DesignInfeasibleError
 from ShearWallClass_perFloor import DesignShearWall
-from global_variables import shearwall_database
+from global_variables import shearwall_catalog
+
+
+#largest wall length the redesign loop may reach. Units: ft
+MAX_WALL_LENGTH = 100.0
+#largest number of redesign steps of one floor
+MAX_ITERATIONS = 10000
 
 
 class ShearWallDriftCheck(): 
     
     def __init__(self, caseID, BaseDirectory, direction, wallLength, counter, floorIndex, wall_line_name, 
-                 reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag ):
+                 reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag, iterateFlag,
+                 pruneCatalog = False, loadRatio = None, startAssembly = None, maxWallLength = MAX_WALL_LENGTH,
+                 maxIterations = MAX_ITERATIONS, ELFDemandTag = False):
         
         self.caseID = caseID
         self.BaseDirectory = BaseDirectory 
@@ -38,6 +48,15 @@ class ShearWallDriftCheck():
         
         self.iterateFlag = iterateFlag
         self.counter = counter
+        self.pruneCatalog = pruneCatalog
+        self.loadRatio = loadRatio
+        #catalog row the assembly search starts from, None to search the whole catalog
+        self.startAssembly = startAssembly
+        #hard caps of the redesign loop
+        self.maxWallLength = maxWallLength
+        self.maxIterations = maxIterations
+        #if True, the demand is the ELF story force of the site instead of Fx_ToTestTheCode.txt
+        self.ELFDemandTag = ELFDemandTag
         
         self.userDefinedDriftTag = userDefinedDriftTag 
         self.wallLength = wallLength
@@ -49,7 +68,7 @@ class ShearWallDriftCheck():
         self.getShearWallDesign()
         self.getTieDownDesign()
         self.getFinalWallLength()
-        # self.getOpenSeesTag()
+        self.getOpenSeesTag()
         
         
     def driftCheckAndRedesign(self):
@@ -62,7 +81,8 @@ class ShearWallDriftCheck():
         #initialize the DesignShearWall class to a variable with initial redesign flag set to False
         self.wallName = DesignShearWall(self.caseID, self.BaseDirectory, self.direction, self.wallLength, self.counter,
                                    self.floorIndex, self.wall_line_name, self.userDefinedDetailingTag, self.reDesignTag, 
-                                   self.userDefinedDriftTag, self.userDefinedDCTag, self.iterateFlag)
+                                   self.userDefinedDriftTag, self.userDefinedDCTag, self.iterateFlag, self.pruneCatalog,
+                                   self.loadRatio, self.startAssembly, self.ELFDemandTag)
         
         #get the drift
         self.drift = self.wallName.story_drift
@@ -82,7 +102,7 @@ class ShearWallDriftCheck():
             #NOTE: wall length is added every floor, not just the floor the drift exceeds
             
             if (self.wallName.sw_design['LRFD(klf)'].values >= self.wallName.target_unit_shear/0.7) | \
-                (self.wallName.sw_design['LRFD(klf)'].values == shearwall_database['LRFD(klf)'].iloc[-1]):
+                (self.wallName.sw_design['LRFD(klf)'].values == shearwall_catalog.lrfd[-1]):
                 self.reDesignTag = True
                 self.wallLength += 0.5
                 self.counter = 0
@@ -90,6 +110,7 @@ class ShearWallDriftCheck():
             else:
                 self.iterateFlag = True
                 self.counter += 1
+            self.check_caps(self.wallName.numFloors - self.floorIndex)
             
             # if self.dfCheck.all():
             #     break
@@ -101,7 +122,8 @@ class ShearWallDriftCheck():
             #initialize the DesignShearWall class again, but this time with redesign Tag set to True
             self.wallName = DesignShearWall(self.caseID, self.BaseDirectory, self.direction, self.wallLength, self.counter,
                                    self.floorIndex, self.wall_line_name, self.userDefinedDetailingTag, self.reDesignTag, 
-                                   self.userDefinedDriftTag, self.userDefinedDCTag, self.iterateFlag)
+                                   self.userDefinedDriftTag, self.userDefinedDCTag, self.iterateFlag, self.pruneCatalog,
+                                   self.loadRatio, self.startAssembly, self.ELFDemandTag)
             #get the new drift after the redesign
             self.drift = self.wallName.story_drift
             #get the driftlimit
@@ -121,6 +143,25 @@ class ShearWallDriftCheck():
         # return self.shearWallDesign, self.tieDownDesign
         
         
+    def check_caps(self, level):
+        """
+        This method is used to stop the redesign loop when it cannot end: when the wall length exceeds
+        the length cap, when the number of steps exceeds the iteration cap, or when the next step would
+        repeat the last one (with a detailing or D/C ratio filter, the assembly does not change with
+        the counter, so only a longer wall changes the design)
+        :param level: level of the floor, for the diagnostic
+        """
+        if self.wallLength > self.maxWallLength:
+            raise DesignInfeasibleError('length cap', 'the drift limit is not met up to the length cap of %.1f ft'
+                                        %self.maxWallLength, self.wall_line_name, level)
+        if len(self.driftHistory) >= self.maxIterations:
+            raise DesignInfeasibleError('iteration cap', 'the drift limit is not met in %d redesign steps'
+                                        %self.maxIterations, self.wall_line_name, level)
+        if self.counter > 0 and (self.userDefinedDetailingTag or self.userDefinedDCTag):
+            raise DesignInfeasibleError('stalled', 'the drift limit is not met and the assembly allowed by the '
+                                        'detailing or D/C ratio filter does not reach 70% of its capacity, so a '
+                                        'longer wall is never tried', self.wall_line_name, level)
+        
     #define a getter method that returns the final shear wall design dataframe
     def getShearWallDesign(self):
         return self.shearWallDesign 
@@ -132,23 +173,110 @@ class ShearWallDriftCheck():
     def getFinalWallLength(self):
         return self.wallLength
         
-    # #define a getter method that returns the openseestag for wall modelling in opensees
-    # def getOpenSeesTag(self):
+    #define a getter method that returns the openseestag for wall modelling in opensees
+    def getOpenSeesTag(self):
+        
+        tag = self.wallName.sw_design['OpenSees Tag'].to_numpy().astype(int)  #extracts tag as an row array 
+        tag = tag[::-1]  #changes first row from roof to first story
+        tag = tag.reshape((-1,1))  #converts row array to column array
+        tag = np.repeat(tag, 2, axis = 0)  #repeat array for x, and y coordinates per Zhengxiang's code input
+        self.tagPerWall = np.tile(tag, (1, int(self.wallName.wallsPerLine)))
+        return self.tagPerWall
+        
+        
+        
+        
+        
         
-    #     tag = self.wallName.sw_design['OpenSees Tag'].values  #extracts tag as an row array 
-    #     tag = tag[::-1]  #changes first row from roof to first story
-    #     tag = tag.reshape((-1,1))  #converts row array to column array
-    #     tag = np.repeat(tag, 2, axis = 0)  #repeat array for x, and y coordinates per Zhengxiang's code input
-    #     # tag = np.tile(tag, (1,2)) #double the rows 
-    #     self.tagPerWall = np.tile(tag, (1, int(self.wallName.wallsPerLine)))
-    #     return self.tagPerWall
-    #     # return self.tag
         
         
         
+
+class FloorDriftCheck(ShearWallDriftCheck):
+    
+    def __init__(self, floor, wallLength, counter, reDesignTag, iterateFlag, startAssembly = None,
+                 maxWallLength = MAX_WALL_LENGTH, maxIterations = MAX_ITERATIONS):
+        """
+        Same drift check and redesign as ShearWallDriftCheck, on a ShearWallFloorDesign that is built
+        once per floor and re-evaluated for every trial length and assembly
+        :param floor: ShearWallFloorDesign of the floor, can be reused by several drift checks
+        :param wallLength, counter, reDesignTag, iterateFlag, startAssembly, maxWallLength, maxIterations:
+                same as ShearWallDriftCheck
+        """
+        self.floor = floor
+        self.caseID = floor.caseID
+        self.BaseDirectory = floor.BaseDirectory 
+        self.direction = floor.direction 
+        self.wall_line_name = floor.wall_line_name
+        self.userDefinedDetailingTag = floor.userDefinedDetailingTag
+        self.userDefinedDCTag = floor.userDefinedDCTag
+        self.userDefinedDriftTag = floor.userDefinedDriftTag 
+        self.floorIndex = floor.floorIndex
+        self.pruneCatalog = floor.pruneCatalog
+        self.loadRatio = floor.loadRatioOverride
+        self.ELFDemandTag = floor.ELFDemandTag
+        
+        self.reDesignTag = reDesignTag
+        self.iterateFlag = iterateFlag
+        self.counter = counter
+        self.startAssembly = startAssembly
+        self.maxWallLength = maxWallLength
+        self.maxIterations = maxIterations
+        self.wallLength = wallLength
+        self.wallLengthHistory = []
+        self.driftHistory = []
         
+        self.check_feasibility()
+        self.driftCheckAndRedesign()
+        self.getShearWallDesign()
+        self.getTieDownDesign()
+        self.getFinalWallLength()
+        self.getOpenSeesTag()
         
+    def check_feasibility(self):
+        """
+        This method is used to reject a floor that cannot be designed before the redesign loop starts,
+        see ShearWallFloorDesign.feasibility()
+        :return: feasibility report
+        """
+        self.feasibility = self.floor.feasibility(self.wallLength, self.reDesignTag, self.maxWallLength)
+        if not self.feasibility['feasible']:
+            raise DesignInfeasibleError(self.feasibility['reason'], self.feasibility['message'],
+                                        self.wall_line_name, self.feasibility['level'])
+        return self.feasibility
         
+    def evaluate(self):
+        #ComputeSeismicForce adds 0.5 ft to the length of the demand once the wall is redesigned
+        demandLength = self.wallLength + 0.5 if self.reDesignTag else self.wallLength
+        assemblyIndex = self.floor.select_assembly(demandLength, self.counter, self.iterateFlag, self.startAssembly)
+        self.drift = self.floor.evaluate(self.wallLength, assemblyIndex, demandLength)
+        self.driftLimit = self.floor.driftLimit
+        self.driftCheck = self.drift <= self.driftLimit
+        self.driftHistory.append(float(self.drift))
+        return self.driftCheck
         
+    def driftCheckAndRedesign(self):
+        """
+        This method is used to check the story drift of the floor, and redesign it until the drift
+        limit is met, with the same steps as ShearWallDriftCheck.driftCheckAndRedesign()
         
-        
\ No newline at end of file
+        :return: final shear wall and tiedown design that meets both strength and drift criteria
+        """
+        self.evaluate()
+        while not self.driftCheck:
+            lrfd = shearwall_catalog.lrfd[self.floor.assemblyIndex]
+            if (lrfd >= self.floor.target_unit_shear/0.7) | (lrfd == shearwall_catalog.lrfd[-1]):
+                self.reDesignTag = True
+                self.wallLength += 0.5
+                self.counter = 0
+            else:
+                self.iterateFlag = True
+                self.counter += 1
+            self.check_caps(self.floor.numFloors - self.floorIndex)
+            self.wallLengthHistory.append(self.floor.wallLength)
+            self.evaluate()
+        #the design frames are only built for the final design
+        self.wallName = self.floor.getDesign()
+        self.dfCheck = None
+        self.shearWallDesign = self.wallName.sw_design
+        self.tieDownDesign = self.wallName.tiedown_design
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design every wall line of one building for many sites at once.
+
+The building is read once, with the demand taken from the ELF story forces (ELFDemandTag). For every
+site (Ss, S1, site class) only the seismic design parameters and the ELF story forces are computed
+again (ComputeSeismicForce.calculate_seismic_design_parameter), from the floor weights and heights
+already read; the R, Ie, Cd and TL of the building are kept. The story forces per wall of every wall
+line and site are stacked with the other inputs of the wall lines, which do not depend on the site,
+and designed in one pass of the stacked design (see VectorizedDesign.py). No file is read after the
+building is.
+
+Running this file designs a random building for a grid of sites and compares the time with reading
+and designing the building again for every site.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from LoadDistribution import list_wall_lines
+from ShearForces import ComputeSeismicForce
+from VectorizedDesign import FLOOR_INPUTS, CASE_INPUTS, StackedShearWallDesign, stack_models
+
+
+#site classes of ASCE 7-16 Tables 11.4-1 and 11.4-2 (site class F needs a site response analysis)
+SITE_CLASSES = ('A', 'B', 'C', 'D', 'E')
+
+#site parameters reported for every site
+SITE_PARAMETERS = ('SDS', 'SD1', 'Tu', 'Cs', 'ELF Base Shear')
+
+
+def site_design_parameters(ModelClass, sites):
+    """
+    This function is used to get the seismic design parameters of a building for many sites, without
+    reading any file
+    :param ModelClass: ComputeSeismicForce of any wall line of the building
+    :param sites: list of (Ss, S1, site class)
+    :return: list of dictionaries of the seismic design parameters, see ComputeSeismicForce.SeismicDesignParameter
+    """
+    SDP = ModelClass.SeismicDesignParameter
+    parameters = []
+    for Ss, S1, site_class in sites:
+        if site_class not in SITE_CLASSES:
+            raise ValueError('Site class must be one of %s, not %s' % (', '.join(SITE_CLASSES), site_class))
+        parameters.append(ModelClass.calculate_seismic_design_parameter(float(Ss), float(S1), site_class, SDP['R'],
+                                                                        SDP['Ie'], SDP['Cd'], SDP['TL']))
+    return parameters
+
+
+class SiteSweep():
+
+    def __init__(self, BaseDirectory, sites, wallLength = 4.0, reDesignTag = False, userDefinedDetailingTag = False,
+                 userDefinedDriftTag = False, userDefinedDCTag = False, pruneCatalog = False, loadRatio = None,
+                 lengthSearch = 'step', caseID = 'site sweep'):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every site and wall line
+        :param BaseDirectory: folder of the building inputs
+        :param sites: list of (Ss, S1, site class)
+        :param loadRatio: tribuitary load ratio per floor overriding tribuitaryLoadRatio.txt, None to read the files
+        :param lengthSearch: 'step' or 'bisection', see VectorizedDesign.StackedShearWallDesign
+        """
+        self.BaseDirectory = BaseDirectory
+        self.sites = [(float(Ss), float(S1), site_class) for Ss, S1, site_class in sites]
+        self.wallLength = wallLength
+        self.reDesignTag = reDesignTag
+        self.userDefinedDetailingTag = userDefinedDetailingTag
+        self.userDefinedDriftTag = userDefinedDriftTag
+        self.userDefinedDCTag = userDefinedDCTag
+        self.pruneCatalog = pruneCatalog
+        self.loadRatio = loadRatio
+        self.lengthSearch = lengthSearch
+        self.caseID = caseID
+
+        self.read()
+        self.SiteForces()
+        self.design_sites()
+
+    def read(self):
+        """
+        This method is used to read every wall line of the building once
+        :return: stacked inputs of the wall lines, see VectorizedDesign.stack_wall_lines()
+        """
+        self.lines = [(direction, name) for direction in ('X', 'Z') for name in list_wall_lines(self.BaseDirectory, direction)]
+        units = [(self.caseID, self.BaseDirectory, direction, name) for direction, name in self.lines]
+        self.models = [ComputeSeismicForce(self.caseID, self.BaseDirectory, 1.0, direction, name, False,
+                                           loadRatio = self.loadRatio, ELFDemandTag = True)
+                       for direction, name in self.lines]
+        self.lineInputs = stack_models(self.models, units)
+        return self.lineInputs
+
+    def SiteForces(self):
+        """
+        This method is used to get the story force per wall of every wall line for every site
+        :return: story forces per wall, shape (sites, wall lines, floors), top floor first. Units: kips
+        """
+        self.siteParameters = site_design_parameters(self.models[0], self.sites)
+        self.storyForce = np.array([[ModelClass.wall_story_force(parameters['story_force']) for ModelClass in self.models]
+                                    for parameters in self.siteParameters], dtype = float)
+        return self.storyForce
+
+    def design_sites(self):
+        """
+        This method is used to design every wall line for every site in one stacked design; case
+        site*len(self.lines) + line is the wall line for the site
+        :return: StackedShearWallDesign of the sites and wall lines
+        """
+        numSites, numLines = len(self.sites), len(self.lines)
+        inputs = {name: np.tile(self.lineInputs[name], (numSites, 1)) for name in FLOOR_INPUTS}
+        inputs.update({name: np.tile(self.lineInputs[name], numSites) for name in CASE_INPUTS})
+        inputs['storyForce'] = self.storyForce.reshape(numSites*numLines, -1)
+        inputs['detailing'] = list(self.lineInputs['detailing'])*numSites
+        inputs['units'] = list(self.lineInputs['units'])*numSites
+        self.design = StackedShearWallDesign(inputs, self.wallLength, self.reDesignTag, self.userDefinedDetailingTag,
+                                             self.userDefinedDriftTag, self.userDefinedDCTag, self.pruneCatalog,
+                                             lengthSearch = self.lengthSearch)
+        return self.design
+
+    def case(self, site, direction, wall_line_name):
+        """
+        :return: position of the wall line for the site in the stacked design
+        """
+        return site*len(self.lines) + self.lines.index((direction, wall_line_name))
+
+    def sw_design(self, site, direction, wall_line_name):
+        """
+        :return: shear wall design of a wall line for a site, same columns as FinalShearWallDesign.sw_final_design
+        """
+        return self.design.sw_design(self.case(site, direction, wall_line_name))
+
+    def tiedown_design(self, site, direction, wall_line_name):
+        """
+        :return: tie-down design of a wall line for a site, same columns as FinalShearWallDesign.tiedown_final_design
+        """
+        return self.design.tiedown_design(self.case(site, direction, wall_line_name))
+
+    def getSummary(self):
+        """
+        :return: dataframe with one row per site and wall line: the site, its SITE_PARAMETERS, whether the
+                 wall line could be designed, its final wall length, and the reason and level of a failure
+        """
+        numLines = len(self.lines)
+        summary = pd.DataFrame({'Ss': np.repeat([site[0] for site in self.sites], numLines),
+                                'S1': np.repeat([site[1] for site in self.sites], numLines),
+                                'site class': np.repeat([site[2] for site in self.sites], numLines)})
+        for name in SITE_PARAMETERS:
+            summary[name] = np.repeat([float(parameters[name]) for parameters in self.siteParameters], numLines)
+        summary['direction'] = [direction for direction, name in self.lines]*len(self.sites)
+        summary['wall line'] = [name for direction, name in self.lines]*len(self.sites)
+        summary['feasible'] = self.design.feasible
+        summary['wall length(ft)'] = self.design.finalWallLength
+        summary['reason'] = self.design.reason
+        summary['failed level'] = np.where(self.design.feasible, 0, self.design.failedLevel)
+        return summary
+
+
+if __name__ == '__main__':
+    #benchmark: one random building designed for 40 sites (8 Ss, S1 pairs and the five site classes) in
+    #one sweep, and for the first 5 sites by writing the site files and designing the building again.
+    #Run from the folder of the databases
+    import os
+    import tempfile
+
+    from Equivalence import write_txt, write_synthetic_building
+    from VectorizedDesign import stack_wall_lines
+
+    sites = [(Ss, S1, site_class) for Ss, S1 in zip(np.linspace(0.1, 0.8, 8), np.linspace(0.04, 0.32, 8))
+             for site_class in SITE_CLASSES]
+    with tempfile.TemporaryDirectory() as directory:
+        BaseDirectory = write_synthetic_building(os.path.join(directory, 'building'), 3, seed = 1, numWallLines = 3)
+        start = time.perf_counter()
+        sweep = SiteSweep(BaseDirectory, sites)
+        elapsed = time.perf_counter() - start
+        summary = sweep.getSummary()
+
+        same = 0
+        start = time.perf_counter()
+        for site, (Ss, S1, site_class) in enumerate(sites[:5]):
+            seismic = os.path.join(BaseDirectory, 'SeismicDesignParameters')
+            write_txt(os.path.join(seismic, 'Ss.txt'), np.array([Ss]))
+            write_txt(os.path.join(seismic, 'S1.txt'), np.array([S1]))
+            write_txt(os.path.join(seismic, 'SiteClass.txt'), site_class)
+            units = [(sweep.caseID, BaseDirectory, direction, name) for direction, name in sweep.lines]
+            design = StackedShearWallDesign(stack_wall_lines(units, ELFDemandTag = True), 4.0, False, False, False, False)
+            cases = [sweep.case(site, direction, name) for direction, name in sweep.lines]
+            same += np.array_equal(design.finalWallLength, sweep.design.finalWallLength[cases], equal_nan = True)
+        rewrite = (time.perf_counter() - start)/5
+
+    print('%d sites x %d wall lines in %.3f s (%.4f s per site); writing the site files and designing again '
+          '%.3f s per site, same wall lengths for %d of 5 sites'
+          % (len(sites), len(sweep.lines), elapsed, elapsed/len(sites), rewrite, same))
+    print(summary.groupby('site class').agg({'SDS': 'max', 'ELF Base Shear': 'max', 'feasible': 'sum',
+                                             'wall length(ft)': 'max'}).to_string())
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design very large parametric studies with a memory use that does not grow
+with the number of cases.
+
+The study runs as a pipeline of three stages connected by bounded queues:
+    case reader (thread) -> design (main thread or process pool) -> result writer (thread)
+The reader lists the wall lines of the cases lazily and the writer appends every result to a
+checkpoint file (Checkpoint.CheckpointStore) without keeping it in memory. When a stage is slower
+than the one before it, the queue between them fills up and the faster stage waits (backpressure),
+so the number of units held in memory at any time is set by the memory budget, not by the size of
+the study. A stopped study resumes from the checkpoint.
+
+A unit that cannot be designed does not stop the study: the failure (DesignInfeasibleError or any
+other error of the unit) is written to the checkpoint as a failed record, see
+CheckpointStore.append_failure(), and a resumed study skips it like the designed units.
+
+Running this file benchmarks the peak memory of the pipeline for 1,000 and 100,000 units.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from Checkpoint import CheckpointStore
+from DesignErrors import DesignInfeasibleError
+from LoadDistribution import list_wall_lines
+
+
+#estimated memory of one unit waiting in the pipeline (design frames and design objects). Units: bytes
+UNIT_BYTES = 256*1024
+
+#marks the end of a queue
+END = None
+
+#seconds a stage waits on a full queue before checking whether the pipeline was stopped
+POLL_SECONDS = 0.1
+
+
+def iter_units(cases, directions = ('X', 'Z')):
+    """
+    This function is used to list the design units of the cases lazily
+    :param cases: iterable of (caseID, BaseDirectory)
+    :return: generator of (caseID, BaseDirectory, direction, wall line name)
+    """
+    for caseID, BaseDirectory in cases:
+        for direction in directions:
+            for name in list_wall_lines(BaseDirectory, direction):
+                yield caseID, BaseDirectory, direction, name
+
+
+def design_unit(unit, designParameters):
+    """
+    This function is used to design one unit in the pipeline
+    :param unit: (caseID, BaseDirectory, direction, wall line name)
+    :param designParameters: FinalShearWallDesign parameters after the wall line name
+    :return: (unit, shear wall design, tie-down design, final wall length)
+    """
+    #imported here so that a process pool worker only loads the design modules when it designs
+    from FinalShearWallDesign import FinalShearWallDesign
+
+    caseID, BaseDirectory, direction, wall_line_name = unit
+    wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, \
+        userDefinedDCTag, iterateFlag, pruneCatalog = designParameters
+    design = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, counter, numFloors, wall_line_name,
+                                  reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag,
+                                  iterateFlag, pruneCatalog)
+    return unit, design.sw_final_design, design.tiedown_final_design, np.ravel(design.finalWallLength)
+
+
+class Failure():
+
+    def __init__(self, unit, error):
+        """
+        Result of a unit that could not be designed
+        :param unit: (caseID, BaseDirectory, direction, wall line name)
+        :param error: exception raised by the design of the unit
+        """
+        self.unit = unit
+        if isinstance(error, DesignInfeasibleError):
+            self.status, self.message = 'infeasible', str(error)
+        else:
+            self.status, self.message = 'error', '%s: %s' % (type(error).__name__, error)
+
+
+class StreamingBatchDesign():
+
+    def __init__(self, units, checkpointPath, wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog = False,
+                 memoryBudget = 64*2**20, unitBytes = UNIT_BYTES, jobs = 1, syncEvery = 50,
+                 designFunction = design_unit):
+        """
+        Design parameters are the same as FinalShearWallDesign and are used for every unit
+        :param units: iterable of (caseID, BaseDirectory, direction, wall line name), e.g. iter_units(cases)
+        :param checkpointPath: checkpoint file the results are written to; units already in it are skipped
+        :param memoryBudget: memory allowed for the units waiting in the pipeline. Units: bytes
+        :param unitBytes: estimated memory of one waiting unit. Units: bytes
+        :param jobs: number of processes of the design stage (1 designs in the main thread)
+        :param syncEvery: number of results written with one fsync
+        :param designFunction: function(unit, designParameters) returning (unit, sw design, tie-down design,
+                               final wall length); must be picklable when jobs > 1. A unit whose design
+                               raises is written to the checkpoint as a failed record
+        """
+        self.units = units
+        self.checkpointPath = checkpointPath
+        self.designParameters = (wallLength, counter, numFloors, reDesignTag, userDefinedDetailingTag,
+                                 userDefinedDriftTag, userDefinedDCTag, iterateFlag, pruneCatalog)
+        self.jobs = jobs
+        self.syncEvery = syncEvery
+        self.designFunction = designFunction
+
+        #number of units the budget allows in each queue and in the design stage
+        self.capacity = max(1, int(memoryBudget // unitBytes) // 3)
+        self.readUnits = 0
+        self.skippedUnits = 0
+        self.designedUnits = 0
+        self.failedUnits = 0
+        self.errors = []
+        #set when the pipeline stops, so that the reader does not wait on a queue nobody reads
+        self.stopped = threading.Event()
+
+        self.run()
+
+    def put(self, designQueue, item):
+        #put an item in the design queue unless the pipeline stops while the queue is full
+        while not self.stopped.is_set():
+            try:
+                designQueue.put(item, timeout = POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read(self, store, designQueue):
+        #reader stage: put the units that are not in the checkpoint in the design queue
+        try:
+            for caseID, BaseDirectory, direction, wall_line_name in self.units:
+                self.readUnits += 1
+                if store.key(caseID, direction, wall_line_name) in store:
+                    self.skippedUnits += 1
+                    continue
+                if not self.put(designQueue, (caseID, BaseDirectory, direction, wall_line_name)):
+                    return
+        except Exception as error:
+            self.errors.append(error)
+        finally:
+            self.put(designQueue, END)
+
+    def write(self, store, resultQueue):
+        #writer stage: append every result to the checkpoint and drop it
+        try:
+            while True:
+                result = resultQueue.get()
+                if result is END:
+                    break
+                if isinstance(result, Failure):
+                    caseID, BaseDirectory, direction, wall_line_name = result.unit
+                    store.append_failure(store.key(caseID, direction, wall_line_name), result.status, result.message)
+                    self.failedUnits += 1
+                    continue
+                (caseID, BaseDirectory, direction, wall_line_name), sw_design, tiedown_design, finalWallLength = result
+                store.append(store.key(caseID, direction, wall_line_name), sw_design, tiedown_design,
+                             finalWallLength = finalWallLength)
+                self.designedUnits += 1
+        except Exception as error:
+            self.errors.append(error)
+            #keep draining so that the design stage is not blocked
+            while resultQueue.get() is not END:
+                pass
+
+    def design(self, designQueue, resultQueue):
+        #design stage: take units from the design queue and put the results (or failures) in the result queue
+        if self.jobs <= 1:
+            while True:
+                unit = designQueue.get()
+                if unit is END:
+                    break
+                try:
+                    result = self.designFunction(unit, self.designParameters)
+                except Exception as error:
+                    result = Failure(unit, error)
+                resultQueue.put(result)
+            return
+
+        with ProcessPoolExecutor(max_workers = self.jobs) as pool:
+            #future -> unit
+            running = {}
+            unit = designQueue.get()
+            while unit is not END or running:
+                #the number of units in the pool is bounded as well
+                while unit is not END and len(running) < self.capacity:
+                    running[pool.submit(self.designFunction, unit, self.designParameters)] = unit
+                    unit = designQueue.get()
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        result = Failure(running[future], error)
+                    del running[future]
+                    resultQueue.put(result)
+
+    def run(self):
+        """
+        This method is used to run the pipeline until all the units are designed and written
+        :return: dictionary with the number of units read, skipped (already in the checkpoint), designed
+                 and failed (written to the checkpoint as failed records)
+        """
+        start = time.time()
+        designQueue = queue.Queue(maxsize = self.capacity)
+        resultQueue = queue.Queue(maxsize = self.capacity)
+        with CheckpointStore(self.checkpointPath, self.syncEvery, keepRecords = False) as store:
+            reader = threading.Thread(target = self.read, args = (store, designQueue), daemon = True)
+            writer = threading.Thread(target = self.write, args = (store, resultQueue), daemon = True)
+            reader.start()
+            writer.start()
+            try:
+                self.design(designQueue, resultQueue)
+            finally:
+                #a reader waiting on a full design queue stops
+                self.stopped.set()
+                resultQueue.put(END)
+                writer.join()
+                reader.join()
+        if self.errors:
+            raise self.errors[0]
+        self.summary = {'read units': self.readUnits,
+                        'skipped units': self.skippedUnits,
+                        'designed units': self.designedUnits,
+                        'failed units': self.failedUnits,
+                        'queue capacity': self.capacity,
+                        'run time (s)': time.time() - start}
+        return self.summary
+
+
+def benchmark_design_unit(unit, designParameters):
+    #stand-in for design_unit with frames of the same size as a three story wall line design
+    sw_design = pd.DataFrame({'Shear Wall Assembly': ['Use 15/32in Structural I on 2 sides with 10d nails @ 2o.c. spacing']*3,
+                              'Ga(k/in)': np.full(3, 20.0), 'level': [3, 2, 1], 'LRFD(klf)': np.full(3, 2.0),
+                              'Drift(in)': ['NaN']*3, 'D/C Ratio': np.full(3, 0.9), 'OpenSees Tag': np.ones(3, dtype = int)})
+    tiedown_design = pd.DataFrame({'Tie-down': ['ATS-SR5']*3, 'Capacity(kips)': np.full(3, 20.0), 'level': [3, 2, 1]})
+    return unit, sw_design, tiedown_design, np.array([10.0])
+
+
+def benchmark(numberOfUnits, checkpointPath):
+    #run the pipeline on synthetic units and return the peak memory of this process. Units: MB
+    import resource
+
+    units = (('case%d' % (i // 8), 'building', 'XZ'[i % 2], 'line%d' % (i % 4)) for i in range(numberOfUnits))
+    StreamingBatchDesign(units, checkpointPath, 10.0, 0, 3, False, False, False, False, False,
+                         syncEvery = 1000, designFunction = benchmark_design_unit)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+
+
+if __name__ == '__main__':
+    #benchmark: peak memory of a fresh process for 1k and 100k units; the design frames are written
+    #to the checkpoint and never kept, so the peak should not depend on the number of units
+    import multiprocessing
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        for numberOfUnits in (1000, 100000):
+            path = os.path.join(directory, 'benchmark%d.checkpoint' % numberOfUnits)
+            start = time.time()
+            with multiprocessing.get_context('spawn').Pool(1) as pool:
+                peak = pool.apply(benchmark, (numberOfUnits, path))
+            print('%7d units: peak RSS %6.1f MB, %6.1f s, checkpoint %7.1f MB'
+                  % (numberOfUnits, peak, time.time() - start, os.path.getsize(path)/1e6))
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to screen very many wall line configurations with a surrogate of the design, for
+early-stage massing studies.
+
+The surrogate is fitted by NumPy least squares to exact design outcomes (FinalShearWallDesign, or
+VectorizedDesign.StackedShearWallDesign which gives the same designs much faster) on stacked inputs
+(see VectorizedDesign.stack_wall_lines). It predicts three outcomes of every case:
+    required wall length      quadratic polynomial of the log inputs, fitted to the log length
+    maximum story drift       same, fitted to the log drift
+    governing assembly class  sheathed sides and nail spacing of the strongest assembly of the
+                              wall line, least squares on the one-hot classes (largest score wins)
+The errors are estimated on a holdout part of the outcomes: the length and drift bounds hold the
+given share (coverage) of the holdout errors, in bins of the predicted value, and the class
+accuracy is the share of holdout cases with the right class.
+
+Screening also checks how close every case is to the limits of the design: the unit shear and the
+tension demand at the starting length against the strongest assembly and rod (same checks as the
+exact design, so cases past them are infeasible for certain), and the drift of the stiffest
+assembly at the longest predicted length against the drift limit. Cases near a limit (within a
+margin), and cases whose predicted length reaches the length cap, are designed exactly.
+
+The surrogate is only valid for the design flags, starting wall length, number of floors and
+preferred detailing it was fitted with. Running this file benchmarks the screening of 1,000,000
+synthetic cases.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import time
+
+import numpy as np
+
+from Deflection import demand, drift
+from DesignErrors import DesignInfeasibleError
+from ShearWallDriftCheck_perFloor import MAX_WALL_LENGTH
+from VectorizedDesign import StackedShearWallDesign, FLOOR_INPUTS, CASE_INPUTS
+from global_variables import shearwall_catalog, tiedown_catalog
+
+
+#catalog columns that make up the assembly class
+CLASS_COLUMNS = ('Sheathed sides', 'nail spacing')
+
+#predicted outcomes fitted in log space
+REGRESSION_TARGETS = ('finalWallLength', 'maxDrift')
+
+
+def assembly_class(assembly):
+    """
+    :param assembly: catalog row of the assembly of every floor, shape (cases, floors); -1 if not designed
+    :return: class code of the strongest assembly of every case (sides*100 + nail spacing), -1 if not designed
+    """
+    assembly = np.asarray(assembly)
+    lrfd = np.where(assembly >= 0, shearwall_catalog.lrfd[np.maximum(assembly, 0)], -np.inf)
+    governing = np.take_along_axis(assembly, np.argmax(lrfd, axis = 1)[:, None], axis = 1)[:, 0]
+    sides, spacing = [shearwall_catalog.columns[name][np.maximum(governing, 0)] for name in CLASS_COLUMNS]
+    return np.where(governing >= 0, sides*100 + spacing, -1)
+
+
+def class_label(code):
+    """
+    :return: label of an assembly class code, e.g. '2 sides, nails @ 4in'
+    """
+    return '%d side%s, nails @ %din' % (code // 100, 's' if code // 100 > 1 else '', code % 100)
+
+
+def design_outcomes(design):
+    """
+    This function is used to get the outcomes the surrogate predicts from an exact stacked design
+    :param design: StackedShearWallDesign
+    :return: dictionary of 'finalWallLength' (Units: ft), 'maxDrift' (Units: in) and 'assemblyClass'
+             of every case; NaN and -1 for the cases that could not be designed
+    """
+    drifts = np.where(design.feasible[:, None], design.design['drift'], -np.inf).astype(float)
+    return {'finalWallLength': np.asarray(design.finalWallLength, dtype = float),
+            'maxDrift': np.where(design.feasible, drifts.max(axis = 1), np.nan),
+            'assemblyClass': assembly_class(design.design['assembly'])}
+
+
+def final_design_outcomes(units, wallLength, numFloors, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                          userDefinedDCTag, **options):
+    """
+    This function is used to get the outcomes of wall lines from FinalShearWallDesign, one wall line
+    at a time. Design parameters are the same as FinalShearWallDesign
+    :param units: list of (caseID, BaseDirectory, direction, wall line name), same as stack_wall_lines()
+    :return: dictionary of outcomes, see design_outcomes()
+    """
+    from FinalShearWallDesign import FinalShearWallDesign
+
+    outcomes = {'finalWallLength': [], 'maxDrift': [], 'assemblyClass': []}
+    for caseID, BaseDirectory, direction, wall_line_name in units:
+        try:
+            design = FinalShearWallDesign(caseID, BaseDirectory, direction, wallLength, 0, numFloors, wall_line_name,
+                                          reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                                          userDefinedDCTag, False, **options)
+        except DesignInfeasibleError:
+            outcomes['finalWallLength'].append(np.nan)
+            outcomes['maxDrift'].append(np.nan)
+            outcomes['assemblyClass'].append(-1)
+            continue
+        sw_design = design.sw_final_design
+        rows = [shearwall_catalog.columns['Assembly'] == shearwall_catalog.code_of('Assembly', name)
+                for name in sw_design['Shear Wall Assembly']]
+        assembly = np.array([np.argmax(row) for row in rows])
+        outcomes['finalWallLength'].append(float(np.max(design.finalWallLength)))
+        outcomes['maxDrift'].append(float(np.max(sw_design['Drift(in)'].astype(float))))
+        outcomes['assemblyClass'].append(int(assembly_class(assembly[None, :])[0]))
+    return {name: np.array(values) for name, values in outcomes.items()}
+
+
+class DesignSurrogate():
+
+    def __init__(self, inputs, wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                 userDefinedDCTag, outcomes = None, holdout = 0.2, coverage = 0.95, numBins = 10, seed = 0,
+                 maxWallLength = MAX_WALL_LENGTH, chunkSize = 4096, **options):
+        """
+        Design parameters are the same as StackedShearWallDesign and are used for the exact designs
+        :param inputs: stacked inputs of the training cases, see VectorizedDesign.stack_wall_lines()
+        :param wallLength: starting wall length (one for all the cases). Units: ft
+        :param outcomes: exact outcomes of the training cases (see design_outcomes() and
+                         final_design_outcomes()); designed with StackedShearWallDesign if None
+        :param holdout: share of the training cases kept out of the fit to estimate the errors
+        :param coverage: share of the holdout errors the predicted bounds hold
+        :param numBins: number of bins of the predicted value the error bounds are estimated in
+        :param chunkSize: number of cases predicted at once (bounds the memory use)
+        :param options: other StackedShearWallDesign keyword parameters
+        """
+        self.inputs = inputs
+        self.wallLength = float(wallLength)
+        self.designParameters = (reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag)
+        self.options = dict(options, maxWallLength = maxWallLength)
+        #the drift check starts the demand at the redesign length with the second flag, same as the design
+        self.demandLength = self.wallLength + 0.5 if userDefinedDetailingTag else self.wallLength
+        self.userDefinedDriftTag = userDefinedDriftTag
+        self.maxWallLength = maxWallLength
+        self.holdout = holdout
+        self.coverage = coverage
+        self.numBins = numBins
+        self.seed = seed
+        self.chunkSize = chunkSize
+
+        if outcomes is None:
+            outcomes = design_outcomes(StackedShearWallDesign(inputs, self.wallLength, *self.designParameters,
+                                                              **self.options))
+        self.outcomes = outcomes
+        self.numFloors = np.shape(inputs['storyForce'])[1]
+
+        self.fit()
+        self.estimate_errors()
+
+    def driftLimit(self, inputs):
+        #drift limit of every floor. Units: in
+        drift = inputs['userDefinedDrift'] if self.userDefinedDriftTag else inputs['allowableDrift']
+        return np.asarray(inputs['storyHeight'], dtype = float) * 12 * np.asarray(drift, dtype = float)[:, None]
+
+    def standardize(self, inputs):
+        """
+        This method is used to get the standardized log inputs of cases; the mean and scale are taken
+        from the training cases
+        :return: input matrix, shape (cases, inputs)
+        """
+        floors = [np.log(np.cumsum(inputs['storyForce'], axis = 1)), np.log(inputs['storyHeight']),
+                  np.log(np.asarray(inputs['chordArea']) * inputs['elasticModulus']), inputs['takeup'],
+                  np.log(self.driftLimit(inputs))]
+        cases = [np.log(np.asarray(inputs['Cd'])/inputs['Ie']), np.asarray(inputs['initialMoisture']) - inputs['finalMoisture'],
+                 np.log(inputs['wallsPerLine'])]
+        X = np.concatenate([np.asarray(values, dtype = float) for values in floors] +
+                           [np.asarray(values, dtype = float)[:, None] for values in cases], axis = 1)
+        if not hasattr(self, 'featureMean'):
+            self.featureMean = X.mean(axis = 0)
+            #inputs that do not vary in the training cases drop out of the fit
+            self.featureScale = np.where(X.std(axis = 0) > 0, X.std(axis = 0), 1.0)
+        return (X - self.featureMean)/self.featureScale
+
+    @staticmethod
+    def features(X):
+        """
+        :param X: standardized inputs, see standardize()
+        :return: quadratic features (1, inputs and products of two inputs), shape (cases, features)
+        """
+        #products with every input from the i-th on, built from contiguous slices (faster than gathering columns)
+        return np.concatenate([np.ones((len(X), 1)), X] + [X[:, i:i + 1] * X[:, i:] for i in range(X.shape[1])], axis = 1)
+
+    def fit(self):
+        """
+        This method is used to fit the coefficients on the training part of the cases
+        :return: dictionary of the coefficients of every outcome
+        """
+        numCases = len(self.outcomes['finalWallLength'])
+        order = np.random.default_rng(self.seed).permutation(numCases)
+        self.test = np.zeros(numCases, dtype = bool)
+        self.test[order[:int(round(self.holdout*numCases))]] = True
+        P = self.features(self.standardize(self.inputs))
+        designed = np.isfinite(self.outcomes['finalWallLength'])
+        train = designed & ~self.test
+        if np.count_nonzero(train) < P.shape[1]:
+            raise ValueError('The surrogate needs at least %d designed training cases, %d were given'
+                             % (P.shape[1], np.count_nonzero(train)))
+
+        self.coefficients = {}
+        for name in REGRESSION_TARGETS:
+            self.coefficients[name] = np.linalg.lstsq(P[train], np.log(self.outcomes[name][train]), rcond = None)[0]
+        self.classes = np.unique(self.outcomes['assemblyClass'][train])
+        oneHot = (self.outcomes['assemblyClass'][train][:, None] == self.classes).astype(float)
+        self.coefficients['assemblyClass'] = np.linalg.lstsq(P[train], oneHot, rcond = None)[0]
+        self.allCoefficients = np.column_stack([self.coefficients[name] for name in REGRESSION_TARGETS] +
+                                               [self.coefficients['assemblyClass']])
+        self.trainingFeatures = P
+        return self.coefficients
+
+    def estimate_errors(self):
+        """
+        This method is used to estimate the errors on the holdout cases: for the length and the drift,
+        the coverage quantile of the log error in every bin of the predicted value; for the class, the
+        share of right classes
+        :return: dictionary of the error estimates
+        """
+        P = self.trainingFeatures[self.test & np.isfinite(self.outcomes['finalWallLength'])]
+        test = self.test & np.isfinite(self.outcomes['finalWallLength'])
+        if len(P) == 0:
+            raise ValueError('No designed holdout case to estimate the errors; increase holdout')
+        self.binEdges = {}
+        self.binError = {}
+        for name in REGRESSION_TARGETS:
+            predicted = P @ self.coefficients[name]
+            error = np.abs(predicted - np.log(self.outcomes[name][test]))
+            edges = np.quantile(predicted, np.linspace(0, 1, self.numBins + 1)[1:-1])
+            bins = np.searchsorted(edges, predicted)
+            self.binEdges[name] = edges
+            self.binError[name] = np.array([np.quantile(error[bins == b], self.coverage) if np.any(bins == b)
+                                            else np.quantile(error, self.coverage) for b in range(self.numBins)])
+        predictedClass = self.classes[np.argmax(P @ self.coefficients['assemblyClass'], axis = 1)]
+        self.classAccuracy = float(np.mean(predictedClass == self.outcomes['assemblyClass'][test]))
+        del self.trainingFeatures
+        self.errors = {name: float(np.exp(self.binError[name].max()) - 1) for name in REGRESSION_TARGETS}
+        self.errors['assemblyClass'] = 1 - self.classAccuracy
+        return self.errors
+
+    def predict(self, inputs):
+        """
+        This method is used to predict the outcomes of cases with their error bounds
+        :param inputs: stacked inputs, same number of floors as the training cases
+        :return: dictionary of arrays: 'finalWallLength', 'maxDrift' with their '... lower' and
+                 '... upper' bounds, 'assemblyClass' (class code, see class_label()) and 'classScore'
+                 (least squares score of the class, near 1 when the class is clear)
+        """
+        numCases, numFloors = np.shape(inputs['storyForce'])
+        if numFloors != self.numFloors:
+            raise ValueError('The surrogate was fitted for %d floors, the cases have %d' % (self.numFloors, numFloors))
+        names = list(REGRESSION_TARGETS) + [name + bound for name in REGRESSION_TARGETS for bound in (' lower', ' upper')]
+        prediction = {name: np.empty(numCases) for name in names + ['classScore']}
+        prediction['assemblyClass'] = np.empty(numCases, dtype = self.classes.dtype)
+        for start in range(0, numCases, self.chunkSize):
+            part = slice(start, start + self.chunkSize)
+            X = self.standardize({name: np.asarray(inputs[name])[part] for name in FLOOR_INPUTS + CASE_INPUTS})
+            #all the outcomes with one product of the features
+            P = self.features(X) @ self.allCoefficients
+            for k, name in enumerate(REGRESSION_TARGETS):
+                value = P[:, k]
+                error = self.binError[name][np.searchsorted(self.binEdges[name], value)]
+                prediction[name][part] = np.exp(value)
+                prediction[name + ' lower'][part] = np.exp(value - error)
+                prediction[name + ' upper'][part] = np.exp(value + error)
+            score = P[:, len(REGRESSION_TARGETS):]
+            best = np.argmax(score, axis = 1)
+            prediction['assemblyClass'][part] = self.classes[best]
+            prediction['classScore'][part] = score[np.arange(len(best)), best]
+        #the design never shortens the wall below the starting length
+        for name in ('finalWallLength', 'finalWallLength lower', 'finalWallLength upper'):
+            prediction[name] = np.maximum(prediction[name], self.wallLength)
+        return prediction
+
+    def utilization(self, inputs, length):
+        """
+        This method is used to check how close cases are to the limits of the design
+        :param length: wall length the drift is checked at, one per case. Units: ft
+        :return: dictionary of the largest utilization over the floors of every case: 'strength' (unit
+                 shear at the starting length / largest LRFD capacity), 'tie-down' (tension at the starting
+                 length / largest rod capacity) and 'drift' (drift of the stiffest assembly at length /
+                 drift limit)
+        """
+        storyForce = np.asarray(inputs['storyForce'], dtype = float)
+        storyHeight = np.asarray(inputs['storyHeight'], dtype = float)
+        unitShear, tension = demand(storyForce, self.demandLength, storyHeight)
+        #largest rod capacity of every case, D/C adjusted where a tie-down D/C ratio is given
+        ratios = np.asarray(inputs['tiedownDCRatio'], dtype = float)
+        maxRod = np.full(len(ratios), tiedown_catalog.search_capacity(None)[-1])
+        for ratio in np.unique(ratios[~np.isnan(ratios)]):
+            maxRod[ratios == ratio] = tiedown_catalog.search_capacity(float(ratio))[-1]
+
+        #drift at the checked length, with the rods selected for that demand
+        length = np.asarray(length, dtype = float)[:, None]
+        unitShearAtLength, tensionAtLength = demand(storyForce, length, storyHeight)
+        rod = np.minimum(tiedown_catalog.select(tensionAtLength), len(tiedown_catalog) - 1)
+        rodElongation = tiedown_catalog.rod_elongation(tensionAtLength, storyHeight, rod)
+        chordArea = np.asarray(inputs['chordArea'], dtype = float)
+        stiffest = shearwall_catalog.Ga.max()
+        storyDrift = drift(storyForce, length, storyHeight, chordArea * inputs['elasticModulus'], stiffest,
+                           chordArea, np.asarray(inputs['initialMoisture'])[:, None],
+                           np.asarray(inputs['finalMoisture'])[:, None], inputs['takeup'],
+                           np.asarray(inputs['Cd'])[:, None], np.asarray(inputs['Ie'])[:, None],
+                           tensionAtLength, rodElongation)
+        return {'strength': unitShear.max(axis = 1)/shearwall_catalog.lrfd.max(),
+                'tie-down': tension.max(axis = 1)/maxRod,
+                'drift': (storyDrift/self.driftLimit(inputs)).max(axis = 1)}
+
+    def screen(self, inputs, margin = 0.05, exact = True):
+        """
+        This method is used to screen cases: the surrogate predicts the outcomes and the cases near the
+        limits of the design are designed exactly
+        :param inputs: stacked inputs, see VectorizedDesign.stack_wall_lines()
+        :param margin: utilization within margin of 1 counts as near the limit
+        :param exact: if False, the cases near the limits are only flagged, not designed
+        :return: dictionary of the predict() arrays (exact values and bounds for the designed cases),
+                 'feasible', 'reason' (None, or the reason the case cannot be designed), 'exact' (cases
+                 designed exactly), 'nearLimit' (cases near a limit) and the 'utilization' dictionary
+        """
+        numCases = len(inputs['storyForce'])
+        screening = self.predict(inputs)
+        length = np.minimum(screening['finalWallLength upper'], self.maxWallLength)
+        utilization = self.utilization(inputs, length)
+        reason = np.full(numCases, None, dtype = object)
+        #past the strength or tie-down limit at the starting length the exact design fails its upfront check
+        reason[utilization['tie-down'] > 1] = 'tie-down'
+        reason[utilization['strength'] > 1] = 'strength'
+        feasible = np.array([value is None for value in reason], dtype = bool)
+        nearLimit = feasible & ((np.abs(utilization['strength'] - 1) <= margin) | (np.abs(utilization['tie-down'] - 1) <= margin) |
+                      (utilization['drift'] >= 1 - margin) | (screening['finalWallLength upper'] >= self.maxWallLength))
+        screening.update(feasible = feasible, reason = reason, nearLimit = nearLimit,
+                         exact = np.zeros(numCases, dtype = bool), utilization = utilization)
+        for name in REGRESSION_TARGETS:
+            for values in (screening[name], screening[name + ' lower'], screening[name + ' upper']):
+                values[~screening['feasible']] = np.nan
+        screening['assemblyClass'][~screening['feasible']] = -1
+
+        cases = np.flatnonzero(nearLimit)
+        if exact and len(cases):
+            subset = {name: np.asarray(inputs[name])[cases] for name in FLOOR_INPUTS + CASE_INPUTS}
+            subset['detailing'] = [inputs['detailing'][case] for case in cases]
+            design = StackedShearWallDesign(subset, self.wallLength, *self.designParameters, **self.options)
+            outcomes = design_outcomes(design)
+            for name in REGRESSION_TARGETS:
+                for bound in ('', ' lower', ' upper'):
+                    screening[name + bound][cases] = outcomes[name]
+            screening['assemblyClass'][cases] = outcomes['assemblyClass']
+            screening['classScore'][cases] = 1.0
+            screening['feasible'][cases] = design.feasible
+            screening['reason'][cases] = design.reason
+            screening['exact'][cases] = True
+        return screening
+
+
+def sample_inputs(numCases, numFloors = 3, seed = 0):
+    """
+    This function is used to generate varied synthetic cases (forces, chords, take-up, moisture,
+    Cd, Ie and walls per line) on top of VectorizedDesign.random_inputs(), e.g. for benchmarks
+    :return: dictionary of stacked inputs
+    """
+    from VectorizedDesign import random_inputs
+
+    inputs = random_inputs(numCases, numFloors, seed)
+    random = np.random.default_rng(seed + 1)
+    shape = np.shape(inputs['storyForce'])
+    inputs['storyForce'] = inputs['storyForce'] * random.uniform(0.3, 2.0, (numCases, 1))
+    inputs['chordArea'] = inputs['chordArea'] * random.uniform(0.5, 2.0, (numCases, 1))
+    inputs['takeup'] = np.broadcast_to(random.uniform(0.0, 0.1, (numCases, 1)), shape).copy()
+    inputs['finalMoisture'] = random.uniform(8.0, 19.0, numCases)
+    inputs['Cd'] = random.choice([2.5, 4.0, 4.5], numCases)
+    inputs['Ie'] = random.choice([1.0, 1.25, 1.5], numCases)
+    inputs['wallsPerLine'] = random.choice([1.0, 2.0, 3.0], numCases)
+    return inputs
+
+
+if __name__ == '__main__':
+    #benchmark: fit on 20,000 exact designs, check against 20,000 new exact designs, then screen
+    #1,000,000 cases
+    start = time.perf_counter()
+    surrogate = DesignSurrogate(sample_inputs(20000, seed = 0), 4.0, False, False, False, False)
+    print('fit on 20000 designs: %.1f s; holdout errors (%d%%): length %.0f%%, drift %.0f%%, class accuracy %.0f%%'
+          % (time.perf_counter() - start, 100*surrogate.coverage, 100*surrogate.errors['finalWallLength'],
+             100*surrogate.errors['maxDrift'], 100*surrogate.classAccuracy))
+
+    inputs = sample_inputs(20000, seed = 1)
+    outcomes = design_outcomes(StackedShearWallDesign(inputs, 4.0, False, False, False, False))
+    screening = surrogate.screen(inputs)
+    predicted = ~screening['exact'] & screening['feasible']
+    designed = np.isfinite(outcomes['finalWallLength'])
+    print('check on 20000 new cases: %.1f%% designed exactly, feasibility right for %.2f%%'
+          % (100*np.mean(screening['exact']), 100*np.mean(screening['feasible'] == designed)))
+    for name in REGRESSION_TARGETS:
+        both = predicted & designed
+        error = np.abs(screening[name][both]/outcomes[name][both] - 1)
+        inside = (outcomes[name][both] >= screening[name + ' lower'][both] - 1e-9) & \
+                 (outcomes[name][both] <= screening[name + ' upper'][both] + 1e-9)
+        print('    %-15s median error %4.1f%%, 95th percentile %4.1f%%, inside bounds %4.1f%%'
+              % (name, 100*np.median(error), 100*np.percentile(error, 95), 100*np.mean(inside)))
+    print('    assembly class  right for %.1f%%' % (100*np.mean(screening['assemblyClass'][predicted & designed]
+                                                                == outcomes['assemblyClass'][predicted & designed])))
+
+    inputs = sample_inputs(1000000, seed = 2)
+    start = time.perf_counter()
+    screening = surrogate.screen(inputs, exact = False)
+    screened = time.perf_counter() - start
+    start = time.perf_counter()
+    screening = surrogate.screen(inputs)
+    print('screened 1000000 cases in %.1f s (%.0f cases/s); with the %d cases near a limit designed exactly %.1f s'
+          % (screened, 1e6/screened, np.count_nonzero(screening['exact']), time.perf_counter() - start))
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design the continuous rod tie-downs of a wall line for all stories at once.
+
+The tie-down database (AISC Manual Table 7-17) is stored as NumPy arrays. The rod of every story is
+the first rod of the database whose (D/C adjusted) capacity meets the tension demand, found with one
+binary search over the running maximum of the capacities for all stories (and all wall lines) at
+once. The rod elongation and the sill plate shrinkage are computed for every story and accumulated
+over the continuous run from the base up.
+
+A continuous run can also be designed with few rod changes over the height: the rods are selected
+for the least steel (gross area * story height) with at most a given number of rod changes.
+
+Arrays are top story first, same as the designs.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+import pandas as pd
+
+from DesignErrors import DesignInfeasibleError
+
+
+class TieDownCatalog():
+
+    def __init__(self, tiedown_database):
+        """
+        :param tiedown_database: dataframe of tie_down_database.csv, rows ordered by increasing capacity
+        """
+        self.set_arrays(tiedown_database['Assembly'].values,
+                        tiedown_database['Capacity(kips)'].values.astype(float),
+                        tiedown_database['Ae(in^2)'].values.astype(float),
+                        tiedown_database['Ag(in^2)'].values.astype(float))
+
+    @classmethod
+    def from_arrays(cls, assembly, capacity, area, grossArea):
+        """
+        This method is used to build a catalog on arrays that are already parsed (e.g. attached from
+        shared memory, see SharedMemoryPool.py) without copying them
+        :param assembly, capacity, area, grossArea: one value per rod, same order as the database
+        :return: TieDownCatalog
+        """
+        catalog = cls.__new__(cls)
+        catalog.set_arrays(assembly, capacity, area, grossArea)
+        return catalog
+
+    def set_arrays(self, assembly, capacity, area, grossArea):
+        self.assembly = assembly
+        self.capacity = capacity
+        self.area = area
+        self.grossArea = grossArea
+        self.numRows = len(self.capacity)
+        if self.numRows == 0:
+            raise ValueError('The tie-down database is empty')
+        #D/C ratio -> running maximum of the adjusted capacities
+        self._search_cache = {}
+
+    def __len__(self):
+        return self.numRows
+
+    def adjusted_capacity(self, DCRatio = None):
+        """
+        :param DCRatio: target D/C ratio; the capacities are multiplied by it. None for no adjustment
+        :return: adjusted capacity of every rod
+        """
+        return self.capacity if DCRatio is None else self.capacity * DCRatio
+
+    def search_capacity(self, DCRatio = None):
+        """
+        This method is used to get the running maximum of the adjusted capacities. The first rod whose
+        running maximum meets a demand is the first rod whose own capacity meets it, so a binary search
+        on it finds the same rod as filtering the database in order
+        :return: running maximum of the adjusted capacities
+        """
+        #D/C ratios read with np.loadtxt are 0-d arrays, which cannot be cache keys
+        DCRatio = None if DCRatio is None else float(DCRatio)
+        if DCRatio not in self._search_cache:
+            self._search_cache[DCRatio] = np.maximum.accumulate(self.adjusted_capacity(DCRatio))
+        return self._search_cache[DCRatio]
+
+    def select(self, tension, DCRatio = None):
+        """
+        This method is used to select the lightest rod for any number of tension demands at once
+        :param tension: tension demand, any shape. Units: kips
+        :param DCRatio: target D/C ratio of the rods, None for no adjustment
+        :return: row of the rod for every demand; len(self) where no rod meets the demand
+        """
+        return np.searchsorted(self.search_capacity(DCRatio), tension, side = 'left')
+
+    def rod_elongation(self, tension, storyHeight, rod, E = 29000):
+        """
+        :param tension: tension demand. Units: kips
+        :param storyHeight: story height. Units: ft
+        :param rod: row of the rod
+        :param E: Youngs Modulus of steel. Units: ksi
+        :return: elongation of the rod over the story. Units: in
+        """
+        return tension * storyHeight*12/(E * self.area[rod])
+
+    def fewest_changes(self, tension, storyHeight, DCRatio = None, maxRodChanges = 0):
+        """
+        This method is used to select the rods of continuous runs with at most maxRodChanges rod changes
+        over the height, using the least steel (gross area * story height)
+        :param tension: tension demand of every story, shape (..., stories), top story first. Units: kips
+        :param storyHeight: story heights, broadcast to tension. Units: ft
+        :param DCRatio: target D/C ratio of the rods, None for no adjustment
+        :param maxRodChanges: largest number of rod changes of a run
+        :return: row of the rod of every story, shape of tension; len(self) for the whole run where no
+                 rod meets the demand of a story
+        """
+        tension = np.asarray(tension, dtype = float)
+        shape = tension.shape
+        tension = tension.reshape(-1, shape[-1])
+        weight = np.broadcast_to(storyHeight, shape).reshape(-1, shape[-1])[:, :, None] * self.grossArea
+        #steel of each story for each rod, infinite where the rod is too weak
+        weight = np.where(self.adjusted_capacity(DCRatio) >= tension[:, :, None], weight, np.inf)
+        runs, stories, rods = weight.shape
+        changes = maxRodChanges + 1
+
+        #cost[run, rod, k]: least steel of the stories so far, with the last story on rod and at most k changes
+        cost = np.broadcast_to(weight[:, 0, :, None], (runs, rods, changes)).copy()
+        #previous rod of every story, rod and number of changes, to trace the selection back
+        previous = np.zeros((stories, runs, rods, changes), dtype = np.intp)
+        previous[0] = np.arange(rods)[None, :, None]
+        for i in range(1, stories):
+            #keep the rod, or change from the best rod of the story above with one change less
+            best = np.argmin(cost[:, :, :-1], axis = 1)
+            bestCost = np.take_along_axis(cost[:, :, :-1], best[:, None, :], axis = 1)
+            change = np.concatenate([np.full((runs, rods, 1), np.inf), np.broadcast_to(bestCost, (runs, rods, changes - 1))], axis = 2)
+            keep = cost <= change
+            previous[i] = np.where(keep, np.arange(rods)[None, :, None],
+                                   np.concatenate([np.zeros((runs, 1, 1), dtype = np.intp),
+                                                   best[:, None, :]], axis = 2))
+            cost = weight[:, i, :, None] + np.where(keep, cost, change)
+
+        #trace back from the cheapest last rod with the largest number of changes allowed
+        rod = np.argmin(cost[:, :, -1], axis = 1)
+        feasible = np.isfinite(cost[np.arange(runs), rod, -1])
+        k = np.full(runs, changes - 1)
+        selection = np.empty((runs, stories), dtype = np.intp)
+        for i in range(stories - 1, -1, -1):
+            selection[:, i] = rod
+            above = previous[i, np.arange(runs), rod, k]
+            k = k - (above != rod)
+            rod = above
+        selection[~feasible] = self.numRows
+        return selection.reshape(shape)
+
+    def design(self, tension, storyHeight, DCRatio = None, E = 29000, initialMoisture = None,
+               finalMoisture = None, maxRodChanges = None, wall_line_name = None, levels = None):
+        """
+        This method is used to design the continuous rod tie-downs of any number of wall lines at once
+        :param tension: tension demand of every story, shape (..., stories), top story first. Units: kips
+        :param storyHeight: story heights, broadcast to tension. Units: ft
+        :param DCRatio: target D/C ratio of the rods, None for no adjustment
+        :param E: Youngs Modulus of steel. Units: ksi
+        :param initialMoisture, finalMoisture: moisture content of the wood, broadcast to tension. Units: %.
+                                               No shrinkage if None
+        :param maxRodChanges: largest number of rod changes over the height (0 is one rod for the whole run).
+                              None selects the lightest rod of every story
+        :param wall_line_name: name of the wall line, for the diagnostic of a tension no rod can carry
+        :param levels: level of every story, broadcast to tension, for the same diagnostic
+        :return: dictionary of arrays, shape of tension: 'rod' (row in the database), 'capacity',
+                 'D/C Ratio', 'rod elongation' (over each story), 'cumulative rod elongation' (from the
+                 base to the top of each story), 'shrinkage' and 'cumulative shrinkage' (Units: in), and
+                 'rod changes' of every run
+        """
+        tension = np.asarray(tension, dtype = float)
+        storyHeight = np.broadcast_to(storyHeight, tension.shape)
+        if maxRodChanges is None:
+            rod = self.select(tension, DCRatio)
+        else:
+            rod = self.fewest_changes(tension, storyHeight, DCRatio, maxRodChanges)
+        if np.any(rod == self.numRows):
+            #largest tension of the first run that no rod can carry
+            failed = (rod == self.numRows).reshape(-1, tension.shape[-1])
+            run = np.flatnonzero(failed.any(axis = 1))[0]
+            story = np.argmax(np.where(failed[run], tension.reshape(failed.shape)[run], -np.inf))
+            level = None if levels is None else np.broadcast_to(levels, tension.shape).reshape(failed.shape)[run, story]
+            raise DesignInfeasibleError('tie-down', 'tension demand %.2f kips exceeds the largest tie-down capacity'
+                                        % tension.reshape(failed.shape)[run, story], wall_line_name, level)
+
+        elongation = self.rod_elongation(tension, storyHeight, rod, E)
+        if initialMoisture is None or finalMoisture is None:
+            shrinkage = np.zeros_like(tension)
+        else:
+            #2x sill plate, same as DesignShearWall.calculate_assembly_deflection()
+            shrinkage = np.broadcast_to(0.0025*1.5*(np.asarray(initialMoisture) - np.asarray(finalMoisture)),
+                                        tension.shape).astype(float)
+        return {'rod': rod,
+                'capacity': self.capacity[rod],
+                'D/C Ratio': tension / self.capacity[rod],
+                'rod elongation': elongation,
+                'cumulative rod elongation': np.cumsum(elongation[..., ::-1], axis = -1)[..., ::-1],
+                'shrinkage': shrinkage,
+                'cumulative shrinkage': np.cumsum(shrinkage[..., ::-1], axis = -1)[..., ::-1],
+                'rod changes': np.count_nonzero(np.diff(rod, axis = -1), axis = -1)}
+
+    def to_dataframe(self, design, levels):
+        """
+        This method is used to tabulate the design of one wall line
+        :param design: dictionary returned by design() for one wall line
+        :param levels: level of every story, top story first
+        :return: dataframe with one row per story
+        """
+        return pd.DataFrame({'Tie-down Assembly': self.assembly[design['rod']],
+                             'Capacity(kips)': design['capacity'],
+                             'level': levels,
+                             'D/C Ratio': design['D/C Ratio'],
+                             'Rod Elongation(in)': design['rod elongation'],
+                             'Cumulative Rod Elongation(in)': design['cumulative rod elongation'],
+                             'Shrinkage(in)': design['shrinkage'],
+                             'Cumulative Shrinkage(in)': design['cumulative shrinkage']})
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to run nonlinear time history analyses of a designed wood frame building for many
+ground motion records at once, directly in NumPy.
+
+The building is a shear building: one lumped mass per floor and one hysteretic spring per story.
+The story backbone is the sum of the Pinching4 backbones of the story panels (Pushover.story_backbone)
+and the hysteresis follows the Pinching4 idea in a simplified form:
+    - unloading and reloading with the initial stiffness, bounded by the backbone
+    - once a story has yielded, the force passes through zero with no stiffness (slip) and reloads
+      along a pinched line through (rDisp*dmax, rForce*F(dmax)) towards the largest previous
+      displacement on the backbone, in each direction
+The damage parameters (gK, gD) and uForce of Pinching4 are not modelled.
+
+The equations of motion are integrated with the explicit central difference method and Rayleigh
+damping (DynamicParameter), with the records as the leading array axis. The time step of the
+records is divided so that the integration is stable for the initial stiffness. Records can also
+be split in chunks and run in a process pool.
+
+Story arrays follow the same order as the design inputs: the first entry is the top story.
+
+Units: kips, inches, seconds; ground motions in g
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from ModalResponseSpectrum import GRAVITY, modal_analysis
+from Pushover import interpolate, material_index, panel_backbone, story_backbone
+
+
+def read_ground_motion(path, dt = None):
+    """
+    This function is used to read a ground motion record. Supported formats are the PEER .AT2 format
+    (NPTS and DT on the fourth header line), a two column file (time, acceleration) and a one column
+    file of accelerations (dt is required)
+    :param path: path of the record file
+    :param dt: time step of one column files. Units: s
+    :return: acceleration history (g) and its time step (s)
+    """
+    with open(path, 'r') as myfile:
+        lines = myfile.readlines()
+    header = ''.join(lines[:4]).upper()
+    if 'NPTS' in header:
+        npts = int(re.search(r'NPTS\s*=?\s*(\d+)', header).group(1))
+        dt = float(re.search(r'DT\s*=?\s*([0-9.Ee+-]+)', header).group(1))
+        acceleration = np.array(' '.join(lines[4:]).split(), dtype = float)[:npts]
+        return acceleration, dt
+
+    data = np.genfromtxt(path)
+    if data.ndim == 2:
+        return data[:, 1], float(np.mean(np.diff(data[:, 0])))
+    if dt is None:
+        raise ValueError('The time step of %s must be given' % path)
+    return data, float(dt)
+
+
+def stack_ground_motions(records, dt):
+    """
+    This function is used to put ground motion records on a common time step and length
+    :param records: list of (acceleration, dt) pairs, e.g. from read_ground_motion()
+    :param dt: common time step. Units: s
+    :return: accelerations, shape (records, steps), zero padded at the end. Units: g
+    """
+    resampled = []
+    for acceleration, recordDt in records:
+        time = np.arange(len(acceleration))*recordDt
+        resampled.append(np.interp(np.arange(0, time[-1] + 0.5*dt, dt), time, acceleration))
+    stacked = np.zeros((len(resampled), max(len(a) for a in resampled)))
+    for i, acceleration in enumerate(resampled):
+        stacked[i, :len(acceleration)] = acceleration
+    return stacked
+
+
+def synthetic_ground_motions(numRecords, duration = 20.0, dt = 0.01, PGA = 0.4, groundPeriod = 0.3,
+                             groundDamping = 0.6, seed = None):
+    """
+    This function is used to generate synthetic ground motions: white noise filtered with the
+    Kanai-Tajimi spectrum and shaped by a build-up / strong motion / decay envelope
+    :param numRecords: number of records
+    :param duration: record duration. Units: s
+    :param dt: time step. Units: s
+    :param PGA: peak ground acceleration of every record. Units: g
+    :param groundPeriod, groundDamping: predominant period (s) and damping of the soil filter
+    :param seed: seed of the random generator
+    :return: accelerations, shape (records, steps). Units: g
+    """
+    rng = np.random.default_rng(seed)
+    numSteps = int(round(duration/dt))
+    time = np.arange(numSteps)*dt
+    noise = rng.standard_normal((numRecords, numSteps))
+
+    omega = 2*np.pi*np.fft.rfftfreq(numSteps, dt)
+    wg = 2*np.pi/groundPeriod
+    #Kanai-Tajimi transfer function of the ground acceleration
+    kanaiTajimi = (wg**2 + 2j*groundDamping*wg*omega)/(wg**2 - omega**2 + 2j*groundDamping*wg*omega)
+    filtered = np.fft.irfft(np.fft.rfft(noise, axis = 1)*kanaiTajimi, n = numSteps, axis = 1)
+
+    rise, strong = 0.1*duration, 0.4*duration
+    envelope = np.where(time < rise, (time/rise)**2,
+                        np.where(time < strong, 1.0, np.exp(-3*(time - strong)/(duration - strong))))
+    acceleration = filtered*envelope
+    return PGA*acceleration/np.abs(acceleration).max(axis = 1, keepdims = True)
+
+
+def rayleigh_coefficients(omega, dampingRatio, modes = (0, 2)):
+    """
+    This function is used to compute the Rayleigh damping coefficients C = a0*M + a1*K with the same
+    damping ratio at two modes (the first and the third by default, or the highest mode available)
+    :param omega: circular frequencies, ascending. Units: rad/s
+    :return: a0, a1
+    """
+    wi = omega[min(modes[0], len(omega) - 1)]
+    wj = omega[min(modes[1], len(omega) - 1)]
+    return 2*dampingRatio*wi*wj/(wi + wj), 2*dampingRatio/(wi + wj)
+
+
+def story_pinching(MaterialProperty, panelMaterial, panelF):
+    """
+    This function is used to get the pinching parameters of each story, as the average of the
+    panel parameters weighted by the panel strength at the first backbone point
+    :return: rDisp and rForce of each story, shape (stories,)
+    """
+    position, found = material_index(MaterialProperty, panelMaterial)
+    weight = np.where(found, panelF[..., 0], 0.0)
+    total = np.maximum(weight.sum(axis = -1), 1e-12)
+    return [np.sum(weight*np.atleast_1d(MaterialProperty[name]).astype(float)[position], axis = -1)/total
+            for name in ('rDisp', 'rForce')]
+
+
+def integrate(groundMotion, dt, floorWeights, storyHeights, table, tableStep, storyYield, initialStiffness,
+              rDisp, rForce, dampingRatio, freeVibration = 5.0, g = GRAVITY):
+    """
+    This function is used to integrate the equations of motion of one building for a batch of records
+    :param groundMotion: accelerations, shape (records, steps). Units: g
+    :param table: story backbone force on a uniform displacement grid, shape (stories, points)
+    :param tableStep: spacing of the displacement grid of each story, shape (stories,). Units: in
+    :param storyYield: displacement after which a story pinches, shape (stories,). Units: in
+    :param initialStiffness, rDisp, rForce: story properties, shape (stories,)
+    :param freeVibration: length of the free vibration added after each record. Units: s
+    :return: peak and residual story drift ratios, each shape (records, stories)
+    """
+    groundMotion = np.atleast_2d(groundMotion)
+    numRecords = groundMotion.shape[0]
+    numStories = len(floorWeights)
+    mass = np.asarray(floorWeights, dtype = float)/g
+
+    modes = modal_analysis(floorWeights, initialStiffness, g)
+    omega = modes['omega'][0]
+    a0, a1 = rayleigh_coefficients(omega, dampingRatio)
+    K = np.diag(initialStiffness + np.concatenate([[0.0], initialStiffness[:-1]])) \
+        - np.diag(initialStiffness[:-1], 1) - np.diag(initialStiffness[:-1], -1)
+    C = a0*np.diag(mass) + a1*K
+
+    #stable time step of the central difference method with damping, 80% of the limit
+    stableDt = 0.8*2/omega[-1]*(np.sqrt(1 + dampingRatio**2) - dampingRatio)
+    numSub = int(np.ceil(dt/stableDt))
+    h = dt/numSub
+    acceleration = np.concatenate([groundMotion, np.zeros((numRecords, int(round(freeVibration/dt))))], axis = 1)
+
+    #pre-factored effective mass of the central difference method
+    invMass = np.linalg.inv(np.diag(mass)/h**2 + C/(2*h)).T
+    lagMatrix = (np.diag(mass)/h**2 - C/(2*h)).T
+    leadMass = 2*mass/h**2
+
+    u = np.zeros((numRecords, numStories))
+    uPrevious = np.zeros_like(u)
+    drift = np.zeros_like(u)
+    force = np.zeros_like(u)
+    dmaxPositive = np.broadcast_to(storyYield, u.shape).copy()
+    dmaxNegative = dmaxPositive.copy()
+    peakDrift = np.zeros_like(u)
+
+    numPoints = table.shape[1]
+    flatTable = table.ravel()
+    rowStart = np.arange(numStories)*numPoints
+
+    def backbone(d):
+        #backbone force at positive displacements d, shape (records, stories)
+        x = np.minimum(d/tableStep, numPoints - 1.000001)
+        i = x.astype(int)
+        return flatTable[rowStart + i] + (x - i)*(flatTable[rowStart + i + 1] - flatTable[rowStart + i])
+
+    def pinched(d, dmax):
+        #pinched reloading line through (rDisp*dmax, rForce*F(dmax)) and (dmax, F(dmax)), not below zero
+        target = backbone(dmax)
+        slope = (1 - rForce)*target/((1 - rDisp)*dmax)
+        return np.maximum(rForce*target + slope*(d - rDisp*dmax), 0.0)
+
+    for step in range(acceleration.shape[1] - 1):
+        for sub in range(numSub):
+            #ground acceleration interpolated inside the record step
+            ag = acceleration[:, step] + (acceleration[:, step + 1] - acceleration[:, step])*sub/numSub
+
+            #story drift: floor minus the floor below, the last story is on the ground
+            newDrift = u - np.concatenate([u[:, 1:], np.zeros((numRecords, 1))], axis = 1)
+            yielded = (dmaxPositive > storyYield) | (dmaxNegative > storyYield)
+            envelope = backbone(np.abs(newDrift))
+            upper = np.where(newDrift > 0, envelope, np.inf)
+            lower = np.where(newDrift < 0, -envelope, -np.inf)
+            upper = np.where(yielded, np.minimum(upper, pinched(newDrift, dmaxPositive)), upper)
+            lower = np.where(yielded, np.maximum(lower, -pinched(-newDrift, dmaxNegative)), lower)
+            force = np.clip(force + initialStiffness*(newDrift - drift), lower, upper)
+            drift = newDrift
+            dmaxPositive = np.maximum(dmaxPositive, drift)
+            dmaxNegative = np.maximum(dmaxNegative, -drift)
+            peakDrift = np.maximum(peakDrift, np.abs(drift))
+
+            #restoring force of each floor: its story shear minus the story shear above
+            restoring = force - np.concatenate([np.zeros((numRecords, 1)), force[:, :-1]], axis = 1)
+            load = -mass*ag[:, None]*g - restoring + leadMass*u - uPrevious @ lagMatrix
+            u, uPrevious = load @ invMass, u
+
+    return peakDrift/storyHeights, drift/storyHeights
+
+
+def nonlinear_time_history(groundMotion, dt, MaterialProperty, panelMaterial, floorWeights, storyHeights,
+                           DynamicParameter, jobs = 1, chunkSize = None, freeVibration = 5.0, tablePoints = 2000):
+    """
+    This function is used to run the nonlinear time history analysis of one building for many records
+    :param groundMotion: accelerations, shape (records, steps). Units: g
+    :param dt: time step of the records. Units: s
+    :param MaterialProperty: MaterialProperty dictionary read by ComputeSeismicForce
+    :param panelMaterial: Pinching4 material number of each panel, shape (stories, panels)
+    :param floorWeights: floor seismic weight, shape (stories,). Units: kips
+    :param storyHeights: story heights, shape (stories,). Units: in
+    :param DynamicParameter: DynamicParameter dictionary read by ComputeSeismicForce
+    :param jobs: number of processes. With more than one, the records are run in chunks in a process pool
+    :param chunkSize: number of records per chunk. Default splits the records evenly over the processes
+    :param freeVibration: length of the free vibration added after each record to get the residual drift. Units: s
+    :param tablePoints: number of points of the tabulated story backbones
+    :return: dictionary with
+             'peak story drift', 'residual story drift': drift ratios, shape (records, stories)
+             'peak drift', 'residual drift': largest over the stories, shape (records,)
+             'collapse': peak drift not less than the collapse drift limit, shape (records,)
+             'demolition': not collapsed and residual drift not less than the demolition drift limit, shape (records,)
+    """
+    if str(DynamicParameter['DampingModel']).strip().lower() != 'rayleigh':
+        raise ValueError('Only Rayleigh damping is supported, not %s' % DynamicParameter['DampingModel'])
+    groundMotion = np.atleast_2d(np.asarray(groundMotion, dtype = float))
+    panelMaterial = np.atleast_2d(panelMaterial)
+    storyHeights = np.asarray(storyHeights, dtype = float)
+    collapseLimit = float(DynamicParameter['CollapseLimit'])
+
+    panelD, panelF = panel_backbone(MaterialProperty, panelMaterial)
+    corner, cornerForce, lastSlope = story_backbone(panelD, panelF)
+    #backbone tabulated up to twice the collapse drift, held constant beyond it
+    tableStep = 2*collapseLimit*storyHeights/(tablePoints - 1)
+    grid = np.arange(tablePoints)[None, :]*tableStep[:, None]
+    table = np.clip(interpolate(grid, corner, cornerForce)
+                    + lastSlope[:, None]*np.clip(grid - corner[:, -1:], 0, None), 0, None)
+    initialStiffness = np.sum(panelF[..., 0]/panelD[..., 0], axis = -1)
+    storyYield = np.min(np.where(panelF[..., 0] > 0, panelD[..., 0], np.inf), axis = -1)
+    rDisp, rForce = story_pinching(MaterialProperty, panelMaterial, panelF)
+
+    run = partial(integrate, dt = dt, floorWeights = np.asarray(floorWeights, dtype = float),
+                  storyHeights = storyHeights, table = table, tableStep = tableStep, storyYield = storyYield,
+                  initialStiffness = initialStiffness, rDisp = rDisp, rForce = rForce,
+                  dampingRatio = float(DynamicParameter['DampingRatio']), freeVibration = freeVibration)
+    if jobs > 1 and groundMotion.shape[0] > 1:
+        if chunkSize is None:
+            chunkSize = int(np.ceil(groundMotion.shape[0]/jobs))
+        chunks = [groundMotion[i:i + chunkSize] for i in range(0, groundMotion.shape[0], chunkSize)]
+        with ProcessPoolExecutor(max_workers = jobs) as pool:
+            results = list(pool.map(run, chunks))
+        peak = np.concatenate([r[0] for r in results])
+        residual = np.concatenate([r[1] for r in results])
+    else:
+        peak, residual = run(groundMotion)
+
+    collapse = peak.max(axis = 1) >= collapseLimit
+    return {'peak story drift': peak,
+            'residual story drift': np.abs(residual),
+            'peak drift': peak.max(axis = 1),
+            'residual drift': np.abs(residual).max(axis = 1),
+            'collapse': collapse,
+            'demolition': ~collapse & (np.abs(residual).max(axis = 1) >= float(DynamicParameter['DemolitionLimit']))}
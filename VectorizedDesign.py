@@ -0,0 +1,673 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to design the same wall line for many cases (load, height, material and site
+variants) in one NumPy pass.
+
+The inputs of all the cases are stacked into (case x floor) arrays: story force per wall, story
+height, chord area, modulus of elasticity, take-up deflection, plus one value per case for the
+moisture content, Cd, Ie, drift limits and D/C ratios. Every floor of every case is a design unit.
+The shear wall selection (binary search on the catalog), the tie-down selection, the deflection and
+drift (see Deflection.py) and the walk up the catalog are computed for all the units at once, one
+trial wall length at a time; only the units that are not designed yet take part in the next length.
+The result is the same as FinalShearWallDesign with the same flags, including the two design passes
+and the warm start of the final pass.
+
+The length search can step through the lengths 0.5 ft at a time as the per-floor design does
+('step'), or bisect the 0.5 ft grid up to the length cap ('bisection'), which evaluates fewer lengths
+but gives the same design only where a longer wall never fails after a shorter one succeeds.
+
+With dtype = np.float32 the stacked arrays and the work arrays take half the memory; results can then
+differ from the float64 design where a drift or capacity is within round-off of its limit.
+
+Arrays are top floor first, same as the designs. Running this file benchmarks the engine on
+synthetic cases.
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from Deflection import assembly_deflection, wall_deflection, story_drift
+from DiaphragmDesign import DiaphragmDesign, building_inputs, stack_buildings
+from ShearForces import ComputeSeismicForce
+from ShearWallDriftCheck_perFloor import MAX_WALL_LENGTH, MAX_ITERATIONS
+from global_variables import shearwall_catalog, tiedown_catalog
+
+
+#stacked inputs with one value per floor, shape (cases, floors), top floor first
+FLOOR_INPUTS = ('storyForce', 'storyHeight', 'chordArea', 'elasticModulus', 'takeup')
+#stacked inputs with one value per case, shape (cases,). D/C ratios are NaN where none is given
+CASE_INPUTS = ('initialMoisture', 'finalMoisture', 'Cd', 'Ie', 'allowableDrift', 'userDefinedDrift',
+               'DCRatio', 'tiedownDCRatio', 'wallsPerLine')
+
+#outcome of the walk up the catalog at one wall length
+SUCCESS, GROW, STALL = 0, 1, 2
+
+#design of a unit kept from the walk that met the drift limit
+STORED = ('assembly', 'rod', 'drift', 'unitShear', 'tension', 'rodElongation')
+
+
+def stack_wall_lines(units, loadRatio = None, diaphragms = False, ELFDemandTag = False):
+    """
+    This function is used to read the wall lines of many cases into stacked (case x floor) arrays
+    :param units: list of (caseID, BaseDirectory, direction, wall line name). All the wall lines must
+                  have the same number of floors
+    :param loadRatio: tribuitary load ratio per floor overriding tribuitaryLoadRatio.txt, None to read the files
+    :param diaphragms: True to also keep the diaphragm design inputs of every building (BaseDirectory),
+                       taken from the first of its wall lines that is read (see DiaphragmDesign.py)
+    :param ELFDemandTag: if True, the story forces are the ELF story forces of the site instead of
+                         Fx_ToTestTheCode.txt
+    :return: dictionary of the arrays listed in FLOOR_INPUTS and CASE_INPUTS, 'detailing' (preferred
+             panel thickness, nail size and nail spacing of every case) and 'units'. With diaphragms,
+             also 'buildings' (stacked diaphragm design inputs, one row per building) and 'building'
+             (row of the building of every case)
+    """
+    units = list(units)
+    models = [ComputeSeismicForce(caseID, BaseDirectory, 1.0, direction, wall_line_name, False, loadRatio = loadRatio,
+                                  ELFDemandTag = ELFDemandTag)
+              for caseID, BaseDirectory, direction, wall_line_name in units]
+    return stack_models(models, units, diaphragms)
+
+
+def stack_models(models, units, diaphragms = False):
+    """
+    This function is used to stack the inputs of wall lines that have already been read
+    :param models: ComputeSeismicForce of every wall line, read with a unit wall length and no redesign
+    :param units: list of (caseID, BaseDirectory, direction, wall line name) of the models
+    :param diaphragms: see stack_wall_lines()
+    :return: stacked inputs, see stack_wall_lines()
+    """
+    units = list(units)
+    floors = {name: [] for name in FLOOR_INPUTS}
+    cases = {name: [] for name in CASE_INPUTS}
+    detailing = []
+    #BaseDirectory -> row of the building in 'buildings'
+    buildingRows = {}
+    buildings = []
+    building = []
+    for ModelClass in models:
+        BaseDirectory = ModelClass.BaseDirectory
+        if diaphragms:
+            if BaseDirectory not in buildingRows:
+                buildingRows[BaseDirectory] = len(buildings)
+                buildings.append(building_inputs(ModelClass))
+            building.append(buildingRows[BaseDirectory])
+        numFloors = int(ModelClass.numberOfStories)
+        storyForce = np.atleast_1d(ModelClass.story_force_per_wall)[:numFloors]
+        floors['storyForce'].append(storyForce)
+        floors['storyHeight'].append(np.atleast_1d(ModelClass.story_height)[:numFloors])
+        floors['chordArea'].append(np.atleast_1d(ModelClass.chordArea)[:numFloors])
+        floors['elasticModulus'].append(np.full(numFloors, ModelClass.elastic_modulus))
+        floors['takeup'].append(np.atleast_1d(ModelClass.takeup_deflection)[:numFloors])
+        cases['initialMoisture'].append(ModelClass.initial_moisture_content)
+        cases['finalMoisture'].append(ModelClass.final_moisture_content)
+        cases['Cd'].append(ModelClass.SeismicDesignParameter['Cd'])
+        cases['Ie'].append(ModelClass.SeismicDesignParameter['Ie'])
+        cases['allowableDrift'].append(ModelClass.allowableDrift)
+        cases['userDefinedDrift'].append(ModelClass.userDefinedDrift)
+        cases['DCRatio'].append(ModelClass.userDefinedDCRatio)
+        cases['tiedownDCRatio'].append(ModelClass.userDefinedDCRatio_TieDown
+                                       if ModelClass.userDefinedDCRatioFlag_TieDown else np.nan)
+        cases['wallsPerLine'].append(ModelClass.wallsPerLine)
+        detailing.append((ModelClass.panelThickness, ModelClass.nailSize, ModelClass.nailSpacing))
+
+    numFloors = {len(storyForce) for storyForce in floors['storyForce']}
+    if len(numFloors) > 1:
+        raise ValueError('The wall lines have %s floors; stack wall lines with the same number of floors together'
+                         % sorted(numFloors))
+    inputs = {name: np.array(values, dtype = float) for name, values in floors.items()}
+    inputs.update({name: np.array(values, dtype = float) for name, values in cases.items()})
+    inputs['detailing'] = detailing
+    inputs['units'] = units
+    if diaphragms:
+        inputs['buildings'] = stack_buildings(buildings)
+        inputs['building'] = np.array(building, dtype = int)
+    return inputs
+
+
+class StackedShearWallDesign():
+
+    def __init__(self, inputs, wallLength, reDesignTag, userDefinedDetailingTag, userDefinedDriftTag,
+                 userDefinedDCTag, pruneCatalog = False, warmStart = False, maxWallLength = MAX_WALL_LENGTH,
+                 maxIterations = MAX_ITERATIONS, maxRodChanges = None, lengthSearch = 'step',
+                 dtype = np.float64, chunkSize = 4096, E = 29000, diaphragmDCRatio = None):
+        """
+        Design parameters are the same as FinalShearWallDesign (with counter 0 and reuseFloors) and are
+        used for every case
+        :param inputs: stacked inputs, see stack_wall_lines()
+        :param wallLength: starting wall length, scalar or one per case. Units: ft
+        :param lengthSearch: 'step' to try the lengths 0.5 ft at a time, 'bisection' to bisect them
+        :param dtype: np.float64, or np.float32 for half the memory
+        :param chunkSize: number of units whose catalog walk is evaluated at once (bounds the memory use)
+        :param E: Youngs Modulus of the tie-down rods. Units: ksi
+        :param diaphragmDCRatio: target D/C ratio of the diaphragms, None for no adjustment. The diaphragms
+                                 are designed when the inputs have 'buildings' (see stack_wall_lines())
+        """
+        if lengthSearch not in ('step', 'bisection'):
+            raise ValueError('lengthSearch must be "step" or "bisection", not %s' % lengthSearch)
+        self.inputs = inputs
+        self.numCases, self.numFloors = np.shape(inputs['storyForce'])
+        self.wallLength = np.broadcast_to(np.asarray(wallLength, dtype = dtype), (self.numCases,))
+        #the two flags are passed in the same positions as FinalShearWallDesign passes them to the drift
+        #check: the first filters the catalog by the preferred detailing, the second starts the demand
+        #at the redesign length (wall length + 0.5 ft)
+        self.userDefinedDetailingTag = reDesignTag
+        self.reDesignTag = userDefinedDetailingTag
+        self.userDefinedDriftTag = userDefinedDriftTag
+        self.userDefinedDCTag = userDefinedDCTag
+        self.pruneCatalog = pruneCatalog
+        self.warmStart = warmStart
+        self.maxWallLength = maxWallLength
+        self.maxIterations = maxIterations
+        self.lengthSearch = lengthSearch
+        self.dtype = np.dtype(dtype)
+        self.chunkSize = chunkSize
+        self.E = E
+        self.diaphragmDCRatio = diaphragmDCRatio
+
+        self.prepare()
+        self.DesignIteration()
+        self.FinalDesign()
+        self.design_continuous_rods(maxRodChanges)
+        self.design_diaphragms()
+
+    def prepare(self):
+        """
+        This method is used to cast the stacked inputs and the catalogs to the working dtype and to
+        compute the length independent parts of the design
+        """
+        dtype = self.dtype
+        inputs = {name: np.asarray(self.inputs[name], dtype = dtype) for name in FLOOR_INPUTS + CASE_INPUTS}
+        self.storyForce = inputs['storyForce']
+        self.storyHeight = inputs['storyHeight']
+        self.chordArea = inputs['chordArea']
+        self.takeup = inputs['takeup']
+        self.initialMoisture = inputs['initialMoisture']
+        self.finalMoisture = inputs['finalMoisture']
+        self.Cd = inputs['Cd']
+        self.Ie = inputs['Ie']
+        self.wallsPerLine = inputs['wallsPerLine']
+        #story forces of every floor and the floors above, summed from the top, and moment arm of the tension
+        self.cumulativeForce = np.cumsum(self.storyForce, axis = 1)
+        self.momentArm = self.storyHeight - 1
+        self.EA = self.chordArea * inputs['elasticModulus']
+        drift = inputs['userDefinedDrift'] if self.userDefinedDriftTag else inputs['allowableDrift']
+        self.driftLimit = self.storyHeight * 12 * drift[:, None]
+        self.levels = self.numFloors - np.arange(self.numFloors)
+
+        #catalog the assemblies are walked through, ascending LRFD
+        if self.pruneCatalog:
+            self.view = shearwall_catalog.pareto_index()
+        elif shearwall_catalog.isCapacitySorted:
+            self.view = shearwall_catalog.allIndex
+        else:
+            raise ValueError('The stacked design needs a shear wall catalog sorted by LRFD capacity (or pruneCatalog)')
+        self.lrfd = shearwall_catalog.lrfd.astype(dtype)
+        self.Ga = shearwall_catalog.Ga.astype(dtype)
+        self.viewLrfd = self.lrfd[self.view]
+        self.viewGa = self.Ga[self.view]
+        self.lastLrfd = self.lrfd[-1]
+        self.maxLrfd = self.lrfd.max()
+        self.stiffest = int(np.argmax(shearwall_catalog.Ga))
+
+        #with a detailing or D/C ratio filter, the candidates of every case come from its filtered view
+        self.filtered = bool(self.userDefinedDetailingTag or self.userDefinedDCTag)
+        self.filterGroup = np.zeros(self.numCases, dtype = int)
+        self.filterViews = []
+        if self.filtered:
+            keys = {}
+            for case in range(self.numCases):
+                detailing = tuple(self.inputs['detailing'][case]) if self.userDefinedDetailingTag else None
+                DCRatio = float(self.inputs['DCRatio'][case]) if self.userDefinedDCTag else None
+                key = (detailing, DCRatio)
+                if key not in keys:
+                    keys[key] = len(keys)
+                    if detailing is None and not self.pruneCatalog:
+                        view = self.view
+                    else:
+                        view = shearwall_catalog.detailing_index(*(('', '', '') if detailing is None else detailing),
+                                                                 pruned = self.pruneCatalog)
+                    capacity = self.lrfd[view] if DCRatio is None else self.lrfd[view] * dtype.type(DCRatio)
+                    self.filterViews.append((view, capacity))
+                self.filterGroup[case] = keys[key]
+
+        #tie-down rods: running maximum of the (D/C adjusted) capacities of every distinct D/C ratio
+        ratios = self.inputs['tiedownDCRatio']
+        self.tiedownDCRatios = [None] + sorted({float(ratio) for ratio in ratios if not np.isnan(ratio)})
+        self.tiedownGroup = np.array([0 if np.isnan(ratio) else self.tiedownDCRatios.index(float(ratio))
+                                      for ratio in ratios], dtype = int)
+        self.tiedownCapacity = [tiedown_catalog.search_capacity(ratio).astype(dtype) for ratio in self.tiedownDCRatios]
+        self.rodArea = tiedown_catalog.area.astype(dtype)
+
+    def demand(self, case, floor, demandLength):
+        """
+        This method is used to get the unit shear and tension demand of design units, with the same
+        operations as ShearWallFloorDesign.update_demand()
+        :param case, floor: case and floor of every unit
+        :param demandLength: wall length the demand is computed for. Units: ft
+        :return: unit shear (Units: klf) and tension demand (Units: kips) of every unit
+        """
+        unitShear = self.cumulativeForce[case] / demandLength[:, None]
+        tension = np.cumsum(unitShear * self.momentArm[case], axis = 1)
+        return unitShear[np.arange(len(case)), floor], tension[np.arange(len(case)), floor]
+
+    def select_rod(self, case, tension):
+        """
+        This method is used to select the lightest tie-down rod of design units
+        :return: row of the rod in the tie-down database; len(tiedown_catalog) where no rod meets the demand
+        """
+        rod = np.empty(len(case), dtype = np.intp)
+        for group, capacity in enumerate(self.tiedownCapacity):
+            units = self.tiedownGroup[case] == group
+            rod[units] = np.searchsorted(capacity, tension[units], side = 'left')
+        return rod
+
+    def deflection_terms(self, case, floor, tension):
+        #tie-down and assembly deflection of design units, which do not depend on the shear wall assembly
+        rod = self.select_rod(case, tension)
+        #rows past the end of the database only occur for units that fail the feasibility check
+        area = self.rodArea[np.minimum(rod, len(self.rodArea) - 1)]
+        rodElongation = tension * self.storyHeight[case, floor]*12/(self.E * area)
+        deltaA = assembly_deflection(tension, self.chordArea[case, floor], self.initialMoisture[case],
+                                     self.finalMoisture[case], self.takeup[case, floor], rodElongation)
+        return rod, rodElongation, deltaA.astype(self.dtype, copy = False)
+
+    def drift(self, case, floor, length, Ga, deltaA):
+        """
+        This method is used to get the story drift of design units for one or more assemblies each
+        :param Ga: apparent shear stiffness, shape (units,) or (units, assemblies). Units: kips/in
+        :return: story drift, shape of Ga. Units: in
+        """
+        expand = (slice(None),) + (None,)*(np.ndim(Ga) - 1)
+        deflection = wall_deflection(self.storyForce[case, floor][expand], length[expand],
+                                     self.storyHeight[case, floor][expand], self.EA[case, floor][expand], Ga,
+                                     deltaA[expand])
+        return story_drift(deflection, self.Cd[case][expand], self.Ie[case][expand])
+
+    def start_position(self, view, viewLrfd, first, startAssembly):
+        """
+        This method is used to apply a warm start to the candidates of design units, same as
+        ShearWallCatalog.start_at()
+        :param view: catalog rows the candidates come from
+        :param first: position of the first candidate of every unit in view
+        :param startAssembly: catalog row to start from for every unit, -1 for none
+        :return: position of the first candidate after the warm start
+        """
+        position = np.full(shearwall_catalog.numRows, -1)
+        position[view] = np.arange(len(view))
+        start = np.where(startAssembly >= 0, position[np.maximum(startAssembly, 0)], -1)
+        byCapacity = np.searchsorted(viewLrfd, self.lrfd[np.maximum(startAssembly, 0)], side = 'left')
+        start = np.where(start >= 0, start, byCapacity)
+        return np.where(startAssembly >= 0, np.maximum(first, start), first)
+
+    def walk(self, case, floor, length, demandLength, startAssembly):
+        """
+        This method is used to walk up the catalog at one wall length for design units, the way the
+        drift check does: from the first candidate, the next assembly is tried while the drift limit
+        is not met and the assembly is below 70% D/C ratio; then the wall has to grow. With a detailing
+        or D/C ratio filter only the first candidate is tried and a weak assembly stalls the design
+        :return: dictionary with the 'outcome' (SUCCESS, GROW or STALL), the number of 'evaluations',
+                 the 'assembly' (catalog row), 'drift', 'unitShear', 'tension', 'rod' and 'rodElongation'
+        """
+        unitShear, tension = self.demand(case, floor, demandLength)
+        rod, rodElongation, deltaA = self.deflection_terms(case, floor, tension)
+        numUnits = len(case)
+        first = np.searchsorted(self.viewLrfd, unitShear, side = 'left')
+        start = self.start_position(self.view, self.viewLrfd, first, startAssembly)
+        result = {'unitShear': unitShear, 'tension': tension, 'rod': rod, 'rodElongation': rodElongation}
+
+        if self.filtered:
+            assembly = self.view[np.minimum(start, len(self.view) - 1)]
+            for group, (view, capacity) in enumerate(self.filterViews):
+                units = np.flatnonzero(self.filterGroup[case] == group)
+                firstFiltered = np.searchsorted(capacity, unitShear[units], side = 'left')
+                startFiltered = self.start_position(view, self.lrfd[view], firstFiltered, startAssembly[units])
+                #without a filtered candidate the first candidate of the catalog is used
+                found = startFiltered < len(view)
+                assembly[units[found]] = view[startFiltered[found]]
+            drift = self.drift(case, floor, length, self.Ga[assembly], deltaA)
+            ok = drift <= self.driftLimit[case, floor]
+            strong = (self.lrfd[assembly] >= unitShear/0.7) | (self.lrfd[assembly] == self.lastLrfd)
+            result.update(outcome = np.where(ok, SUCCESS, np.where(strong, GROW, STALL)),
+                          evaluations = np.ones(numUnits, dtype = int), assembly = assembly, drift = drift)
+            return result
+
+        #every assembly from the start on is evaluated at once, the first that stops the walk is taken
+        position = np.arange(len(self.view))
+        drift = self.drift(case, floor, length, np.broadcast_to(self.viewGa, (numUnits, len(self.view))), deltaA)
+        ok = drift <= self.driftLimit[case, floor][:, None]
+        strong = (self.viewLrfd >= (unitShear/0.7)[:, None]) | (self.viewLrfd == self.lastLrfd)
+        stop = (position >= start[:, None]) & (ok | strong)
+        stopAt = np.argmax(stop, axis = 1)
+        #past the end of the catalog the wall has to grow
+        stopAt = np.where(stop[np.arange(numUnits), stopAt], stopAt, len(self.view) - 1)
+        success = ok[np.arange(numUnits), stopAt] & (stopAt >= start)
+        result.update(outcome = np.where(success, SUCCESS, GROW), evaluations = np.maximum(stopAt - start + 1, 1),
+                      assembly = self.view[stopAt], drift = drift[np.arange(numUnits), stopAt])
+        return result
+
+    def walk_chunked(self, case, floor, length, demandLength, startAssembly):
+        #walk() on chunks of units so that the (units x assemblies) arrays stay within chunkSize units
+        if len(case) <= self.chunkSize:
+            return self.walk(case, floor, length, demandLength, startAssembly)
+        parts = [self.walk(case[i:i + self.chunkSize], floor[i:i + self.chunkSize], length[i:i + self.chunkSize],
+                           demandLength[i:i + self.chunkSize], startAssembly[i:i + self.chunkSize])
+                 for i in range(0, len(case), self.chunkSize)]
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def feasibility(self, case, floor, length, demandLength):
+        """
+        This method is used to find the design units that cannot be designed before the length search,
+        with the same checks as ShearWallFloorDesign.feasibility()
+        :return: reason of every unit: '' if feasible, 'strength', 'tie-down' or 'drift'
+        """
+        reason = np.full(len(case), '', dtype = object)
+        unitShear, tension = self.demand(case, floor, demandLength)
+        reason[unitShear > self.maxLrfd] = 'strength'
+        maxCapacity = np.array([capacity[-1] for capacity in self.tiedownCapacity])[self.tiedownGroup[case]]
+        reason[(reason == '') & (tension > maxCapacity)] = 'tie-down'
+
+        #drift of the stiffest assembly at every length the search can reach
+        units = np.flatnonzero(reason == '')
+        met = np.zeros(len(units), dtype = bool)
+        trialLength = length[units].copy()
+        trialDemand = demandLength[units].copy()
+        reachable = np.ones(len(units), dtype = bool)
+        while reachable.any():
+            i = units[reachable]
+            unitShear, tension = self.demand(case[i], floor[i], trialDemand[reachable])
+            rod, rodElongation, deltaA = self.deflection_terms(case[i], floor[i], tension)
+            drift = self.drift(case[i], floor[i], trialLength[reachable], self.Ga[self.stiffest], deltaA)
+            met[reachable] |= drift <= self.driftLimit[case[i], floor[i]]
+            trialLength += 0.5
+            trialDemand = trialLength + 0.5
+            reachable &= ~met & (trialLength <= self.maxWallLength)
+        reason[units[~met]] = 'drift'
+        return reason
+
+    def design_pass(self, case, floor, wallLength, startAssembly):
+        """
+        This method is used to design units from a starting wall length until the drift limit is met,
+        as FloorDriftCheck does for one floor
+        :param case, floor: case and floor of every unit
+        :param wallLength: starting wall length of every unit. Units: ft
+        :param startAssembly: catalog row the search starts from for every unit, -1 for none
+        :return: dictionary of the design of every unit, with its final 'wallLength', the number of
+                 'steps' (drift evaluations) and the 'reason' it could not be designed ('' if designed)
+        """
+        numUnits = len(case)
+        length = wallLength.astype(self.dtype)
+        demandLength = length + 0.5 if self.reDesignTag else length.copy()
+        design = {'wallLength': length.copy(), 'steps': np.zeros(numUnits, dtype = int),
+                  'reason': self.feasibility(case, floor, length, demandLength)}
+        for name, dtype in (('assembly', np.intp), ('rod', np.intp)):
+            design[name] = np.full(numUnits, -1, dtype = dtype)
+        for name in ('drift', 'unitShear', 'tension', 'rodElongation'):
+            design[name] = np.full(numUnits, np.nan, dtype = self.dtype)
+
+        active = np.flatnonzero(design['reason'] == '')
+        if self.lengthSearch == 'bisection':
+            self.bisection(case, floor, length, demandLength, startAssembly, active, design)
+            return design
+
+        while len(active):
+            result = self.walk_chunked(case[active], floor[active], length[active], demandLength[active],
+                                       startAssembly[active])
+            steps = design['steps'][active]
+            outcome = result['outcome']
+            #drift evaluations that did not meet the limit at this length
+            failed = result['evaluations'] - (outcome == SUCCESS)
+            grown = length[active] + 0.5
+            overLength = length[active] > self.maxWallLength
+            reason = np.full(len(active), '', dtype = object)
+            #the caps are checked after every failed evaluation in the same order as check_caps()
+            reason[(failed > 0) & overLength] = 'length cap'
+            earlier = (failed > 1) & (steps + failed - 1 >= self.maxIterations)
+            reason[(reason == '') & (outcome == SUCCESS) & (failed > 0) & (steps + failed >= self.maxIterations)] = 'iteration cap'
+            reason[(reason == '') & (outcome != SUCCESS) & earlier] = 'iteration cap'
+            reason[(reason == '') & (outcome == GROW) & (grown > self.maxWallLength)] = 'length cap'
+            reason[(reason == '') & (outcome != SUCCESS) & (steps + failed >= self.maxIterations)] = 'iteration cap'
+            reason[(reason == '') & (outcome == STALL)] = 'stalled'
+            design['steps'][active] = steps + result['evaluations']
+            design['reason'][active] = reason
+
+            done = (outcome == SUCCESS) & (reason == '')
+            self.store(design, active[done], result, done, length[active[done]])
+            grow = (outcome == GROW) & (reason == '')
+            length[active[grow]] = grown[grow]
+            demandLength[active[grow]] = grown[grow] + 0.5
+            active = active[grow]
+        return design
+
+    def bisection(self, case, floor, length, demandLength, startAssembly, active, design):
+        """
+        This method is used to find the shortest wall length on the 0.5 ft grid of the length search
+        at which the walk up the catalog meets the drift limit, by bisection. The starting length is
+        tried first; the grid is then bisected up to the length cap
+        """
+        result = self.walk_chunked(case[active], floor[active], length[active], demandLength[active],
+                                   startAssembly[active])
+        design['steps'][active] += result['evaluations']
+        done = result['outcome'] == SUCCESS
+        self.store(design, active[done], result, done, length[active[done]])
+        design['reason'][active[result['outcome'] == STALL]] = 'stalled'
+        active = active[result['outcome'] == GROW]
+
+        #grid lengths start + 0.5 * j, j = 1 ... last; the walk has to succeed at the last one first
+        last = np.floor((self.maxWallLength - length[active])/0.5).astype(int)
+        design['reason'][active[last < 1]] = 'length cap'
+        active, high = active[last >= 1], last[last >= 1]
+        low = np.ones(len(active), dtype = int)
+        best = {name: design[name][active].copy() for name in STORED}
+        bestLength = length[active].copy()
+        probe = high.copy()
+        searching = np.ones(len(active), dtype = bool)
+        top = True
+        while searching.any():
+            i = np.flatnonzero(searching)
+            trialLength = length[active[i]] + self.dtype.type(0.5)*probe[i]
+            result = self.walk_chunked(case[active[i]], floor[active[i]], trialLength, trialLength + 0.5,
+                                       startAssembly[active[i]])
+            design['steps'][active[i]] += result['evaluations']
+            success = result['outcome'] == SUCCESS
+            for name in STORED:
+                best[name][i[success]] = result[name][success]
+            bestLength[i[success]] = trialLength[success]
+            if top:
+                design['reason'][active[i[~success]]] = 'length cap'
+                searching[i[~success]] = False
+                top = False
+            else:
+                high[i[success]] = probe[i[success]]
+                low[i[~success]] = probe[i[~success]] + 1
+            searching &= low < high
+            probe = (low + high)//2
+        found = design['reason'][active] == ''
+        self.store(design, active[found], best, found, bestLength[found])
+
+    def store(self, design, units, result, select, length):
+        #copy the design of the units that met the drift limit
+        for name in STORED:
+            design[name][units] = result[name][select]
+        design['wallLength'][units] = length
+
+    def DesignIteration(self):
+        """
+        This method is used to design every floor of every case at its own wall length, same as
+        FinalShearWallDesign.DesignIteration()
+        :return: wall length of every floor, shape (cases, floors). Units: ft
+        """
+        case, floor = np.divmod(np.arange(self.numCases*self.numFloors), self.numFloors)
+        self.iterationDesign = self.design_pass(case, floor, self.wallLength[case], np.full(len(case), -1))
+        self.iterationWallLength = self.iterationDesign['wallLength'].reshape(self.numCases, self.numFloors)
+        #reason and level of the first floor of every case that could not be designed
+        self.reason = np.full(self.numCases, None, dtype = object)
+        self.failedLevel = np.zeros(self.numCases, dtype = int)
+        self.record_failures(case, floor, self.iterationDesign['reason'])
+        self.designSteps = self.iterationDesign['steps'].reshape(self.numCases, self.numFloors).sum(axis = 1)
+        return self.iterationWallLength
+
+    def record_failures(self, case, floor, reason):
+        #units are ordered by case then floor, so the first failure of a case is its top-most failed floor
+        for unit in np.flatnonzero(reason != ''):
+            if self.reason[case[unit]] is None:
+                self.reason[case[unit]] = reason[unit]
+                self.failedLevel[case[unit]] = self.levels[floor[unit]]
+
+    def FinalDesign(self):
+        """
+        This method is used to design every floor at the longest wall length of its case, same as
+        FinalShearWallDesign.FinalDesign(): with warmStart, the floors of a case whose floors all kept the
+        starting length keep their design; all the other floors are designed again from the lightest assembly
+        :return: dictionary of the final design arrays, shape (cases, floors)
+        """
+        final = {name: values.reshape(self.numCases, self.numFloors).copy()
+                 for name, values in self.iterationDesign.items() if name != 'reason'}
+        self.feasible = np.array([reason is None for reason in self.reason])
+        self.finalWallLength = np.where(self.feasible, self.iterationWallLength.max(axis = 1), np.nan)
+
+        #a floor that ends at the final length after a longer wall was tried was designed with the
+        #redesign demand (+0.5 ft), so only cases where no floor changed its length are kept
+        kept = self.warmStart & (self.finalWallLength == self.wallLength)
+        redo = np.repeat((self.feasible & ~kept)[:, None], self.numFloors, axis = 1)
+        case, floor = np.nonzero(redo)
+        if len(case):
+            design = self.design_pass(case, floor, self.finalWallLength[case], np.full(len(case), -1))
+            for name in final:
+                final[name][case, floor] = design[name]
+            np.add.at(self.designSteps, case, design['steps'])
+            self.record_failures(case, floor, design['reason'])
+            self.feasible = np.array([reason is None for reason in self.reason])
+        #cases that could not be designed have no design
+        for name, values in final.items():
+            if name not in ('steps',):
+                values[~self.feasible] = -1 if values.dtype.kind == 'i' else np.nan
+        self.design = final
+        return self.design
+
+    def design_continuous_rods(self, maxRodChanges = None):
+        """
+        This method is used to design the tie-down rods of every case as one continuous run, see
+        TieDownDesign.TieDownCatalog.design()
+        :param maxRodChanges: largest number of rod changes over the height, None for the lightest rod of every floor
+        :return: dictionary of the continuous rod design arrays, shape (cases, floors); no rods for the
+                 cases that could not be designed
+        """
+        self.rodDesign = {}
+        for group, ratio in enumerate(self.tiedownDCRatios):
+            cases = np.flatnonzero(self.feasible & (self.tiedownGroup == group))
+            if len(cases) == 0:
+                continue
+            design = tiedown_catalog.design(self.design['tension'][cases].astype(float), self.storyHeight[cases],
+                                            ratio, initialMoisture = self.initialMoisture[cases, None],
+                                            finalMoisture = self.finalMoisture[cases, None],
+                                            maxRodChanges = maxRodChanges, levels = self.levels)
+            for name, values in design.items():
+                if name not in self.rodDesign:
+                    empty = -1 if values.dtype.kind == 'i' else np.nan
+                    self.rodDesign[name] = np.full((self.numCases,) + values.shape[1:], empty, dtype = values.dtype)
+                self.rodDesign[name][cases] = values
+        return self.rodDesign
+
+    def design_diaphragms(self):
+        """
+        This method is used to design the diaphragms of every building of the inputs for both directions,
+        see DiaphragmDesign.py
+        :return: DiaphragmDesign of the buildings, None when the inputs have no 'buildings'
+        """
+        self.diaphragms = None
+        if 'buildings' in self.inputs:
+            self.diaphragms = DiaphragmDesign(self.inputs['buildings'], self.diaphragmDCRatio)
+        return self.diaphragms
+
+    def sw_design(self, case):
+        """
+        This method is used to tabulate the shear wall design of one case, with the same columns as
+        FinalShearWallDesign.sw_final_design
+        :param case: position of the case in the stacked inputs
+        :return: dataframe with one row per floor (first row is the top floor)
+        """
+        if not self.feasible[case]:
+            raise ValueError('Case %d could not be designed (%s @ level %d)' % (case, self.reason[case], self.failedLevel[case]))
+        i = self.design['assembly'][case]
+        return pd.DataFrame({'Shear Wall Assembly': shearwall_catalog.value('Assembly', i),
+                             'Ga(k/in)': shearwall_catalog.Ga[i],
+                             'level': self.levels,
+                             'LRFD(klf)': shearwall_catalog.lrfd[i],
+                             'Drift(in)': self.design['drift'][case].astype(float),
+                             'D/C Ratio': self.design['unitShear'][case] / shearwall_catalog.lrfd[i],
+                             'OpenSees Tag': shearwall_catalog.value('OpenSeesTag', i)})
+
+    def tiedown_design(self, case):
+        """
+        This method is used to tabulate the tie-down design of one case, with the same columns as
+        FinalShearWallDesign.tiedown_final_design
+        :param case: position of the case in the stacked inputs
+        :return: dataframe with one row per floor (first row is the top floor)
+        """
+        if not self.feasible[case]:
+            raise ValueError('Case %d could not be designed (%s @ level %d)' % (case, self.reason[case], self.failedLevel[case]))
+        j = self.design['rod'][case]
+        return pd.DataFrame({'Tie-down Assembly': tiedown_catalog.assembly[j],
+                             'Rod Elongation(in)': self.design['rodElongation'][case].astype(float),
+                             'Capacity(kips)': tiedown_catalog.capacity[j],
+                             'level': self.levels,
+                             'D/C Ratio': self.design['tension'][case] / tiedown_catalog.capacity[j]})
+
+    @property
+    def nbytes(self):
+        """
+        :return: memory held by the stacked inputs and the design arrays in bytes
+        """
+        arrays = [self.storyForce, self.storyHeight, self.chordArea, self.takeup, self.cumulativeForce,
+                  self.momentArm, self.EA, self.driftLimit] + list(self.design.values())
+        return sum(values.nbytes for values in arrays)
+
+
+def random_inputs(numCases, numFloors = 3, seed = 0):
+    """
+    This function is used to generate stacked inputs of synthetic wall line variants, e.g. for benchmarks
+    :return: dictionary of stacked inputs, see stack_wall_lines()
+    """
+    random = np.random.default_rng(seed)
+    shape = (numCases, numFloors)
+    #story forces per wall decrease from the top floor down
+    storyForce = random.uniform(1.0, 4.0, (numCases, 1)) * np.linspace(1.0, 0.6, numFloors)
+    inputs = {'storyForce': storyForce,
+              'storyHeight': np.broadcast_to(random.choice([9.0, 10.0, 12.0], (numCases, 1)), shape).copy(),
+              'chordArea': np.full(shape, 38.5),
+              'elasticModulus': np.full(shape, 1.7e6),
+              'takeup': np.full(shape, 0.04),
+              'initialMoisture': np.full(numCases, 19.0),
+              'finalMoisture': np.full(numCases, 12.0),
+              'Cd': np.full(numCases, 4.0),
+              'Ie': np.ones(numCases),
+              'allowableDrift': random.choice([0.008, 0.01, 0.02], numCases),
+              'userDefinedDrift': np.full(numCases, 0.015),
+              'DCRatio': np.full(numCases, np.nan),
+              'tiedownDCRatio': np.full(numCases, np.nan),
+              'wallsPerLine': np.ones(numCases)}
+    inputs['detailing'] = [('', '', '')]*numCases
+    return inputs
+
+
+if __name__ == '__main__':
+    #benchmark: design of 1k and 10k synthetic 3 story wall lines, float64 and float32
+    for numCases in (1000, 10000):
+        inputs = random_inputs(numCases)
+        for dtype in (np.float64, np.float32):
+            start = time.perf_counter()
+            design = StackedShearWallDesign(inputs, 4.0, False, False, False, False, dtype = dtype)
+            elapsed = time.perf_counter() - start
+            print('%6d cases %-8s %7.3f s (%8.1f cases/s), %5d infeasible, %7.1f kB arrays, mean wall length %.2f ft'
+                  % (numCases, np.dtype(dtype).name, elapsed, numCases/elapsed, np.count_nonzero(~design.feasible),
+                     design.nbytes/1e3, np.nanmean(design.finalWallLength)))
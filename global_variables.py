@@ -10,14 +10,28 @@ import numpy as np
 import os 
 
 from MaterialProperties import WoodMaterial
+from ShearWallCatalog import ShearWallCatalog
+from TieDownDesign import TieDownCatalog
+from SharedMemoryPool import attached_catalogs
 
 
 
-shearwall_database = pd.read_csv(r'shearwall_database.csv')
+#catalogs published by the parent process of a SharedDesignPool worker are used in place, without
+#parsing the databases again (see SharedMemoryPool.py)
+_shared_catalogs = attached_catalogs()
 
-diaphragm_database = pd.read_csv(r'diaphragm_database.csv')
+#the design changes the working directory, so the databases read later are found from here
+_database_directory = os.getcwd()
 
-tiedown_database = pd.read_csv(r'tie_down_database.csv')
+if _shared_catalogs is not None:
+    shearwall_catalog, tiedown_catalog = _shared_catalogs
+else:
+    #category-encoded shear wall catalog used by the design. The dataframe view (shearwall_database)
+    #is only decoded from it when someone asks for it, see __getattr__ below
+    shearwall_catalog = ShearWallCatalog.from_csv(r'shearwall_database.csv')
+
+    #array view of the tie-down database used by the design (see TieDownDesign.py)
+    tiedown_catalog = TieDownCatalog(pd.read_csv(r'tie_down_database.csv'))
 
 # baseDirectory = BuildingModel.BaseDirectory 
 
@@ -32,4 +46,25 @@ tiedown_database = pd.read_csv(r'tie_down_database.csv')
 # elastic_modulus = np.genfromtxt('wood_modulusOfElasticity.txt')
 
 # wood = WoodMaterial(initial_moisture_content, final_moisture_content, shear_stress = 270,
-#                     compression_stress = 15000 , elastic_modulus = 1.7e6, elastic_modulus_min = 6.2e5)
\ No newline at end of file
+#                     compression_stress = 15000 , elastic_modulus = 1.7e6, elastic_modulus_min = 6.2e5)
+
+
+
+def __getattr__(name):
+    #decode the legacy shearwall_database dataframe and read the other database dataframes on first access only
+    if name == 'shearwall_database':
+        globals()['shearwall_database'] = shearwall_catalog.to_dataframe()
+        return globals()['shearwall_database']
+    if name == 'diaphragm_database':
+        globals()['diaphragm_database'] = pd.read_csv(os.path.join(_database_directory, r'diaphragm_database.csv'))
+        return globals()['diaphragm_database']
+    if name == 'diaphragm_catalog':
+        #array view of the diaphragm database used by the diaphragm design (see DiaphragmDesign.py)
+        from DiaphragmDesign import DiaphragmCatalog
+        database = globals()['diaphragm_database'] if 'diaphragm_database' in globals() else __getattr__('diaphragm_database')
+        globals()['diaphragm_catalog'] = DiaphragmCatalog(database)
+        return globals()['diaphragm_catalog']
+    if name == 'tiedown_database':
+        globals()['tiedown_database'] = pd.read_csv(os.path.join(_database_directory, r'tie_down_database.csv'))
+        return globals()['tiedown_database']
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to set up the tests: the modules of the package are imported from the repository
+folder, and the databases are read from it (global_variables reads them from the working directory)
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+import sys
+
+import pytest
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+os.chdir(REPOSITORY)
+
+
+@pytest.fixture(autouse = True)
+def repository_directory(monkeypatch):
+    #the design changes the working directory, so every test starts from the repository folder
+    monkeypatch.chdir(REPOSITORY)
+
+
+@pytest.fixture(scope = 'session')
+def building(tmp_path_factory):
+    #three story synthetic building with two wall lines in each direction, see Equivalence.write_synthetic_building().
+    #The design modules need the MaterialProperties module of the building model
+    pytest.importorskip('MaterialProperties')
+    from Equivalence import write_synthetic_building
+
+    return write_synthetic_building(str(tmp_path_factory.mktemp('building')), 3, seed = 1)
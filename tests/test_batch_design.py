@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the command line of BatchDesign.py
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+import pytest
+
+from BatchDesign import design_flags, parse_arguments
+
+
+def design(building, argv):
+    #design X/line1 of the synthetic building with the flags of the command line, at a starting length
+    #that meets the drift limit without redesign
+    from FinalShearWallDesign import FinalShearWallDesign
+
+    reDesignTag, userDefinedDetailingTag, userDefinedDriftTag, userDefinedDCTag = \
+        design_flags(parse_arguments(['case'] + argv))
+    return FinalShearWallDesign('case', building, 'X', 20.0, 0, 3, 'line1', reDesignTag, userDefinedDetailingTag,
+                                userDefinedDriftTag, userDefinedDCTag, False)
+
+
+@pytest.mark.parametrize('argv, flags', [([], (False, False, False, False)),
+                                         (['--detailing'], (True, False, False, False)),
+                                         (['--redesign'], (False, True, False, False)),
+                                         (['--drift', '--dc-ratio'], (False, False, True, True))])
+def test_design_flags(argv, flags):
+    #FinalShearWallDesign enables the detailing filter with its reDesignTag and the redesign length
+    #with its userDefinedDetailingTag
+    assert design_flags(parse_arguments(['case'] + argv)) == flags
+
+
+def test_detailing_option_filters_the_catalog(building):
+    assert design(building, ['--detailing']).detailing is not None
+    assert design(building, ['--redesign']).detailing is None
+
+
+def test_redesign_option_computes_the_demand_at_the_redesign_length(building):
+    plain = design(building, [])
+    redesign = design(building, ['--redesign'])
+    assert list(redesign.sw_final_design['Shear Wall Assembly']) == list(plain.sw_final_design['Shear Wall Assembly'])
+    np.testing.assert_allclose(redesign.sw_final_design['D/C Ratio'], plain.sw_final_design['D/C Ratio']*20.0/20.5)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the design paths against the designs of the original design (baseline
+commit) pinned in tests/golden, see Equivalence.py
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import json
+
+import pytest
+
+
+#paths expected to give the original designs; the per-object path is the slowest and gives the same
+#designs as 'reuse floors', the pruned catalog and the bisection can change the design
+PATHS = ('reuse floors', 'warm start', 'vectorized step', 'vectorized warm start')
+
+
+@pytest.fixture(scope = 'module')
+def harness(tmp_path_factory):
+    pytest.importorskip('MaterialProperties')
+    from Equivalence import EquivalenceHarness, FAST_PATHS
+
+    return EquivalenceHarness(str(tmp_path_factory.mktemp('buildings')),
+                              paths = {name: FAST_PATHS[name] for name in PATHS})
+
+
+def test_golden_designs_are_pinned_from_the_baseline_commit():
+    pytest.importorskip('MaterialProperties')
+    from Equivalence import BASELINE_COMMIT, BASELINE_FAILURE, GOLDEN_PATH
+
+    with open(GOLDEN_PATH, 'r') as myfile:
+        golden = json.load(myfile)
+    assert golden['commit'] == BASELINE_COMMIT
+    #most wall lines have to be designed by the original design for the comparison to mean anything
+    designed = [outcome for outcome in golden['outcomes'].values() if outcome['reason'] != BASELINE_FAILURE]
+    assert len(designed) >= len(golden['outcomes'])/2
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_path_gives_the_golden_designs(harness, path):
+    mismatches = harness.mismatches[harness.mismatches['path'] == path]
+    assert mismatches.empty, mismatches.to_string()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the feasibility checks and the caps of the wall line design, and that the
+stacked design gives the same designs (and the same reasons of an infeasible design) as the per-floor
+design
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import contextlib
+import io
+import pickle
+
+import pytest
+
+from DesignErrors import DesignInfeasibleError
+
+
+def design(building, direction, wall_line_name, flags = (False, False, False, False), **options):
+    #design a wall line of the synthetic building from a 4 ft wall
+    from FinalShearWallDesign import FinalShearWallDesign
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return FinalShearWallDesign('case', building, direction, 4.0, 0, 3, wall_line_name, *flags, False, **options)
+
+
+@pytest.mark.parametrize('direction, wall_line_name, flags, options, reason, level', [
+    #no assembly of the catalog carries the demand of the first floor on a 4 ft wall
+    ('X', 'line2', (False, False, False, False), {}, 'strength', 1),
+    #the stiffest assembly does not meet the drift limit at the length cap
+    ('Z', 'line2', (False, False, False, False), {'maxWallLength': 5.0}, 'drift', 3),
+    ('Z', 'line2', (False, False, False, False), {'maxIterations': 1}, 'iteration cap', 3),
+    #the detailing and D/C ratio filters keep the assembly below 70% of its capacity
+    ('Z', 'line2', (True, False, False, False), {}, 'stalled', 3),
+    ('Z', 'line2', (False, False, False, True), {}, 'stalled', 3)])
+def test_infeasible_design_raises_the_governing_reason(building, direction, wall_line_name, flags, options,
+                                                       reason, level):
+    with pytest.raises(DesignInfeasibleError) as error:
+        design(building, direction, wall_line_name, flags, **options)
+    assert (error.value.reason, error.value.wall_line_name, error.value.level) == (reason, wall_line_name, level)
+    #the error is sent back from the process pool of the batch designs
+    copy = pickle.loads(pickle.dumps(error.value))
+    assert (copy.reason, copy.message, copy.wall_line_name, copy.level) == \
+        (reason, error.value.message, wall_line_name, level)
+
+
+def test_feasible_design_stays_within_the_caps(building):
+    from FinalShearWallDesign import MAX_WALL_LENGTH
+
+    result = design(building, 'Z', 'line2')
+    assert max(result.finalWallLength) <= MAX_WALL_LENGTH
+    assert (result.sw_final_design['D/C Ratio'] <= 1.0).all()
+
+
+@pytest.mark.parametrize('flags', [(False, False, False, False), (True, False, False, False),
+                                   (False, True, False, False), (False, False, False, True)])
+@pytest.mark.parametrize('warmStart', [False, True])
+def test_stacked_design_matches_the_per_floor_design(building, flags, warmStart):
+    #the lengths are stepped 0.5 ft at a time as in the per-floor design; the bisection can change the
+    #design where a longer wall fails after a shorter one succeeds
+    from Equivalence import diff_outcomes, per_floor_outcome, stacked_outcome
+    from LoadDistribution import list_wall_lines
+    from VectorizedDesign import StackedShearWallDesign, stack_wall_lines
+
+    units = [(direction, name) for direction in ('X', 'Z') for name in list_wall_lines(building, direction)]
+    stacked = StackedShearWallDesign(stack_wall_lines([('case', building, direction, name) for direction, name in units]),
+                                     4.0, *flags, warmStart = warmStart, lengthSearch = 'step')
+    for case, (direction, name) in enumerate(units):
+        try:
+            expected = per_floor_outcome(design(building, direction, name, flags, warmStart = warmStart))
+        except DesignInfeasibleError as error:
+            expected = per_floor_outcome(error)
+        assert diff_outcomes(expected, stacked_outcome(stacked, case)) == [], (direction, name)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the partitioned result store (ResultStore.py)
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import os
+
+import pytest
+
+pytest.importorskip('MaterialProperties')
+
+from ResultStore import MANIFEST, ResultStore, synthetic_rows
+
+
+def test_small_appends_write_full_partitions(tmp_path):
+    rows = synthetic_rows(200)
+    directory = str(tmp_path/'store')
+    store = ResultStore(directory, rowsPerPartition = 100)
+    written = os.path.getmtime(os.path.join(directory, MANIFEST))
+    #one wall line (three floors) at a time
+    for start in range(0, len(rows), 3):
+        store.append(rows.iloc[start:start + 3])
+    assert len(store) == len(rows)
+    #only full partitions are written before the store is closed, and no manifest
+    assert store.partitions
+    assert all(partition['rows'] == 100 for partition in store.partitions)
+    assert os.path.getmtime(os.path.join(directory, MANIFEST)) == written
+    assert len(ResultStore(directory)) == 0
+
+    store.close()
+    reopened = ResultStore(directory)
+    #200 rows of each level
+    assert [partition['rows'] for partition in reopened.partitions] == [100]*6
+    assert len(reopened) == len(rows)
+    columns = ['caseID', 'wall line', 'level', 'Shear Wall Assembly', 'Drift(in)']
+    expected = rows[rows['level'] == 2][columns].sort_values(columns).reset_index(drop = True)
+    actual = reopened.query([('level', '==', 2)], columns).sort_values(columns).reset_index(drop = True)
+    assert actual.equals(expected)
+
+
+def test_query_sees_the_rows_kept_in_memory(tmp_path):
+    rows = synthetic_rows(10)
+    with ResultStore(str(tmp_path/'store'), rowsPerPartition = 100) as store:
+        store.append(rows)
+        assert store.partitions == []
+        assert len(store.query([('level', '==', 1)])) == 10
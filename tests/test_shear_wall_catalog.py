@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the filters and the dominance pruning of ShearWallCatalog.py against the
+DataFrame filters of the original design
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ShearWallCatalog import ShearWallCatalog
+
+
+#(panel thickness, nail size, nail spacing) specifications, blank for no specification
+DETAILING = [('', '', ''), ('15/32in', '', ''), ('', '10d', ''), ('', '', '4'), ('15/32in', '8d', ''),
+             ('', '8d', '6'), ('7/16in', '', '3'), ('15/32in', '10d', '2'), ('1in', '', '')]
+
+
+@pytest.fixture(scope = 'module')
+def database():
+    return pd.read_csv('shearwall_database.csv')
+
+
+@pytest.fixture(scope = 'module')
+def catalog(database):
+    return ShearWallCatalog.from_dataframe(database)
+
+
+def dataframe_filter(database, demand, DCRatio, detailing):
+    #rows selected by the original design (DesignShearWall.shear_wall_design of the baseline commit)
+    capacity = database['LRFD(klf)'] if DCRatio is None else database['LRFD(klf)']*DCRatio
+    df = database[capacity >= demand]
+    panelThickness, nailSize, nailSpacing = detailing
+    if len(panelThickness) >= 2:
+        df = df.loc[df['panel thickness'] == panelThickness]
+    if len(nailSize) >= 2:
+        df = df.loc[df['nail size'] == nailSize]
+    if len(nailSpacing) >= 1:
+        df = df.loc[df['nail spacing'] == int(nailSpacing)]
+    return df.index.values
+
+
+def dominates(catalog, j, i):
+    #row j has at least the LRFD capacity and Ga of row i at no higher cost, and is better in one of them
+    noWorse = catalog.lrfd[j] >= catalog.lrfd[i] and catalog.Ga[j] >= catalog.Ga[i] and catalog.cost[j] <= catalog.cost[i]
+    better = catalog.lrfd[j] > catalog.lrfd[i] or catalog.Ga[j] > catalog.Ga[i] or catalog.cost[j] < catalog.cost[i]
+    return noWorse and (better or j < i)
+
+
+@pytest.mark.parametrize('DCRatio', [None, 0.8, 0.65])
+@pytest.mark.parametrize('detailing', DETAILING)
+def test_capacity_index_matches_the_dataframe_filter(database, catalog, DCRatio, detailing):
+    #demands between, at and beyond the capacities of the database
+    lrfd = database['LRFD(klf)'].values
+    demands = np.unique(np.concatenate([np.linspace(0.0, lrfd.max()*1.1, 41), lrfd, lrfd*0.8, lrfd*0.65]))
+    for demand in demands:
+        index = catalog.capacity_index(demand, DCRatio, None if detailing == ('', '', '') else detailing)
+        np.testing.assert_array_equal(index, dataframe_filter(database, demand, DCRatio, detailing))
+
+
+@pytest.mark.parametrize('detailing', DETAILING)
+def test_pareto_index_removes_only_dominated_rows(catalog, detailing):
+    rows = catalog.detailing_index(*detailing)
+    kept = catalog.detailing_index(*detailing, pruned = True)
+    assert set(kept) <= set(rows)
+    assert np.all(np.diff(catalog.lrfd[kept]) >= 0)
+    for i in rows:
+        dominated = any(dominates(catalog, j, i) for j in rows if j != i)
+        assert (i not in kept) == dominated
+
+
+def test_pruned_capacity_index_keeps_the_rows_that_meet_the_demand(catalog):
+    kept = catalog.pareto_index()
+    for demand in np.linspace(0.0, catalog.lrfd.max(), 41):
+        np.testing.assert_array_equal(catalog.capacity_index(demand, pruned = True), kept[catalog.lrfd[kept] >= demand])
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+This file is used to test the rod selection of TieDownDesign.py against the DataFrame filter of the
+original design and against a search over all the rod sequences of a run
+
+Developed by: Laxman Dahal, UCLA
+
+Created on: Oct 2026
+
+"""
+
+__author__ = 'Laxman Dahal'
+
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from DesignErrors import DesignInfeasibleError
+from TieDownDesign import TieDownCatalog
+
+
+@pytest.fixture(scope = 'module')
+def database():
+    return pd.read_csv('tie_down_database.csv')
+
+
+@pytest.fixture(scope = 'module')
+def catalog(database):
+    return TieDownCatalog(database)
+
+
+def lightest_run(catalog, tension, storyHeight, maxRodChanges):
+    #least steel of a run over all the rod sequences with at most maxRodChanges changes, inf if none
+    best = np.inf
+    for rods in itertools.product(range(len(catalog)), repeat = len(tension)):
+        rods = np.array(rods)
+        if np.count_nonzero(np.diff(rods)) <= maxRodChanges and np.all(catalog.capacity[rods] >= tension):
+            best = min(best, np.sum(catalog.grossArea[rods]*storyHeight))
+    return best
+
+
+@pytest.mark.parametrize('DCRatio', [None, 0.8])
+def test_select_matches_the_dataframe_filter(database, catalog, DCRatio):
+    capacity = database['Capacity(kips)'].values
+    tension = np.concatenate([np.linspace(0.0, capacity.max()*1.1, 201), capacity, capacity*0.8])
+    rods = catalog.select(tension, DCRatio)
+    for demand, rod in zip(tension, rods):
+        #first row of the original filter, none if no rod carries the demand
+        adjusted = database['Capacity(kips)'] if DCRatio is None else database['Capacity(kips)']*DCRatio
+        df = database[adjusted >= demand]
+        assert rod == (df.index[0] if len(df) else len(catalog))
+
+
+@pytest.mark.parametrize('maxRodChanges', [0, 1, 2])
+def test_fewest_changes_uses_the_least_steel(maxRodChanges):
+    #small catalog, so that every rod sequence can be tried
+    database = pd.read_csv('tie_down_database.csv').iloc[3:9].reset_index(drop = True)
+    catalog = TieDownCatalog(database)
+    random = np.random.default_rng(0)
+    storyHeight = np.array([9.0, 10.0, 12.0])
+    tension = np.sort(random.uniform(0.0, database['Capacity(kips)'].max()*0.9, (40, 3)), axis = 1)
+    rods = catalog.fewest_changes(tension, storyHeight, maxRodChanges = maxRodChanges)
+    for run, rod in zip(tension, rods):
+        assert np.count_nonzero(np.diff(rod)) <= maxRodChanges
+        assert np.all(catalog.capacity[rod] >= run)
+        assert np.sum(catalog.grossArea[rod]*storyHeight) == pytest.approx(lightest_run(catalog, run, storyHeight, maxRodChanges))
+
+
+def test_fewest_changes_without_rod_changes_uses_one_rod_for_the_run(catalog):
+    tension = np.array([[1.0, 5.0, 12.0], [0.5, 0.5, 30.0]])
+    rods = catalog.fewest_changes(tension, 10.0, maxRodChanges = 0)
+    np.testing.assert_array_equal(rods, catalog.select(tension.max(axis = 1), None)[:, None].repeat(3, axis = 1))
+
+
+def test_design_names_the_wall_line_and_level_of_a_tension_no_rod_carries(catalog):
+    tension = np.array([[1.0, 2.0, 3.0], [5.0, catalog.capacity.max()*2, catalog.capacity.max()*1.5]])
+    with pytest.raises(DesignInfeasibleError) as error:
+        catalog.design(tension, 10.0, wall_line_name = 'line2', levels = np.array([3, 2, 1]))
+    assert (error.value.reason, error.value.wall_line_name, error.value.level) == ('tie-down', 'line2', 2)